@@ -0,0 +1,153 @@
+# app/config/channel_pool.py
+"""
+Grupo de canales gRPC precalentados para los clientes de Google Cloud.
+
+Cada servicio (Text-to-Speech, Translation) tiene GRPC_POOL_SIZE clientes, cada uno
+con su propio canal gRPC con keepalive. Las llamadas se reparten al canal con menos
+peticiones en curso, así los hilos de síntesis o traducción no se encolan en una sola
+conexión HTTP/2, y warm_up() abre las conexiones (DNS, TLS) en segundo plano antes de
+la primera petición. Se registran la latencia y los errores de cada canal.
+"""
+
+import time
+import threading
+from collections import deque
+
+from app.utils.debug import log_message
+from app.config.settings import (
+    GRPC_POOL_SIZE, GRPC_KEEPALIVE_TIME_MS, GRPC_KEEPALIVE_TIMEOUT_MS, GRPC_WARMUP_TIMEOUT,
+)
+
+# Latencias recientes que se guardan por canal para el percentil 95
+_LATENCY_WINDOW = 200
+
+
+def grpc_channel_options():
+    """Opciones de los canales: keepalive para que la conexión no se cierre entre historias."""
+    return [
+        ('grpc.keepalive_time_ms', GRPC_KEEPALIVE_TIME_MS),
+        ('grpc.keepalive_timeout_ms', GRPC_KEEPALIVE_TIMEOUT_MS),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+        ('grpc.max_receive_message_length', -1),
+    ]
+
+
+def grpc_client_factory(client_class, credentials):
+    """
+    Devuelve una función que crea un cliente de client_class con un canal gRPC propio.
+
+    Devuelve (cliente, canal) para que el grupo pueda precalentar el canal.
+    """
+    def factory():
+        transport_class = client_class.get_transport_class('grpc')
+        channel = transport_class.create_channel(credentials=credentials, options=grpc_channel_options())
+        return client_class(transport=transport_class(channel=channel)), channel
+    return factory
+
+
+class _PooledChannel:
+    """Un cliente del grupo con sus contadores."""
+
+    def __init__(self, number, client, channel):
+        self.number = number
+        self.client = client
+        self.channel = channel
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.connect_seconds = None
+
+    def get_stats(self):
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'mean_ms': round(self.total_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            'p95_ms': round(p95 * 1000, 1),
+            'connect_ms': round(self.connect_seconds * 1000, 1) if self.connect_seconds is not None else None,
+        }
+
+
+class ChannelPool:
+    """
+    Reparte las llamadas de un servicio entre varios clientes con canales independientes.
+
+    Se usa como el cliente original (pool.synthesize_speech(...)): cada llamada va al
+    canal con menos peticiones en curso y, a igualdad, al siguiente en orden circular.
+    """
+
+    def __init__(self, service, factory, size=GRPC_POOL_SIZE):
+        self.service = service
+        self._lock = threading.Lock()
+        self._next = 0
+        self._channels = []
+        for number in range(max(1, size)):
+            created = factory()
+            client, channel = created if isinstance(created, tuple) else (created, None)
+            self._channels.append(_PooledChannel(number, client, channel))
+        log_message("info", f"Grupo de {len(self._channels)} canales creado para {service}.")
+
+    def _acquire(self):
+        with self._lock:
+            count = len(self._channels)
+            pooled = min((self._channels[(self._next + offset) % count] for offset in range(count)),
+                         key=lambda item: item.in_flight)
+            self._next = (pooled.number + 1) % count
+            pooled.in_flight += 1
+            return pooled
+
+    def _release(self, pooled, elapsed, failed):
+        with self._lock:
+            pooled.in_flight -= 1
+            pooled.calls += 1
+            pooled.total_seconds += elapsed
+            pooled.latencies.append(elapsed)
+            if failed:
+                pooled.errors += 1
+
+    def __getattr__(self, name):
+        # Comprobar que el método existe antes de devolver el despachador
+        attribute = getattr(self._channels[0].client, name)
+        if not callable(attribute):
+            return attribute
+
+        def dispatch(*args, **kwargs):
+            pooled = self._acquire()
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = getattr(pooled.client, name)(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self._release(pooled, time.perf_counter() - start, failed)
+        return dispatch
+
+    def warm_up(self, timeout=GRPC_WARMUP_TIMEOUT):
+        """Abre las conexiones de todos los canales (DNS, TLS, HTTP/2) y registra cuánto tardó cada una."""
+        channels = [pooled for pooled in self._channels if pooled.channel is not None]
+        if not channels:
+            return  # Clientes sin canal propio (simulados)
+        import grpc
+
+        for pooled in channels:
+            start = time.perf_counter()
+            try:
+                grpc.channel_ready_future(pooled.channel).result(timeout=timeout)
+                pooled.connect_seconds = time.perf_counter() - start
+            except grpc.FutureTimeoutError:
+                log_message("warning", f"El canal {pooled.number} de {self.service} no se conectó en {timeout} s.")
+        connected = [pooled.connect_seconds for pooled in self._channels if pooled.connect_seconds is not None]
+        if connected:
+            log_message("debug", f"Canales de {self.service} conectados: "
+                                 f"{', '.join(f'{seconds * 1000:.0f} ms' for seconds in connected)}.")
+
+    def get_stats(self):
+        """Llamadas, errores, peticiones en curso y latencia (media y p95) de cada canal."""
+        with self._lock:
+            return [pooled.get_stats() for pooled in self._channels]
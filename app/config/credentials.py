@@ -2,48 +2,178 @@
 
 import os
 import json
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.cloud import texttospeech
-from google.cloud import translate
-from PyQt5.QtWidgets import QFileDialog, QMessageBox
+import threading
+from datetime import datetime
 from app.utils.directories import get_project_root
 from app.utils.debug import log_message, log_event_and_function
+from app.utils.startup import lazy_import, preload
+from app.config.rate_limit import RateLimitedClient, get_service_limiter, get_rate_limit_stats
+from app.config.channel_pool import ChannelPool, grpc_client_factory
+from app.config.settings import (
+    FAKE_GOOGLE_BACKEND, TOKEN_REFRESH_MARGIN_SECONDS, TOKEN_REFRESH_RETRY_SECONDS,
+)
+
+# Los SDK de Google se importan al crear el primer cliente (o en segundo plano con warm_up)
+oauth2_credentials = lazy_import('google.oauth2.credentials')
+oauthlib_flow = lazy_import('google_auth_oauthlib.flow')
+auth_requests = lazy_import('google.auth.transport.requests')
+texttospeech = lazy_import('google.cloud.texttospeech')
+texttospeech_v1beta1 = lazy_import('google.cloud.texttospeech_v1beta1')
+translate = lazy_import('google.cloud.translate')
 
 
 class GoogleCloudAPIManager:
+    """
+    Credenciales OAuth y clientes de Google Cloud compartidos por toda la aplicación.
+
+    Crear la instancia no importa los SDK ni verifica el token: la autenticación se
+    hace con la primera petición (ensure_credentials) o en segundo plano con warm_up(),
+    para no retrasar la aparición de la ventana.
+    """
     _instance = None  # Para implementar Singleton
+    _instance_lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(GoogleCloudAPIManager, cls).__new__(cls, *args, **kwargs)
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(GoogleCloudAPIManager, cls).__new__(cls, *args, **kwargs)
         return cls._instance
 
     def __init__(self):
-        if not hasattr(self, '_initialized'):  # Evita la inicialización repetida
-            log_message("info", "Inicializando OAuthCredentialsConfig...")
+        with self._instance_lock:
+            if not hasattr(self, '_initialized'):  # Evita la inicialización repetida
+                self._initialize()
+
+    def _initialize(self):
+        log_message("info", "Inicializando OAuthCredentialsConfig...")
+
+        self.root_path = os.path.join(get_project_root(), 'credentials')
+        self.ensure_credentials_dir()
+
+        self.credentials_path = os.path.join(self.root_path, 'credentials.json')
+        self.token_path = os.path.join(self.root_path, 'token.json')
+        self.creds = None
+        self.client = None
+        self.project_id = None
 
-            self.root_path = os.path.join(get_project_root(), 'credentials')
-            self.ensure_credentials_dir()
+        # Inicializa los clientes de Google Cloud a None
+        self.texttospeech_client = None
+        self.texttospeech_v1beta1_client = None
+        self.translate_client = None
+        self.channel_pools = {}  # servicio -> ChannelPool
+        self._clients_lock = threading.Lock()
 
-            self.credentials_path = os.path.join(self.root_path, 'credentials.json')
-            self.token_path = os.path.join(self.root_path, 'token.json')
-            self.creds = None
-            self.client = None
-            self.project_id = None
+        self.scopes = ['https://www.googleapis.com/auth/cloud-platform']
+        self._auth_lock = threading.RLock()
+        self._refresh_stop = threading.Event()
+        self._refresher = None
+        self.token_refreshes = 0
 
-            # Inicializa los clientes de Google Cloud a None
-            self.texttospeech_client = None
-            self.translate_client = None
+        # Con los clientes simulados no hay OAuth ni red
+        self.use_fake = FAKE_GOOGLE_BACKEND
+        if self.use_fake:
+            log_message("warning", "Usando clientes simulados de Google Cloud (TIKTOK_FAKE_GOOGLE=1).")
+            self.project_id = 'fake-project'
 
-            self.scopes = ['https://www.googleapis.com/auth/cloud-platform']
+        # Marcar como inicializado para el patrón Singleton
+        self._initialized = True
+
+    def ensure_credentials(self, interactive=True):
+        """
+        Carga (y renueva si hace falta) el token la primera vez que se necesita.
+
+        Con interactive=False no se abre el flujo OAuth ni el selector de archivos: sólo
+        se usa el token guardado. Devuelve las credenciales o None.
+        """
+        if self.use_fake:
+            return None
+        creds = self.creds
+        if creds is not None and creds.valid and self._refresher is not None:
+            return creds  # Camino rápido: el renovador mantiene el token vigente
+        with self._auth_lock:
+            if self.creds is None or not self.creds.valid:
+                self.check_token_and_auth(interactive=interactive)
+            if self.creds is not None and self.creds.valid:
+                self.start_token_refresher()
+            return self.creds
+
+    def _seconds_until_expiry(self):
+        """Segundos que le quedan al token actual, o None si no se conoce su caducidad."""
+        expiry = getattr(self.creds, 'expiry', None)
+        if expiry is None:
+            return None
+        return (expiry - datetime.utcnow()).total_seconds()
 
-            # Verificar y cargar credenciales/token
-            self.check_token_and_auth()
+    def start_token_refresher(self):
+        """Arranca (una sola vez) el hilo que renueva el token antes de que caduque."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._refresh_stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="oauth_token_refresher", daemon=True)
+        self._refresher.start()
+        log_message("debug", "Renovador del token OAuth en segundo plano iniciado.")
+
+    def stop_token_refresher(self):
+        self._refresh_stop.set()
+
+    def _refresh_loop(self):
+        """
+        Espera hasta TOKEN_REFRESH_MARGIN_SECONDS antes de la caducidad y renueva el token.
+
+        La renovación se hace sobre las mismas credenciales que usan los clientes: las
+        peticiones en curso siguen con el token anterior, que aún es válido, sin esperar
+        a este hilo. Si falla, se reintenta cada TOKEN_REFRESH_RETRY_SECONDS.
+        """
+        while not self._refresh_stop.is_set():
+            remaining = self._seconds_until_expiry()
+            if remaining is None:
+                # Caducidad desconocida: volver a mirar más tarde
+                if self._refresh_stop.wait(TOKEN_REFRESH_RETRY_SECONDS * 10):
+                    return
+            elif remaining > TOKEN_REFRESH_MARGIN_SECONDS:
+                if self._refresh_stop.wait(remaining - TOKEN_REFRESH_MARGIN_SECONDS):
+                    return
+            elif not self.refresh_token_now() and self._refresh_stop.wait(TOKEN_REFRESH_RETRY_SECONDS):
+                return
+
+    def refresh_token_now(self):
+        """Renueva el token ahora y lo guarda. Devuelve True si se renovó."""
+        creds = self.creds
+        if creds is None or not creds.refresh_token:
+            log_message("warning", "No hay token de actualización: no se puede renovar en segundo plano.")
+            self._refresh_stop.set()
+            return False
+        try:
+            creds.refresh(auth_requests.Request())
+        except Exception as e:
+            log_message("warning", f"No se pudo renovar el token OAuth, se reintentará: {e}")
+            return False
+        self.token_refreshes += 1
+        log_message("info", f"Token OAuth renovado en segundo plano; caduca en "
+                            f"{(self._seconds_until_expiry() or 0) / 60:.0f} min.")
+        self.save_token()
+        return True
 
-            # Marcar como inicializado para el patrón Singleton
-            self._initialized = True
+    def warm_up(self):
+        """
+        Importa los SDK y carga el token guardado sin interacción, para llamar desde un
+        hilo en segundo plano cuando la ventana ya está visible.
+        """
+        if not self.use_fake:
+            preload(texttospeech, texttospeech_v1beta1, translate)
+        if self.use_fake or self.ensure_credentials(interactive=False) is not None:
+            self.warm_up_channels()
+
+    def warm_up_channels(self, services=None):
+        """Crea los clientes y abre sus canales gRPC antes de la primera petición."""
+        from app.config.settings import TTS_SUBTITLE_MARKS
+
+        services = services or ('texttospeech_v1beta1' if TTS_SUBTITLE_MARKS else 'texttospeech', 'translate')
+        for service in services:
+            self.get_client(service)
+            pool = self.channel_pools.get(service)
+            if pool is not None:
+                pool.warm_up()
 
     def ensure_credentials_dir(self):
         """Crea el directorio de credenciales si no existe."""
@@ -52,12 +182,12 @@ class GoogleCloudAPIManager:
             log_message("info", f"Directorio de credenciales creado: {self.root_path}")
 
     @log_event_and_function("check_token_and_auth_event")
-    def check_token_and_auth(self):
-        """Verifica si existe un token válido, si no, inicia el flujo OAuth."""
+    def check_token_and_auth(self, interactive=True):
+        """Verifica si existe un token válido, si no, inicia el flujo OAuth (sólo si interactive)."""
         try:
             if os.path.exists(self.token_path):
                 log_message("info", "Token existente encontrado, cargándolo...")
-                self.creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+                self.creds = oauth2_credentials.Credentials.from_authorized_user_file(self.token_path, self.scopes)
 
                 if self.creds and self.creds.valid:
                     log_message("info", "Token válido, se omite la verificación de seguridad.")
@@ -65,7 +195,7 @@ class GoogleCloudAPIManager:
 
                 if self.creds.expired and self.creds.refresh_token:
                     log_message("info", "Token expirado, renovando...")
-                    self.creds.refresh(Request())
+                    self.creds.refresh(auth_requests.Request())
                     log_message("info", "Token renovado exitosamente.")
                     self.save_token()
                     return
@@ -74,7 +204,8 @@ class GoogleCloudAPIManager:
             else:
                 log_message("warning", "No se encontró un token, iniciando flujo OAuth.")
 
-            self.auth_flow()
+            if interactive:
+                self.auth_flow()
 
         except Exception as e:
             log_message("error", f"Error en el proceso de verificación de token: {e}", exc_info=True)
@@ -89,7 +220,7 @@ class GoogleCloudAPIManager:
                 log_message("error", "No se seleccionó un archivo de credenciales.")
                 return
 
-        flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.scopes)
+        flow = oauthlib_flow.InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.scopes)
         log_message("info", "Autenticando...")
         try:
             self.creds = flow.run_local_server(port=0)
@@ -101,6 +232,8 @@ class GoogleCloudAPIManager:
     @log_event_and_function("ask_for_credentils_event")
     def ask_for_credentials(self):
         """Solicita al usuario seleccionar el archivo de credenciales de OAuth."""
+        from PyQt5.QtWidgets import QFileDialog, QMessageBox
+
         options = QFileDialog.Options()
         credentials_file, _ = QFileDialog.getOpenFileName(
             None,
@@ -117,27 +250,40 @@ class GoogleCloudAPIManager:
         return credentials_file
 
     def save_token(self):
-        """Guarda el token OAuth y el project_id en el directorio de credenciales."""
+        """
+        Guarda el token OAuth, su caducidad y el project_id en el directorio de credenciales.
+
+        Se escribe en un archivo temporal y se reemplaza de forma atómica: otro proceso
+        (o el renovador en segundo plano) nunca lee un token.json a medio escribir.
+        """
         if self.creds:
             try:
-                with open(self.credentials_path, 'r') as f:
-                    credentials_data = json.load(f)
-                    self.project_id = credentials_data.get('installed', {}).get('project_id')
-                    if not self.project_id:
-                        log_message("warning", "No se encontró el 'project_id' en las credenciales.")
-
-                with open(self.token_path, 'w') as token_file:
-                    token_data = {
-                        'token': self.creds.token,
-                        'refresh_token': self.creds.refresh_token,
-                        'token_uri': self.creds.token_uri,
-                        'client_id': self.creds.client_id,
-                        'client_secret': self.creds.client_secret,
-                        'scopes': self.creds.scopes,
-                        'project_id': self.project_id  # Guardamos el project_id aquí
-                    }
+                if os.path.exists(self.credentials_path):
+                    with open(self.credentials_path, 'r') as f:
+                        credentials_data = json.load(f)
+                        self.project_id = credentials_data.get('installed', {}).get('project_id') or self.project_id
+                else:
+                    self.get_project_id()  # Conservar el del token anterior
+                if not self.project_id:
+                    log_message("warning", "No se encontró el 'project_id' en las credenciales.")
+
+                expiry = getattr(self.creds, 'expiry', None)
+                token_data = {
+                    'token': self.creds.token,
+                    'refresh_token': self.creds.refresh_token,
+                    'token_uri': self.creds.token_uri,
+                    'client_id': self.creds.client_id,
+                    'client_secret': self.creds.client_secret,
+                    'scopes': self.creds.scopes,
+                    # Sin caducidad, el token cargado parecería válido para siempre
+                    'expiry': expiry.isoformat() + 'Z' if expiry else None,
+                    'project_id': self.project_id  # Guardamos el project_id aquí
+                }
+                tmp_path = f"{self.token_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w') as token_file:
                     json.dump(token_data, token_file)
-                    log_message("info", f"Token y Project ID guardados en {self.token_path}")
+                os.replace(tmp_path, self.token_path)
+                log_message("info", f"Token y Project ID guardados en {self.token_path}")
             except Exception as e:
                 log_message("error", f"Error al guardar el token: {e}", exc_info=True)
 
@@ -158,26 +304,80 @@ class GoogleCloudAPIManager:
 
     def get_client(self, service):
         """Devuelve el cliente para el servicio de Google Cloud especificado."""
+        if self.use_fake:
+            return self.get_fake_client(service)
+
+        self.ensure_credentials()
         assert self.creds, "No hay credenciales disponibles."
         log_message("info", f"Solicitando cliente para el servicio: {service}")
 
         try:
-            if service == 'texttospeech':
-                if self.texttospeech_client is None:
-                    self.texttospeech_client = texttospeech.TextToSpeechClient(credentials=self.creds)
-                    log_message("info", "Cliente Text-to-Speech creado exitosamente.")
-                return self.texttospeech_client
-
-            elif service == 'translate':
-                if self.translate_client is None:
-                    self.translate_client = translate.TranslationServiceClient(credentials=self.creds)
-                    log_message("info", "Cliente Translation creado exitosamente.")
-                return self.translate_client
+            with self._clients_lock:
+                if service == 'texttospeech':
+                    if self.texttospeech_client is None:
+                        self.texttospeech_client = self._pooled_client(
+                            service, texttospeech.TextToSpeechClient, get_service_limiter(service))
+                        log_message("info", "Cliente Text-to-Speech creado exitosamente.")
+                    return self.texttospeech_client
 
-            else:
-                log_message("warning", f"Servicio '{service}' no soportado.")
-                return None
+                elif service == 'texttospeech_v1beta1':
+                    # Misma cuota que Text-to-Speech: comparte su limitador
+                    if self.texttospeech_v1beta1_client is None:
+                        self.texttospeech_v1beta1_client = self._pooled_client(
+                            service, texttospeech_v1beta1.TextToSpeechClient, get_service_limiter('texttospeech'))
+                        log_message("info", "Cliente Text-to-Speech (v1beta1) creado exitosamente.")
+                    return self.texttospeech_v1beta1_client
+
+                elif service == 'translate':
+                    if self.translate_client is None:
+                        self.translate_client = self._pooled_client(
+                            service, translate.TranslationServiceClient, get_service_limiter(service))
+                        log_message("info", "Cliente Translation creado exitosamente.")
+                    return self.translate_client
+
+                else:
+                    log_message("warning", f"Servicio '{service}' no soportado.")
+                    return None
 
         except Exception as e:
             log_message("error", f"Error al obtener el cliente para el servicio '{service}': {e}", exc_info=True)
             return None
+
+    def _pooled_client(self, service, client_class, limiter):
+        """Cliente del servicio repartido entre varios canales gRPC y detrás del limitador."""
+        pool = ChannelPool(service, grpc_client_factory(client_class, self.creds))
+        self.channel_pools[service] = pool
+        return RateLimitedClient(pool, limiter)
+
+    def get_fake_client(self, service):
+        """Devuelve el cliente simulado del servicio, también detrás del limitador."""
+        from app.config.fake_google import FakeBackend, FakeTextToSpeechClient, FakeTranslationServiceClient
+
+        fake_classes = {
+            'texttospeech': FakeTextToSpeechClient,
+            'texttospeech_v1beta1': FakeTextToSpeechClient,
+            'translate': FakeTranslationServiceClient,
+        }
+        if service not in fake_classes:
+            log_message("warning", f"Servicio '{service}' no soportado.")
+            return None
+
+        attribute = f"{service}_client"
+        with self._clients_lock:
+            if getattr(self, attribute) is None:
+                quota_service = 'texttospeech' if service.startswith('texttospeech') else service
+                # Un mismo servidor simulado (cuota y errores) para todos los canales del grupo
+                backend = FakeBackend(quota_service)
+                pool = ChannelPool(service, lambda: fake_classes[service](backend))
+                self.channel_pools[service] = pool
+                setattr(self, attribute, RateLimitedClient(pool, get_service_limiter(quota_service)))
+                log_message("info", f"Cliente simulado de {service} creado.")
+            return getattr(self, attribute)
+
+    def get_rate_limit_stats(self):
+        """Devuelve, por servicio, las llamadas, caracteres, esperas del limitador y reintentos."""
+        return get_rate_limit_stats()
+
+    def get_channel_stats(self):
+        """Devuelve, por servicio, las llamadas, errores y latencias de cada canal gRPC."""
+        return {service: pool.get_stats() for service, pool in self.channel_pools.items()}
@@ -0,0 +1,223 @@
+# app/config/fake_google.py
+"""
+Clientes locales que imitan a Text-to-Speech y Translation para pruebas de carga.
+
+Sustituyen a los clientes de GoogleCloudAPIManager.get_client() cuando
+TIKTOK_FAKE_GOOGLE=1: no usan red ni cuota, devuelven audio y traducciones
+deterministas y permiten inyectar latencia, errores y cuota agotada.
+"""
+
+import io
+import re
+import math
+import time
+import wave
+import random
+import threading
+from collections import deque
+
+from app.utils.debug import log_message
+from app.config.settings import (
+    FAKE_GOOGLE_LATENCY_MS, FAKE_GOOGLE_ERROR_RATE, FAKE_GOOGLE_QUOTA_RPM, FAKE_GOOGLE_QUOTA_CPM,
+    FAKE_GOOGLE_SEED,
+)
+
+# Caracteres por segundo de la voz simulada a velocidad 1.0
+FAKE_CHARS_PER_SECOND = 15.0
+
+# Trama MPEG-1 Layer III mono, 48 kHz, 64 kbps: 192 bytes y 1152 muestras (24 ms) de silencio
+_MP3_FRAME = bytes([0xFF, 0xFB, 0x54, 0xC4]) + bytes(188)
+_MP3_FRAME_SECONDS = 1152 / 48000.0
+
+_MARK_RE = re.compile(r'<mark\s+name="([^"]*)"\s*/>')
+_TAG_RE = re.compile(r"<[^<>]*>")
+
+
+class ResourceExhausted(Exception):
+    """Cuota simulada agotada (equivale a RESOURCE_EXHAUSTED / HTTP 429)."""
+    code = 429
+
+
+class ServiceUnavailable(Exception):
+    """Error transitorio simulado (equivale a UNAVAILABLE / HTTP 503)."""
+    code = 503
+
+
+class _Response:
+    """Respuesta mínima con atributos, como los mensajes proto de las bibliotecas de Google."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return f"_Response({self.__dict__!r})"
+
+
+def parse_latency(spec):
+    """
+    Convierte la especificación de latencia en una función que devuelve segundos.
+
+    Formatos (en milisegundos): '0', '120' (fija), 'uniform:50:300',
+    'normal:200:40', 'lognormal:200:0.5' (mediana y sigma).
+    """
+    parts = str(spec or '0').split(':')
+    kind = parts[0].lower()
+    try:
+        values = [float(value) for value in parts[1:]]
+        if kind == 'uniform':
+            low, high = values
+            return lambda rng: rng.uniform(low, high) / 1000.0
+        if kind == 'normal':
+            mean, sigma = values
+            return lambda rng: max(0.0, rng.gauss(mean, sigma)) / 1000.0
+        if kind == 'lognormal':
+            median, sigma = values
+            return lambda rng: rng.lognormvariate(math.log(max(median, 1e-3)), sigma) / 1000.0
+        fixed = float(kind)
+        return lambda rng: fixed / 1000.0
+    except (TypeError, ValueError):
+        log_message("warning", f"Latencia simulada no válida '{spec}', se usa 0 ms.")
+        return lambda rng: 0.0
+
+
+class FakeBackend:
+    """Latencia, errores aleatorios y cuota por minuto compartidos por los clientes simulados."""
+
+    def __init__(self, service, latency=FAKE_GOOGLE_LATENCY_MS, error_rate=FAKE_GOOGLE_ERROR_RATE,
+                 quota_rpm=FAKE_GOOGLE_QUOTA_RPM, quota_cpm=FAKE_GOOGLE_QUOTA_CPM, seed=FAKE_GOOGLE_SEED):
+        self.service = service
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.quota_rpm = quota_rpm
+        self.quota_cpm = quota_cpm
+        self._rng = random.Random(f"{seed}:{service}")
+        self._lock = threading.Lock()
+        self._window = deque()  # (instante, caracteres) de las llamadas del último minuto
+
+        self.calls = 0
+        self.errors = 0
+        self.quota_errors = 0
+
+    def call(self, chars):
+        """Simula una llamada: aplica la cuota, el error aleatorio y la latencia."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= 60.0:
+                self._window.popleft()
+            used_chars = sum(item[1] for item in self._window)
+            if (self.quota_rpm and len(self._window) >= self.quota_rpm) or \
+                    (self.quota_cpm and used_chars + chars > self.quota_cpm):
+                self.quota_errors += 1
+                raise ResourceExhausted(f"Cuota simulada de {self.service} agotada.")
+            self._window.append((now, chars))
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            delay = self.latency(self._rng)
+
+        time.sleep(delay)
+        if failed:
+            with self._lock:
+                self.errors += 1
+            raise ServiceUnavailable(f"Error simulado de {self.service}.")
+
+    def get_stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'errors': self.errors, 'quota_errors': self.quota_errors}
+
+
+def _field(request, kwargs, name, default=None):
+    if name in kwargs:
+        return kwargs[name]
+    if isinstance(request, dict):
+        return request.get(name, default)
+    return getattr(request, name, default)
+
+
+def _encoding_name(encoding):
+    # Puede llegar como enum, como su nombre o como su valor numérico (LINEAR16 = 1, MP3 = 2)
+    name = getattr(encoding, 'name', encoding)
+    return {1: 'LINEAR16', 2: 'MP3'}.get(name, str(name).upper())
+
+
+class FakeTextToSpeechClient:
+    """Imita TextToSpeechClient.synthesize_speech con audio de silencio de duración proporcional al texto."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or FakeBackend('texttospeech')
+
+    def synthesize_speech(self, request=None, **kwargs):
+        synthesis_input = _field(request, kwargs, 'input')
+        audio_config = _field(request, kwargs, 'audio_config')
+        text = _field(synthesis_input, {}, 'text') or _field(synthesis_input, {}, 'ssml') or ''
+        self.backend.call(len(text))
+
+        speaking_rate = float(_field(audio_config, {}, 'speaking_rate', 1.0) or 1.0)
+        seconds_per_char = 1.0 / FAKE_CHARS_PER_SECOND / speaking_rate
+        spoken_chars = len(_TAG_RE.sub("", text))
+        seconds = max(0.1, spoken_chars * seconds_per_char)
+        if _encoding_name(_field(audio_config, {}, 'audio_encoding')) == 'LINEAR16':
+            sample_rate = int(_field(audio_config, {}, 'sample_rate_hertz', 0) or 24000)
+            audio_content = fake_wav(seconds, sample_rate)
+        else:
+            audio_content = fake_mp3(seconds)
+        timepoints = []
+        if _field(request, kwargs, 'enable_time_pointing'):
+            # Instante de cada <mark/>: caracteres hablados antes de ella a la velocidad simulada
+            for match in _MARK_RE.finditer(text):
+                before = len(_TAG_RE.sub("", text[:match.start()]))
+                timepoints.append(_Response(mark_name=match.group(1), time_seconds=before * seconds_per_char))
+        return _Response(audio_content=audio_content, timepoints=timepoints)
+
+    def list_voices(self, request=None, **kwargs):
+        self.backend.call(0)
+        return _Response(voices=[])
+
+
+class FakeTranslationServiceClient:
+    """Imita TranslationServiceClient con traducciones deterministas '[destino] texto'."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or FakeBackend('translate')
+
+    def translate_text(self, request=None, **kwargs):
+        contents = list(_field(request, kwargs, 'contents') or [])
+        target = _field(request, kwargs, 'target_language_code')
+        source = _field(request, kwargs, 'source_language_code')
+        self.backend.call(sum(len(content) for content in contents))
+        return _Response(translations=[
+            _Response(translated_text=f"[{target}] {content}",
+                      detected_language_code=source or fake_detect(content))
+            for content in contents
+        ])
+
+    def detect_language(self, request=None, **kwargs):
+        content = _field(request, kwargs, 'content') or ''
+        self.backend.call(len(content))
+        return _Response(languages=[_Response(language_code=fake_detect(content), confidence=1.0)])
+
+
+def fake_mp3(seconds):
+    """Tramas MP3 de silencio que ffmpeg puede concatenar con '-c copy'."""
+    return _MP3_FRAME * max(1, int(round(seconds / _MP3_FRAME_SECONDS)))
+
+
+def fake_wav(seconds, sample_rate):
+    """WAV PCM de 16 bits mono de silencio, como la respuesta LINEAR16 de la API."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(2 * int(seconds * sample_rate)))
+    return buffer.getvalue()
+
+
+_SPANISH_HINTS = frozenset(('el', 'la', 'de', 'que', 'y', 'los', 'las', 'una', 'por', 'con', 'para', 'es'))
+
+
+def fake_detect(text):
+    """Detección determinista y aproximada: 'es' si parece español, 'en' en otro caso."""
+    words = text.lower().split()
+    if any(char in text for char in 'ñ¿¡áéíóú') or sum(word in _SPANISH_HINTS for word in words) * 5 > len(words):
+        return 'es'
+    return 'en'
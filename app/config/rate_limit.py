@@ -0,0 +1,216 @@
+# app/config/rate_limit.py
+
+import time
+import random
+import threading
+
+from app.utils.debug import log_message
+from app.config.settings import (
+    API_QUOTAS, API_BURST_SECONDS, API_MAX_RETRIES, API_BACKOFF_BASE, API_BACKOFF_MAX,
+)
+
+# Códigos de error de Google que indican saturación temporal y merecen reintento
+RETRYABLE_STATUS = frozenset({'RESOURCE_EXHAUSTED', 'UNAVAILABLE'})
+RETRYABLE_EXCEPTIONS = frozenset({'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable'})
+RETRYABLE_HTTP_CODES = frozenset({429, 503})
+
+# Fracción de la cuota que corresponde a este proceso (1/N con N procesos de trabajo)
+_quota_share = 1
+
+
+def configure_quota_share(processes):
+    """Reparte la cuota entre 'processes' procesos; debe llamarse antes de crear los clientes."""
+    global _quota_share
+    _quota_share = max(1, int(processes))
+
+
+class TokenBucket:
+    """
+    Cubo de fichas: se rellena a 'rate' fichas por segundo hasta 'capacity'.
+
+    acquire() bloquea hasta que hay fichas suficientes y devuelve los segundos esperados.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        # Una petición mayor que el cubo sólo espera a tenerlo lleno
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ServiceLimiter:
+    """Presupuesto por minuto de peticiones y de caracteres facturables de un servicio."""
+
+    def __init__(self, service, requests_per_minute, chars_per_minute):
+        self.service = service
+        self.requests = self._bucket(requests_per_minute)
+        self.chars = self._bucket(chars_per_minute)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.billable_chars = 0
+        self.throttled = 0          # llamadas que tuvieron que esperar al limitador
+        self.throttled_seconds = 0.0
+        self.retries = 0            # reintentos tras RESOURCE_EXHAUSTED / UNAVAILABLE
+        self.backoff_seconds = 0.0
+        self.failures = 0           # llamadas que agotaron los reintentos
+
+    @staticmethod
+    def _bucket(per_minute):
+        if not per_minute:
+            return None
+        rate = per_minute / 60.0
+        return TokenBucket(rate, max(1.0, rate * API_BURST_SECONDS))
+
+    def acquire(self, chars=0):
+        waited = self.requests.acquire(1) if self.requests else 0.0
+        if chars and self.chars:
+            waited += self.chars.acquire(chars)
+        with self._lock:
+            self.calls += 1
+            self.billable_chars += chars
+            if waited > 0:
+                self.throttled += 1
+                self.throttled_seconds += waited
+        if waited > 0:
+            log_message("debug", f"Limitador de {self.service}: esperados {waited:.2f} s.")
+
+    def call(self, func, chars, *args, **kwargs):
+        """Ejecuta func respetando la cuota y reintentando los errores transitorios con backoff."""
+        attempt = 0
+        while True:
+            self.acquire(chars)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= API_MAX_RETRIES:
+                    if is_retryable(e):
+                        with self._lock:
+                            self.failures += 1
+                    raise
+                # Backoff exponencial con jitter completo: evita que los trabajos reintenten a la vez
+                delay = random.uniform(0, min(API_BACKOFF_MAX, API_BACKOFF_BASE * (2 ** attempt)))
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                    self.backoff_seconds += delay
+                log_message("warning", f"{self.service}: {type(e).__name__}, reintento {attempt}/{API_MAX_RETRIES} "
+                                       f"en {delay:.2f} s.")
+                time.sleep(delay)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'billable_chars': self.billable_chars,
+                'throttled': self.throttled,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'retries': self.retries,
+                'backoff_seconds': round(self.backoff_seconds, 3),
+                'failures': self.failures,
+            }
+
+
+def is_retryable(error):
+    """Indica si el error es de cuota agotada o servicio no disponible."""
+    if type(error).__name__ in RETRYABLE_EXCEPTIONS:
+        return True
+    status = getattr(error, 'grpc_status_code', None)
+    if status is not None and getattr(status, 'name', None) in RETRYABLE_STATUS:
+        return True
+    code = getattr(error, 'code', None)
+    if callable(code):
+        # grpc.RpcError expone code() en lugar de grpc_status_code
+        try:
+            code = code()
+        except Exception:
+            return False
+    return getattr(code, 'name', None) in RETRYABLE_STATUS or code in RETRYABLE_HTTP_CODES
+
+
+def _request_field(args, kwargs, name):
+    request = kwargs.get('request') or (args[0] if args else None)
+    if name in kwargs:
+        return kwargs[name]
+    if isinstance(request, dict):
+        return request.get(name)
+    return getattr(request, name, None)
+
+
+def billable_chars(method, args, kwargs):
+    """Cuenta los caracteres que factura la llamada (texto o SSML sintetizado, texto traducido)."""
+    if method == 'synthesize_speech':
+        synthesis_input = _request_field(args, kwargs, 'input')
+        if isinstance(synthesis_input, dict):
+            return len(synthesis_input.get('text') or synthesis_input.get('ssml') or '')
+        return len(getattr(synthesis_input, 'text', '') or getattr(synthesis_input, 'ssml', '') or '')
+    if method == 'translate_text':
+        return sum(len(content) for content in (_request_field(args, kwargs, 'contents') or []))
+    if method == 'detect_language':
+        return len(_request_field(args, kwargs, 'content') or '')
+    return 0
+
+
+class RateLimitedClient:
+    """
+    Envuelve un cliente de Google Cloud: las llamadas facturables pasan por el limitador
+    del servicio y el resto de atributos se delegan sin cambios.
+    """
+
+    LIMITED_METHODS = frozenset({'synthesize_speech', 'translate_text', 'detect_language'})
+
+    def __init__(self, client, limiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name not in self.LIMITED_METHODS:
+            return attribute
+
+        def limited(*args, **kwargs):
+            return self._limiter.call(attribute, billable_chars(name, args, kwargs), *args, **kwargs)
+        return limited
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_service_limiter(service):
+    """Devuelve el limitador compartido del servicio (uno por proceso)."""
+    with _limiters_lock:
+        limiter = _limiters.get(service)
+        if limiter is None:
+            requests_per_minute, chars_per_minute = API_QUOTAS.get(service, (0, 0))
+            limiter = ServiceLimiter(service, requests_per_minute / _quota_share, chars_per_minute / _quota_share)
+            _limiters[service] = limiter
+            log_message("info", f"Limitador de {service} (0 = sin límite): {requests_per_minute / _quota_share:g} "
+                                f"peticiones/min, {chars_per_minute / _quota_share:g} caracteres/min.")
+        return limiter
+
+
+def get_rate_limit_stats():
+    """Contadores de todos los limitadores creados en este proceso."""
+    with _limiters_lock:
+        return {service: limiter.get_stats() for service, limiter in _limiters.items()}
@@ -0,0 +1,114 @@
+# app/config/settings.py
+
+import os
+
+
+def _env_int(name, default):
+    """Lee un entero desde una variable de entorno, usando el valor por defecto si no es válido."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    """Lee un número decimal desde una variable de entorno, usando el valor por defecto si no es válido."""
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Número máximo de peticiones simultáneas a Text-to-Speech
+TTS_MAX_CONCURRENT_REQUESTS = max(1, _env_int("TIKTOK_TTS_MAX_WORKERS", 4))
+
+# Traducción por lotes: peticiones simultáneas y puntos de código por petición (como
+# máximo 30000). Un texto largo se reparte en varios lotes que se traducen a la vez.
+TRANSLATE_MAX_CONCURRENT_REQUESTS = max(1, _env_int("TIKTOK_TRANSLATE_MAX_WORKERS", 4))
+TRANSLATE_BATCH_CODEPOINTS = min(30000, max(500, _env_int("TIKTOK_TRANSLATE_BATCH_CODEPOINTS", 5000)))
+
+# Idiomas de destino por defecto (separados por comas); la interfaz traduce al primero
+TRANSLATE_TARGET_LANGUAGES = [code.strip() for code in os.environ.get("TIKTOK_TARGET_LANGUAGES", "es").split(",")
+                              if code.strip()] or ["es"]
+
+# Similitud (Jaccard de trigramas) a partir de la cual un título se marca como casi duplicado
+TITLE_SIMILARITY_THRESHOLD = min(1.0, max(0.0, _env_float("TIKTOK_TITLE_SIMILARITY", 0.5)))
+
+# Subtítulos: caracteres como máximo por subtítulo y reparto de la duración cuando no hay
+# tiempos exactos, por sílabas ('syllables') o por caracteres ('chars')
+SUBTITLE_MAX_CHARS = max(10, _env_int("TIKTOK_SUBTITLE_MAX_CHARS", 80))
+SUBTITLE_WEIGHTING = os.environ.get("TIKTOK_SUBTITLE_WEIGHTING", "syllables").lower()
+
+# Detección de idioma local (data/langid/model.json): por debajo de esta confianza se
+# recurre a la API; los resultados se guardan por hash del texto
+LANGID_MIN_CONFIDENCE = min(1.0, max(0.0, _env_float("TIKTOK_LANGID_MIN_CONFIDENCE", 0.95)))
+LANGID_CACHE_SIZE = max(0, _env_int("TIKTOK_LANGID_CACHE_SIZE", 1024))
+
+# Archivos de audio/video cuya información (duración, códec...) se recuerda mientras no cambien
+MEDIA_PROBE_CACHE_SIZE = max(0, _env_int("TIKTOK_MEDIA_PROBE_CACHE_SIZE", 256))
+
+# Caché en disco de las síntesis de Text-to-Speech
+TTS_CACHE_ENABLED = os.environ.get("TIKTOK_TTS_CACHE", "1") != "0"
+TTS_CACHE_MAX_BYTES = max(0, _env_int("TIKTOK_TTS_CACHE_MB", 200)) * 1024 * 1024
+
+# Codificación pedida a Text-to-Speech: 'MP3' (une tramas comprimidas) o 'LINEAR16'
+# (PCM unido con NumPy con precisión de muestra y codificado a MP3 en una sola pasada)
+TTS_AUDIO_ENCODING = os.environ.get("TIKTOK_TTS_ENCODING", "MP3").upper()
+TTS_SAMPLE_RATE = _env_int("TIKTOK_TTS_SAMPLE_RATE", 24000)
+TTS_SILENCE_MS = max(0, _env_int("TIKTOK_TTS_SILENCE_MS", 0))
+TTS_CROSSFADE_MS = max(0, _env_int("TIKTOK_TTS_CROSSFADE_MS", 10))
+
+# Marcar cada oración con <mark/> y pedir sus instantes a la API (v1beta1) para
+# generar subtítulos exactos sin sondear ni alinear el audio. Desactivado por defecto:
+# las marcas se facturan como caracteres y cambian la ruta de la petición; en los lotes
+# se activa por historia con --exact-subtitles
+TTS_SUBTITLE_MARKS = os.environ.get("TIKTOK_TTS_MARKS", "0") == "1"
+
+# Cortes de fragmento definidos por el contenido: al editar el texto sólo cambian los
+# fragmentos cercanos a la edición y el resto se reutiliza sin volver a sintetizarlo
+TTS_STABLE_CHUNKS = os.environ.get("TIKTOK_TTS_STABLE_CHUNKS", "1") != "0"
+
+# Memoria de traducción por oraciones (cache/translation_memory.sqlite3): al volver a
+# traducir un texto editado sólo se envían las oraciones nuevas
+TRANSLATION_MEMORY_ENABLED = os.environ.get("TIKTOK_TRANSLATION_MEMORY", "1") != "0"
+TRANSLATION_MEMORY_MAX_ENTRIES = max(1, _env_int("TIKTOK_TRANSLATION_MEMORY_MAX_ENTRIES", 100000))
+
+# Vigencia de la lista de voces de Text-to-Speech guardada en cache/voices.json
+VOICE_CATALOG_TTL_SECONDS = max(0, _env_int("TIKTOK_VOICE_CATALOG_TTL_HOURS", 24)) * 3600
+
+# Reproducir el audio mientras se siguen sintetizando los fragmentos
+TTS_PROGRESSIVE_PREVIEW = os.environ.get("TIKTOK_TTS_PREVIEW", "1") != "0"
+
+# Cuotas por minuto de cada servicio de Google Cloud: (peticiones, caracteres facturables).
+# 0 desactiva el límite. Con varios procesos de trabajo la cuota se reparte entre ellos.
+API_QUOTAS = {
+    'texttospeech': (max(0, _env_int("TIKTOK_TTS_RPM", 500)), max(0, _env_int("TIKTOK_TTS_CPM", 500000))),
+    'translate': (max(0, _env_int("TIKTOK_TRANSLATE_RPM", 600)), max(0, _env_int("TIKTOK_TRANSLATE_CPM", 1000000))),
+}
+# Ráfaga máxima admitida, en segundos de cuota
+API_BURST_SECONDS = max(1.0, _env_float("TIKTOK_API_BURST_SECONDS", 10.0))
+
+# Reintentos ante RESOURCE_EXHAUSTED / UNAVAILABLE con backoff exponencial y jitter
+API_MAX_RETRIES = max(0, _env_int("TIKTOK_API_MAX_RETRIES", 5))
+API_BACKOFF_BASE = max(0.0, _env_float("TIKTOK_API_BACKOFF_BASE", 1.0))
+API_BACKOFF_MAX = max(0.0, _env_float("TIKTOK_API_BACKOFF_MAX", 32.0))
+
+# Renovación preventiva del token OAuth en segundo plano: se renueva cuando le quedan
+# menos de TOKEN_REFRESH_MARGIN_SECONDS y se reintenta cada TOKEN_REFRESH_RETRY_SECONDS si falla
+TOKEN_REFRESH_MARGIN_SECONDS = max(0, _env_int("TIKTOK_TOKEN_REFRESH_MARGIN", 300))
+TOKEN_REFRESH_RETRY_SECONDS = max(1, _env_int("TIKTOK_TOKEN_REFRESH_RETRY", 30))
+
+# Canales gRPC por servicio (Text-to-Speech, Translation), keepalive y espera máxima
+# al abrir las conexiones en segundo plano
+GRPC_POOL_SIZE = max(1, _env_int("TIKTOK_GRPC_POOL_SIZE", 2))
+GRPC_KEEPALIVE_TIME_MS = max(1000, _env_int("TIKTOK_GRPC_KEEPALIVE_MS", 30000))
+GRPC_KEEPALIVE_TIMEOUT_MS = max(1000, _env_int("TIKTOK_GRPC_KEEPALIVE_TIMEOUT_MS", 10000))
+GRPC_WARMUP_TIMEOUT = max(0.1, _env_float("TIKTOK_GRPC_WARMUP_TIMEOUT", 10.0))
+
+# Clientes simulados de Google (app/config/fake_google.py) para pruebas de carga sin red ni cuota
+FAKE_GOOGLE_BACKEND = os.environ.get("TIKTOK_FAKE_GOOGLE", "0") == "1"
+FAKE_GOOGLE_LATENCY_MS = os.environ.get("TIKTOK_FAKE_LATENCY_MS", "0")   # '120', 'uniform:50:300', 'lognormal:200:0.5'
+FAKE_GOOGLE_ERROR_RATE = min(1.0, max(0.0, _env_float("TIKTOK_FAKE_ERROR_RATE", 0.0)))
+FAKE_GOOGLE_QUOTA_RPM = max(0, _env_int("TIKTOK_FAKE_QUOTA_RPM", 0))
+FAKE_GOOGLE_QUOTA_CPM = max(0, _env_int("TIKTOK_FAKE_QUOTA_CPM", 0))
+FAKE_GOOGLE_SEED = _env_int("TIKTOK_FAKE_SEED", 0)
@@ -0,0 +1,351 @@
+# app/modules/audio/chunker.py
+
+import re
+import bisect
+import hashlib
+from app.utils.debug import log_message
+
+# Prioridades de corte: cuanto mayor, mejor sitio para terminar un fragmento
+BREAK_SPACE = 0
+BREAK_CLAUSE = 1
+BREAK_SENTENCE = 2
+BREAK_PARAGRAPH = 3
+
+# Bytes que ocupa la envoltura <speak></speak> que se añade a cada fragmento SSML
+SSML_WRAPPER_BYTES = len(b"<speak></speak>")
+
+# Un fragmento sólo se corta en un sitio de menor prioridad si el de mayor prioridad
+# lo dejaría por debajo de esta fracción del límite (evita fragmentos diminutos)
+MIN_FILL_RATIO = 0.5
+
+# División estable: una oración es 'ancla' (corte preferido) si el hash de su contenido
+# es múltiplo de ANCHOR_MODULUS; por debajo de STABLE_MIN_FILL_RATIO del límite no se corta
+ANCHOR_MODULUS = 8
+STABLE_MIN_FILL_RATIO = 0.6
+
+# Patrones de corte sobre los bytes UTF-8. Cada uno termina en el grupo 'ws', que
+# contiene sólo el espacio en blanco: el fragmento acaba donde empieza ese grupo.
+_CLOSERS = rb"(?:[\"')\]]|\xc2\xbb|\xe2\x80\x9d)*"
+_BREAK_PATTERNS = {
+    BREAK_PARAGRAPH: rb"(?P<ws>[ \t\r\f\v]*\n[ \t\r\f\v]*\n)",
+    BREAK_SENTENCE: rb"(?:[.!?]|\xe2\x80\xa6)" + _CLOSERS + rb"(?P<ws>\s)",
+    BREAK_CLAUSE: rb"[,;:]" + _CLOSERS + rb"(?P<ws>\s)",
+    BREAK_SPACE: rb"(?P<ws>\s)",
+}
+# El prefijo '.*' codicioso hace que re.match encuentre la ÚLTIMA aparición dentro de
+# la ventana retrocediendo desde el final, todo en C y sin recorrer cada palabra en Python.
+_LAST_BREAK_RE = {
+    priority: re.compile(rb"(?s:.*)" + pattern)
+    for priority, pattern in _BREAK_PATTERNS.items()
+}
+# Final de oración o de párrafo seguido de espacio: la oración siguiente empieza tras el espacio.
+# Con lines=True (subtítulos, memoria de traducción) cada salto de línea es también un final.
+# Un signo seguido de minúscula ASCII en la misma línea ya se descarta aquí (ver
+# _continues_sentence), y la búsqueda anticipada del primer byte deja que re salte en C
+# todo lo que no puede empezar un final.
+_SENTENCE_END = (rb"(?:[.!?]|\xe2\x80\xa6)" + _CLOSERS
+                 + rb"(?P<ws>\s*\n\s*|[ \t\r\f\v]+(?![a-z\s]))")
+_SENTENCE_BOUNDARY_RE = re.compile(rb"(?=[.!?\xe2\n])(?:" + _SENTENCE_END + rb"|\n[ \t\r\f\v]*\n\s*)")
+_SENTENCE_OR_LINE_RE = re.compile(rb"(?=[.!?\xe2\n])(?:" + _SENTENCE_END + rb"|\n\s*)")
+# Palabra antes del punto: 'Mr.', 'Dr.', 'Sra.', 'A.' no terminan la oración
+_ABBREVIATION_RE = re.compile(rb"(?:^|[\s\"'(\[])(?:[A-Z][A-Za-z]?|Mrs|Sra|Srta|Dra|Prof)\.$")
+# Raya o comillas de apertura antes de la primera letra de la oración siguiente
+_OPENERS = "\u2014\u2013-\"'\u00ab\u201c"
+_PARAGRAPH_END_RE = re.compile(rb"[ \t\r\f\v]*\n[ \t\r\f\v]*\n")
+_MARK_TAG_RE = re.compile(rb"<mark\b[^<>]*/>")
+_WS_RE = re.compile(rb"\s*")
+_TAG_RE = re.compile(rb"<[^<>]*>")
+
+_SSML_TAG_RE = re.compile(
+    r"<\s*/?\s*(speak|say-as|break|emphasis|prosody|sub|phoneme|audio|mark|p|s|lang|voice)\b",
+    re.IGNORECASE,
+)
+_SPEAK_ROOT_RE = re.compile(r"^\s*<speak(?:\s[^>]*)?>(.*)</speak>\s*$", re.IGNORECASE | re.DOTALL)
+# Una etiqueta (se conserva), o un '&' que no empieza una entidad ('&amp;', '&#233;') o un
+# '<' o '>' sueltos del texto, que hay que escapar
+_SSML_TEXT_RE = re.compile(
+    r"(</?[A-Za-z][^<>]*>|<[!?][^<>]*>)|&(?!(?:[A-Za-z][A-Za-z0-9]*|#[0-9]+|#x[0-9A-Fa-f]+);)|[<>]"
+)
+_TEXT_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+_WHITESPACE = frozenset(b" \t\r\n\f\v")
+
+
+def has_ssml_markup(text):
+    """Indica si el texto contiene etiquetas SSML (por ejemplo las <say-as> de insert_say_as)."""
+    return bool(_SSML_TAG_RE.search(text))
+
+
+def strip_speak_root(text):
+    """Quita la etiqueta raíz <speak> si existe; cada fragmento se vuelve a envolver al sintetizar."""
+    match = _SPEAK_ROOT_RE.match(text)
+    return match.group(1) if match else text
+
+
+def escape_ssml_text(text):
+    """
+    Escapa '&', '<' y '>' en el texto que queda fuera de las etiquetas, como
+    timepoints.insert_sentence_marks escapa el texto plano. Las etiquetas y las
+    entidades ya escritas se dejan igual, así que escapar dos veces no cambia nada.
+    """
+    return _SSML_TEXT_RE.sub(lambda match: match.group(1) or _TEXT_ESCAPES[match.group()], text)
+
+
+def find_ssml_blocks(data):
+    """
+    Devuelve los intervalos (inicio, fin) de bytes que no se pueden partir en modo SSML.
+
+    Cada intervalo cubre un elemento completo de primer nivel (de la apertura al
+    cierre) o una etiqueta suelta como <break time="1s"/>. Un solo recorrido lineal.
+    """
+    blocks = []
+    depth = 0
+    block_start = None
+    for match in _TAG_RE.finditer(data):
+        tag = match.group()
+        if tag.startswith(b"</"):
+            if depth > 0:
+                depth -= 1
+                if depth == 0:
+                    blocks.append((block_start, match.end()))
+        elif tag.endswith(b"/>") or tag.startswith((b"<!", b"<?")):
+            if depth == 0:
+                blocks.append((match.start(), match.end()))
+        else:
+            if depth == 0:
+                block_start = match.start()
+            depth += 1
+    if depth > 0:
+        # Elemento sin cerrar: no se puede partir desde su apertura hasta el final
+        blocks.append((block_start, len(data)))
+    return blocks
+
+
+def _continues_sentence(data, ws_start, next_start):
+    """
+    Indica si un final de oración aparente (espacio en data[ws_start:next_start]) no lo
+    es: un punto de abreviatura ('Mr.', 'Dr.') o un signo seguido de minúscula en la
+    misma línea ('"¿De verdad?" dijo ella', '—¿Y ahora? —preguntó'). Los saltos de
+    línea siempre terminan la oración.
+    """
+    if next_start >= len(data) or b"\n" in data[ws_start:next_start]:
+        return False
+    if 0x61 <= data[next_start] <= 0x7A:
+        return True
+    # Sólo hace falta decodificar si lo que sigue no es ASCII (rayas, comillas, 'á', 'ñ'...)
+    if data[next_start] >= 0x80 or data[next_start] in b"\"'-":
+        following = data[next_start:next_start + 8].decode('utf-8', errors='ignore').lstrip(_OPENERS)
+        if following[:1].islower():
+            return True
+    # Basta con mirar la palabra anterior ('^' sólo coincide al principio real de data)
+    dot = ws_start - 1
+    return data[dot] == 0x2E and _ABBREVIATION_RE.search(data, max(0, dot - 6), ws_start) is not None
+
+
+def iter_sentence_starts(data, ssml=False, lines=False):
+    """
+    Genera las posiciones (bytes) donde empieza cada oración, sin construir una lista.
+
+    En modo SSML se descartan las que caen dentro de un elemento, para poder insertar
+    ahí etiquetas <mark/> sin romper el marcado. Con lines=True cada salto de línea
+    también termina la oración (no sólo los párrafos).
+    """
+    blocks = find_ssml_blocks(data) if ssml else []
+    block_starts = [block[0] for block in blocks]
+    first = _WS_RE.match(data, 0).end()
+    if first >= len(data):
+        return
+    yield first
+    boundary_re = _SENTENCE_OR_LINE_RE if lines else _SENTENCE_BOUNDARY_RE
+    for match in boundary_re.finditer(data, first):
+        pos = match.end()
+        if pos >= len(data):
+            break
+        ws_start = match.start('ws')
+        if ws_start != -1 and _continues_sentence(data, ws_start, pos):
+            continue
+        if blocks:
+            idx = bisect.bisect_right(block_starts, pos - 1) - 1
+            if idx >= 0 and blocks[idx][0] < pos < blocks[idx][1]:
+                continue
+        yield pos
+
+
+def sentence_starts(data, ssml=False, lines=False):
+    """Devuelve las posiciones (bytes) donde empieza cada oración (ver iter_sentence_starts)."""
+    return list(iter_sentence_starts(data, ssml, lines))
+
+
+def _char_boundary(data, pos):
+    """Retrocede hasta el inicio de un carácter UTF-8 para no partir un carácter multibyte."""
+    while pos > 0 and pos < len(data) and (data[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def _trimmed_span(data, start, end):
+    """Devuelve el intervalo sin espacios en blanco en los extremos, o None si queda vacío."""
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _last_break(data, priority, start, end, blocks, block_starts):
+    """
+    Busca el último corte de la prioridad dada cuyo contenido termine en (start, end].
+
+    Devuelve (fin_del_contenido, inicio_del_siguiente) o None. Si el corte cae dentro
+    de un bloque SSML se vuelve a buscar antes del inicio de ese bloque.
+    """
+    pattern = _LAST_BREAK_RE[priority]
+    while end > start:
+        match = pattern.match(data, start, end + 1)
+        if match is None:
+            return None
+        content_end = match.start('ws')
+        if content_end <= start:
+            return None
+        next_start = _WS_RE.match(data, content_end).end()
+        if priority == BREAK_SENTENCE and _continues_sentence(data, content_end, next_start):
+            # 'Mr. Smith', '"¿Sí?" dijo ella': se busca el final de oración anterior
+            end = content_end - 1
+            continue
+        if blocks:
+            idx = bisect.bisect_right(block_starts, content_end - 1) - 1
+            if idx >= 0 and blocks[idx][0] < content_end < blocks[idx][1]:
+                end = blocks[idx][0]
+                continue
+        return content_end, next_start
+    return None
+
+
+def split_spans(data, byte_limit, ssml=False):
+    """
+    Divide los bytes UTF-8 en intervalos (inicio, fin) de como mucho byte_limit bytes.
+
+    Se prefieren, por este orden, los cortes de párrafo, de oración, de cláusula y de
+    palabra. El coste es lineal: cada ventana de byte_limit bytes se examina un número
+    constante de veces y la ventana siguiente empieza en el corte elegido.
+    """
+    assert byte_limit > 0, "El límite de bytes debe ser mayor que cero."
+
+    blocks = find_ssml_blocks(data) if ssml else []
+    block_starts = [block[0] for block in blocks]
+    min_fill = int(byte_limit * MIN_FILL_RATIO)
+
+    spans = []
+    length = len(data)
+    start = _WS_RE.match(data, 0).end()
+
+    while length - start > byte_limit:
+        window_end = start + byte_limit
+        cut = None
+        fallback = None
+        for priority in (BREAK_PARAGRAPH, BREAK_SENTENCE, BREAK_CLAUSE, BREAK_SPACE):
+            found = _last_break(data, priority, start, window_end, blocks, block_starts)
+            if found is None:
+                continue
+            if found[0] - start >= min_fill:
+                cut = found
+                break
+            if fallback is None or found[0] > fallback[0]:
+                fallback = found
+        cut = cut or fallback
+
+        if cut is None:
+            if ssml and data.find(b"<", start, window_end) != -1:
+                raise ValueError(f"Un elemento SSML supera el límite de {byte_limit} bytes y no se puede dividir.")
+            # Una sola palabra más larga que el límite: corte duro en un límite de carácter
+            end = _char_boundary(data, window_end)
+            log_message("warning", f"Corte forzado dentro de una palabra en el byte {end}.")
+            cut = (end, end)
+
+        span = _trimmed_span(data, start, cut[0])
+        if span:
+            spans.append(span)
+        start = cut[1]
+
+    span = _trimmed_span(data, start, length)
+    if span:
+        spans.append(span)
+    return spans
+
+
+def _is_anchor(sentence):
+    """Decide por el contenido (sin marcas <mark/>) si una oración es un corte preferido."""
+    digest = hashlib.blake2b(_MARK_TAG_RE.sub(b"", sentence).strip(), digest_size=4).digest()
+    return int.from_bytes(digest, 'big') % ANCHOR_MODULUS == 0
+
+
+def stable_spans(data, byte_limit, ssml=False):
+    """
+    Divide como split_spans, pero con cortes definidos por el contenido.
+
+    Los fragmentos se forman con oraciones completas y se cortan tras una oración ancla
+    o un final de párrafo (una vez superado el mínimo de llenado), o antes de superar
+    el límite. Cada corte depende sólo del texto desde el corte anterior, así que una
+    edición sólo cambia los fragmentos hasta la siguiente ancla: los demás conservan
+    su texto exacto y se pueden reutilizar sin volver a sintetizarlos.
+    """
+    assert byte_limit > 0, "El límite de bytes debe ser mayor que cero."
+
+    starts = sentence_starts(data, ssml=ssml)
+    min_fill = int(byte_limit * STABLE_MIN_FILL_RATIO)
+    spans = []
+    chunk_start = None
+
+    def close(end):
+        span = _trimmed_span(data, chunk_start, end)
+        if span:
+            spans.append(span)
+
+    for number, start in enumerate(starts):
+        end = starts[number + 1] if number + 1 < len(starts) else len(data)
+        sentence = _trimmed_span(data, start, end)
+        if sentence is None:
+            continue
+
+        if chunk_start is not None and sentence[1] - chunk_start > byte_limit:
+            close(start)
+            chunk_start = None
+
+        if chunk_start is None:
+            if sentence[1] - sentence[0] > byte_limit:
+                # Una oración más larga que el límite se divide con el algoritmo normal
+                spans.extend((a + start, b + start) for a, b in split_spans(data[start:end], byte_limit, ssml))
+                continue
+            chunk_start = start
+
+        if sentence[1] - chunk_start >= min_fill and (
+                _PARAGRAPH_END_RE.search(data, sentence[1], end) or _is_anchor(data[start:end])):
+            close(end)
+            chunk_start = None
+
+    if chunk_start is not None:
+        close(len(data))
+    return spans
+
+
+def chunk_text(text, byte_limit, ssml=None, stable=False):
+    """
+    Prepara el texto y devuelve (datos, intervalos, es_ssml).
+
+    'datos' es la única codificación UTF-8 del texto y 'intervalos' las posiciones de
+    cada fragmento dentro de ella; el texto de un fragmento se obtiene con
+    datos[inicio:fin].decode('utf-8') sólo cuando hace falta. Con stable=True los cortes
+    los decide el contenido (ver stable_spans) en lugar de llenar cada fragmento al máximo.
+    """
+    assert text, "El texto no puede estar vacío."
+    if ssml is None:
+        ssml = has_ssml_markup(text)
+    if ssml:
+        # El texto alrededor de las etiquetas (<say-as>, <mark/>) debe ser XML válido
+        text = escape_ssml_text(strip_speak_root(text))
+        byte_limit -= SSML_WRAPPER_BYTES
+    data = text.encode('utf-8')
+    spans = (stable_spans if stable else split_spans)(data, byte_limit, ssml=ssml)
+    log_message("debug", f"Texto de {len(data)} bytes dividido en {len(spans)} fragmentos "
+                         f"(SSML={ssml}, estable={stable}).")
+    return data, spans, ssml
@@ -2,16 +2,33 @@
 
 import os
 import glob
-import ffmpeg
-from google.cloud import texttospeech
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from app.utils.directories import get_data_dir, get_tmp_dir
+from app.utils.directories import get_tmp_dir, with_job_context
+from app.utils.manifest import manifest_path, load_manifest, record_output, file_sha256
 from app.utils.debug import log_message
+from app.utils.startup import lazy_import
 from app.modules.messages import show_status_message
 from app.config.credentials import GoogleCloudAPIManager
-
-# Inicializar el manejador de API de Google Cloud
-google_cloud_manager = GoogleCloudAPIManager()
+from app.config.settings import (
+    TTS_MAX_CONCURRENT_REQUESTS,
+    TTS_AUDIO_ENCODING,
+    TTS_SAMPLE_RATE,
+    TTS_SILENCE_MS,
+    TTS_CROSSFADE_MS,
+    TTS_SUBTITLE_MARKS,
+    TTS_STABLE_CHUNKS,
+)
+from app.modules.audio.tts_cache import TTSCache, make_cache_key
+from app.modules.audio.segment_store import SegmentStore
+from app.modules.audio.chunker import chunk_text, has_ssml_markup
+from app.modules.audio.ffmpeg_stream import FFmpegStreamWriter, strip_id3, mp3_duration
+from app.modules.audio.timepoints import insert_sentence_marks, localize_marks, build_cues
+
+# El SDK de Text-to-Speech se importa al crear la primera petición, no al importar este módulo
+texttospeech = lazy_import('google.cloud.texttospeech')
+texttospeech_v1beta1 = lazy_import('google.cloud.texttospeech_v1beta1')
 
 def delete_temp_mp3_files(temp_dir):
     """Borra todos los archivos temporales .mp3 del directorio temporal."""
@@ -38,108 +55,345 @@ def delete_temp_mp3_files(temp_dir):
             log_message("error", f"No se pudo eliminar el archivo {mp3_file}: {e}", exc_info=True)
             print(f"No se pudo eliminar el archivo {mp3_file}: {e}")
 
-def convert_text(parent):
-    BYTE_LIMIT = 5000  # Límite de bytes en lugar de caracteres
-    client = google_cloud_manager.get_client('texttospeech')
-
-    data_dir = get_data_dir()
-    temp_dir = get_tmp_dir()
-
-    print(f"Directorio de datos: {data_dir}")
-    print(f"Directorio temporal: {temp_dir}")
-
-    delete_temp_mp3_files(temp_dir)
-
-    text_file_path = os.path.join(data_dir, 'text_for_user.txt')
-    voice_file_path = os.path.join(data_dir, 'voice_config.txt')
-    country_id_file_path = os.path.join(data_dir, 'country_code.txt')
-    gender_mf_file_path = os.path.join(data_dir, 'gender.txt')
-    speed_file_path = os.path.join(data_dir, 'speed.txt')
-    pitch_file_path = os.path.join(data_dir, 'pitch.txt')
-
-    try:
-        show_status_message("Leyendo archivo para convertir...", "info")
-        print("Leyendo archivo para convertir...")
-
-        with open(text_file_path, 'r', encoding='utf-8') as file:
-            text = file.read().strip()
-            print(f"Texto leído: {text[:50]}...")  # Muestra los primeros 50 caracteres
-
-        with open(voice_file_path, 'r', encoding='utf-8') as file:
-            voice_name = file.read().strip()
-            print(f"Nombre de la voz: {voice_name}")
-
-        with open(country_id_file_path, 'r', encoding='utf-8') as file:
-            country_id = file.read().strip()
-            print(f"Código de país: {country_id}")
-
-        with open(gender_mf_file_path, 'r', encoding='utf-8') as file:
-            gender_mf = file.read().strip()
-            print(f"Género: {gender_mf}")
-
-        with open(speed_file_path, 'r', encoding='utf-8') as file:
-            speaking_rate = float(file.read().strip())
-            print(f"Velocidad de habla: {speaking_rate}")
+def synthesize_chunks(client, text_chunks, voice_params, audio_config, max_workers=None,
+                      cache=None, cache_params=None, ssml=False, time_pointing=False):
+    """
+    Sintetiza los fragmentos en paralelo con un límite de peticiones simultáneas.
+
+    Devuelve un generador de tuplas (índice, audio, marcas) en el orden original de los
+    fragmentos: cada audio se entrega en cuanto él y todos los anteriores han terminado.
+    Si se indica una caché, los fragmentos ya sintetizados con la misma configuración
+    (cache_params) se sirven desde disco sin llamar a la API. Con ssml=True cada
+    fragmento se envuelve en <speak> y se envía como SSML.
+
+    Con time_pointing=True (cliente, voz y audio de texttospeech_v1beta1) se piden los
+    instantes de las etiquetas <mark/>: 'marcas' es [(nombre, segundos), ...] relativo
+    al inicio del fragmento; en otro caso es None.
+    """
+    if max_workers is None:
+        max_workers = TTS_MAX_CONCURRENT_REQUESTS
+    max_workers = max(1, min(max_workers, len(text_chunks)))
+
+    if ssml:
+        text_chunks = [f"<speak>{chunk}</speak>" for chunk in text_chunks]
+
+    keys = [None] * len(text_chunks)
+    cached = [None] * len(text_chunks)
+    cached_marks = [None] * len(text_chunks)
+    if cache is not None and cache_params is not None:
+        for idx, chunk in enumerate(text_chunks):
+            keys[idx] = make_cache_key(chunk, **cache_params)
+            if time_pointing:
+                cached[idx], cached_marks[idx] = cache.get(keys[idx], with_meta=True)
+            else:
+                cached[idx] = cache.get(keys[idx])
 
-        with open(pitch_file_path, 'r', encoding='utf-8') as file:
-            speaking_pitch = int(file.read().strip())
-            print(f"Tono de voz: {speaking_pitch}")
+    pending = sum(1 for audio in cached if audio is None)
+    log_message("info", f"Sintetizando {pending}/{len(text_chunks)} fragmentos con {max_workers} peticiones simultáneas.")
 
-        assert text, "El archivo 'text_for_user.txt' está vacío."
-        assert voice_name, "El archivo 'voice_config.txt' está vacío."
+    tts = texttospeech_v1beta1 if time_pointing else texttospeech
 
-        # Configuración de voz y audio
-        voice_params = texttospeech.VoiceSelectionParams(
-            language_code=country_id,
-            name=voice_name,
-            ssml_gender=texttospeech.SsmlVoiceGender[gender_mf.upper()]
+    def synthesize(idx, chunk):
+        input_text = tts.SynthesisInput(ssml=chunk) if ssml else tts.SynthesisInput(text=chunk)
+        if not time_pointing:
+            response = client.synthesize_speech(input=input_text, voice=voice_params, audio_config=audio_config)
+            if cache is not None and keys[idx] is not None:
+                cache.put(keys[idx], response.audio_content)
+            return response.audio_content, None
+
+        request = tts.SynthesizeSpeechRequest(
+            input=input_text,
+            voice=voice_params,
+            audio_config=audio_config,
+            enable_time_pointing=[tts.SynthesizeSpeechRequest.TimepointType.SSML_MARK],
         )
-        print(f"Parámetros de voz: {voice_params}")
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
+        response = client.synthesize_speech(request=request)
+        marks = [(point.mark_name, point.time_seconds) for point in response.timepoints]
+        if cache is not None and keys[idx] is not None:
+            cache.put(keys[idx], response.audio_content, meta=marks)
+        return response.audio_content, marks
+
+    synthesize = with_job_context(synthesize)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts") as executor:
+        futures = [
+            executor.submit(synthesize, idx, chunk) if cached[idx] is None else None
+            for idx, chunk in enumerate(text_chunks)
+        ]
+        try:
+            for idx, future in enumerate(futures):
+                if future is None:
+                    yield idx, cached[idx], cached_marks[idx]
+                else:
+                    yield (idx, *future.result())
+        finally:
+            # Si se interrumpe la iteración, no lanzar los fragmentos pendientes
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+
+def synthesize_text_to_file(text, voice_name, language_code, gender, speaking_rate, pitch, output_path,
+                            max_workers=None, use_cache=True, audio_encoding=None, silence_ms=None,
+                            crossfade_ms=None, on_segment=None, byte_limit=5000, subtitle_marks=None,
+                            segments_dir=None):
+    """
+    Sintetiza un texto completo en un archivo de audio, sin depender de la interfaz ni de data/.
+
+    Es el núcleo que comparten convert_text (interfaz) y el procesamiento por lotes.
+    Devuelve un diccionario con la ruta, la codificación, el número de fragmentos, la
+    duración total, los tiempos de cada fragmento y, con subtitle_marks, los subtítulos
+    exactos de cada oración ('cues'); o None si no se generó audio. Los errores se
+    propagan al llamador.
+
+    Con segments_dir se guardan ahí los fragmentos de esta conversión: al volver a
+    convertir el texto editado sólo se sintetizan los fragmentos que cambiaron.
+    """
+    assert text, "El texto a convertir está vacío."
+    assert voice_name, "No se indicó ninguna voz."
+
+    # Con marcas por oración se usa la API v1beta1, la única que devuelve sus instantes
+    subtitle_marks = TTS_SUBTITLE_MARKS if subtitle_marks is None else subtitle_marks
+    tts = texttospeech_v1beta1 if subtitle_marks else texttospeech
+    google_cloud_manager = GoogleCloudAPIManager()
+    client = google_cloud_manager.get_client('texttospeech_v1beta1' if subtitle_marks else 'texttospeech')
+    assert client, "No se pudo obtener el cliente de Text-to-Speech."
+
+    # Configuración de voz y audio
+    voice_params = tts.VoiceSelectionParams(
+        language_code=language_code,
+        name=voice_name,
+        ssml_gender=tts.SsmlVoiceGender[gender.upper()]
+    )
+    print(f"Parámetros de voz: {voice_params}")
+
+    # MP3: se unen las tramas comprimidas. LINEAR16: se pide PCM, se une con NumPy
+    # (silencio y fundidos configurables) y se codifica a MP3 en una sola pasada
+    audio_encoding = (audio_encoding or TTS_AUDIO_ENCODING).upper()
+    assert audio_encoding in ('MP3', 'LINEAR16'), f"Codificación de audio no soportada: {audio_encoding}"
+    pcm_mode = audio_encoding == 'LINEAR16'
+
+    if pcm_mode:
+        audio_config = tts.AudioConfig(
+            audio_encoding=tts.AudioEncoding.LINEAR16,
+            sample_rate_hertz=TTS_SAMPLE_RATE,
             speaking_rate=speaking_rate,
-            pitch=speaking_pitch / 100.0
+            pitch=pitch / 100.0
         )
-        print(f"Configuración de audio: {audio_config}")
-
-        # Dividir el texto si es necesario por bytes
-        text_chunks = split_text_by_bytes(text, BYTE_LIMIT)
-        print(f"Fragmentos de texto generados: {len(text_chunks)}")
-
-        audio_segments = []
-        for idx, chunk in enumerate(text_chunks):
-            input_text = texttospeech.SynthesisInput(text=chunk)
-            show_status_message("Convirtiendo audio...", "info")
+    else:
+        audio_config = tts.AudioConfig(
+            audio_encoding=tts.AudioEncoding.MP3,
+            speaking_rate=speaking_rate,
+            pitch=pitch / 100.0
+        )
+    print(f"Configuración de audio: {audio_config}")
+
+    # Marcar el inicio de cada oración antes de dividir: las marcas cuentan para el límite
+    # de bytes y nunca se parten. Cada fragmento usa después nombres locales ('0', '1'...)
+    ssml = has_ssml_markup(text)
+    if subtitle_marks:
+        text, sentences = insert_sentence_marks(text, ssml)
+        ssml = True
+
+    # Dividir el texto si es necesario por bytes
+    text_chunks = split_text_by_bytes(text, byte_limit)
+    print(f"Fragmentos de texto generados: {len(text_chunks)}")
+
+    chunk_sentence_ids = []
+    if subtitle_marks:
+        localized = [localize_marks(chunk) for chunk in text_chunks]
+        text_chunks = [chunk for chunk, _ in localized]
+        chunk_sentence_ids = [ids for _, ids in localized]
+
+    # Caché en disco: misma configuración de voz y mismo texto => mismo audio.
+    # Los fragmentos de la conversión anterior se consultan primero (segments_dir)
+    cache = TTSCache() if use_cache else None
+    store = SegmentStore(segments_dir, fallback=cache) if use_cache and segments_dir else None
+    cache_params = {
+        'voice_name': voice_name,
+        'language_code': language_code,
+        'gender': gender,
+        'speaking_rate': speaking_rate,
+        'pitch': pitch,
+        'audio_encoding': f"LINEAR16@{TTS_SAMPLE_RATE}" if pcm_mode else 'MP3',
+    }
+
+    # Los fragmentos se envían a un único proceso ffmpeg en cuanto llegan (en orden);
+    # se escribe en un archivo parcial y sólo se renombra cuando ffmpeg termina bien
+    root, extension = os.path.splitext(str(output_path))
+    partial_audio_path = f"{root}.part{extension or '.mp3'}"
+
+    assembler = None
+    if pcm_mode:
+        from app.modules.audio.pcm_assembly import PCMAssembler, decode_linear16, log_assembly_summary
+        assembler = PCMAssembler(
+            TTS_SAMPLE_RATE,
+            silence_ms=TTS_SILENCE_MS if silence_ms is None else silence_ms,
+            crossfade_ms=TTS_CROSSFADE_MS if crossfade_ms is None else crossfade_ms,
+        )
+        writer = FFmpegStreamWriter(
+            partial_audio_path,
+            input_format='s16le',
+            input_args=('-ar', str(TTS_SAMPLE_RATE), '-ac', '1'),
+            output_args=('-c:a', 'libmp3lame', '-q:a', '2'),
+        )
+    else:
+        writer = FFmpegStreamWriter(partial_audio_path)
+
+    segments_written = 0
+    chunk_marks = []
+    mp3_starts, mp3_durations = [], []
+    pcm_chunks = []
+    show_status_message("Convirtiendo audio...", "info")
+    try:
+        for idx, audio_content, marks in synthesize_chunks(client, text_chunks, voice_params, audio_config,
+                                                            max_workers, cache=store or cache,
+                                                            cache_params=cache_params,
+                                                            ssml=ssml, time_pointing=subtitle_marks):
             print(f"Convirtiendo audio... Fragmento {idx+1}/{len(text_chunks)}")
-
-            response = client.synthesize_speech(input=input_text, voice=voice_params, audio_config=audio_config)
-
-            if response.audio_content:
-                temp_file_path = os.path.join(temp_dir, f"temp_audio_{idx}.mp3")
-                with open(temp_file_path, 'wb') as temp_file:
-                    temp_file.write(response.audio_content)
-                    audio_segments.append(temp_file_path)
-                    print(f"Archivo temporal creado: {temp_file_path}")
+            chunk_marks.append(marks)
+
+            if audio_content and assembler is not None:
+                samples, _ = decode_linear16(audio_content, TTS_SAMPLE_RATE)
+                pcm_bytes = assembler.add(samples).tobytes()
+                pcm_chunks.append(idx)
+                writer.write(pcm_bytes)
+                segments_written += 1
+                if on_segment is not None:
+                    on_segment(pcm_bytes, TTS_SAMPLE_RATE)
+            elif audio_content:
+                mp3_bytes = strip_id3(audio_content)
+                # Duración leyendo las cabeceras de las tramas: no hace falta sondear el archivo final
+                mp3_starts.append(sum(mp3_durations))
+                mp3_durations.append(mp3_duration(mp3_bytes))
+                writer.write(mp3_bytes)
+                segments_written += 1
+                if on_segment is not None:
+                    on_segment(mp3_bytes, None)
             else:
                 log_message("warning", "Respuesta de síntesis de voz vacía.")
                 print("Respuesta de síntesis de voz vacía.")
+                if assembler is None:
+                    mp3_starts.append(sum(mp3_durations))
+                    mp3_durations.append(0.0)
+
+        if segments_written:
+            if assembler is not None:
+                pcm_bytes = assembler.finish().tobytes()
+                writer.write(pcm_bytes)
+                if on_segment is not None:
+                    on_segment(pcm_bytes, TTS_SAMPLE_RATE)
+            writer.close()
+            os.replace(partial_audio_path, output_path)
+            if store is not None:
+                store.commit()
+        else:
+            writer.abort()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if cache is not None:
+            cache.flush()
+            log_message("info", f"Estadísticas de la caché TTS: {cache.get_stats()}")
+        log_message("info", f"Estadísticas del limitador de la API: {google_cloud_manager.get_rate_limit_stats()}")
+        log_message("debug", f"Latencia por canal gRPC: {google_cloud_manager.get_channel_stats()}")
+
+    if not segments_written:
+        return None
 
-        # Si se generaron múltiples fragmentos, combinarlos
-        if len(audio_segments) > 1:
-            # Llama a combine_audio_files_ffmpeg() para concatenar los archivos
-            combine_audio_files_ffmpeg()
-            show_status_message("El texto se convirtio con éxito a audio.", "success")
-            return
-        elif audio_segments:
-            print("Un solo archivo de audio generado.")
-            show_status_message("El texto se convirtio con éxito a audio.", "success")
-            # Lógica para cambiar el nombre del archivo generado
-            # Suponiendo que el archivo se genera como 'temp_audio_2.mp3', lo renombramos a 'final_temp_audio.mp3'
-            final_audio_path = os.path.join(temp_dir, 'final_temp_audio.mp3')
-            os.rename(audio_segments[0], final_audio_path)
+    result = {
+        'path': str(output_path),
+        'encoding': audio_encoding,
+        'chunks': len(text_chunks),
+        'segments': segments_written,
+        'duration_ms': None,
+        'chunk_timings': None,
+        'cues': None,
+        'segment_stats': store.get_stats() if store is not None else None,
+    }
+    if assembler is not None:
+        # Duraciones exactas a partir de las muestras: las etapas siguientes no necesitan sondear el audio
+        log_assembly_summary(assembler)
+        result['duration_ms'] = int(round(assembler.total_duration * 1000))
+        result['chunk_timings'] = assembler.chunk_timings()
+    else:
+        result['duration_ms'] = int(round(sum(mp3_durations) * 1000))
+        result['chunk_timings'] = [
+            {'start': start, 'duration': duration} for start, duration in zip(mp3_starts, mp3_durations)
+        ]
+
+    if subtitle_marks:
+        # En LINEAR16 sólo los fragmentos con audio tienen tiempos en el ensamblador
+        timings = result['chunk_timings']
+        if assembler is not None:
+            chunk_sentence_ids = [chunk_sentence_ids[idx] for idx in pcm_chunks]
+            chunk_marks = [chunk_marks[idx] for idx in pcm_chunks]
+        result['cues'] = build_cues(
+            sentences, chunk_sentence_ids, chunk_marks,
+            [timing['start'] for timing in timings], [timing['duration'] for timing in timings],
+        )
+        log_message("info", f"Subtítulos exactos: {len(result['cues'])} oraciones con marca de tiempo.")
+    return result
+
+def convert_text(parent, max_workers=None, use_cache=True, audio_encoding=None,
+                 silence_ms=None, crossfade_ms=None, on_segment=None):
+    """
+    Convierte el texto configurado en el manifiesto del trabajo a audio en tmp/final_temp_audio.mp3
+    y guarda en el manifiesto la duración, los tiempos de cada fragmento y los subtítulos exactos.
+
+    on_segment(audio_bytes, sample_rate), si se indica, recibe el audio en orden a
+    medida que se genera (para la vista previa progresiva): fragmentos MP3 completos
+    con sample_rate=None, o PCM s16le mono ya ensamblado con su frecuencia de muestreo.
+    """
+    BYTE_LIMIT = 5000  # Límite de bytes en lugar de caracteres
+    temp_dir = get_tmp_dir()
+
+    print(f"Manifiesto del trabajo: {manifest_path()}")
+    print(f"Directorio temporal: {temp_dir}")
+
+    delete_temp_mp3_files(temp_dir)
+
+    try:
+        show_status_message("Leyendo configuración para convertir...", "info")
+        print("Leyendo configuración para convertir...")
+
+        settings = load_manifest()['settings']
+        text = (settings.get('text') or "").strip()
+        voice_name = settings.get('voice_name')
+        country_id = settings.get('language_code')
+        gender_mf = settings.get('gender')
+        speaking_rate = float(settings.get('speaking_rate', 1.0))
+        speaking_pitch = int(settings.get('pitch', 0))
+        print(f"Texto leído: {text[:50]}...")  # Muestra los primeros 50 caracteres
+        print(f"Voz: {voice_name}, código de país: {country_id}, género: {gender_mf}, "
+              f"velocidad: {speaking_rate}, tono: {speaking_pitch}")
+
+        assert text, "El manifiesto no contiene texto para convertir."
+        assert voice_name, "El manifiesto no contiene ninguna voz configurada."
+
+        final_audio_path = os.path.join(temp_dir, 'final_temp_audio.mp3')
+        start = time.perf_counter()
+        result = synthesize_text_to_file(
+            text, voice_name, country_id, gender_mf, speaking_rate, speaking_pitch, final_audio_path,
+            max_workers=max_workers, use_cache=use_cache, audio_encoding=audio_encoding,
+            silence_ms=silence_ms, crossfade_ms=crossfade_ms, on_segment=on_segment, byte_limit=BYTE_LIMIT,
+            segments_dir=os.path.join(temp_dir, 'segments'),
+        )
 
-            return final_audio_path  # Devolver el nuevo nombre del archivo
+        if result:
+            # Una sola escritura atómica con todo lo que necesitan los pasos siguientes
+            record_output('tts', {
+                'path': final_audio_path,
+                'encoding': result['encoding'],
+                'chunks': result['chunks'],
+                'duration_ms': result['duration_ms'],
+                'chunk_timings': result['chunk_timings'],
+                'cues': result['cues'],
+                'audio_sha256': file_sha256(final_audio_path),
+            }, elapsed=time.perf_counter() - start)
+
+            print(f"Audio final generado a partir de {result['segments']} fragmentos: {final_audio_path}")
+            show_status_message("El texto se convirtio con éxito a audio.", "success")
+            return final_audio_path
         else:
             show_status_message("No se generaron archivos de audio.", "error")
             print("No se generaron archivos de audio.")
@@ -163,42 +417,19 @@ def convert_text(parent):
         print(f"Error al convertir el texto: {str(e)}")
         return None
 
-import os
-
 def split_text_by_bytes(text, byte_limit):
-    """Divide el texto en fragmentos respetando el límite de bytes (UTF-8) y guarda las rutas en input.txt."""
+    """
+    Divide el texto en fragmentos respetando el límite de bytes (UTF-8).
+
+    La división la hace chunk_text (app/modules/audio/chunker.py): un único recorrido
+    lineal que prefiere cortes de párrafo y de oración y nunca parte un elemento SSML.
+    """
     try:
         assert text, "El texto no puede estar vacío."
         assert byte_limit > 0, "El límite de bytes debe ser mayor que cero."
 
-        current_chunk = ""
-        chunks = []
-        current_size = 0
-
-        for word in text.split():
-            word_size = len(word.encode('utf-8')) + 1  # +1 por el espacio
-
-            if current_size + word_size > byte_limit:
-                # Agrega el fragmento actual a la lista
-                chunks.append(current_chunk.strip())
-                # Comienza un nuevo fragmento con la palabra actual
-                current_chunk = word + " "
-                current_size = word_size
-            else:
-                # Agrega la palabra actual al fragmento
-                current_chunk += word + " "
-                current_size += word_size
-
-        # Agrega el último fragmento si no está vacío
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-
-        # Guarda las rutas de los archivos en input.txt
-        temp_input_path = os.path.join(get_tmp_dir(), 'input.txt')
-        with open(temp_input_path, 'w', encoding='utf-8') as file:
-            for i, chunk in enumerate(chunks):
-                # Asumiendo que los nombres de archivos son secuenciales
-                file.write(f"file 'C:/Users/sabishi/PycharmProjects/tiktok_stories/tmp/temp_audio_{i}.mp3' \n")
+        data, spans, _ = chunk_text(text, byte_limit, stable=TTS_STABLE_CHUNKS)
+        chunks = [data[start:end].decode('utf-8') for start, end in spans]
 
         log_message("info", f"Número total de fragmentos: {len(chunks)}")
         print(f"Número total de fragmentos: {len(chunks)}")
@@ -208,25 +439,3 @@ def split_text_by_bytes(text, byte_limit):
         log_message("error", str(e), exc_info=True)
         print(f"Error: {str(e)}")
         return []
-
-def combine_audio_files_ffmpeg():
-    """Combina múltiples archivos de audio utilizando FFmpeg."""
-    try:
-
-        # Crear un archivo de texto para los segmentos de audio
-        output_file = os.path.join(get_tmp_dir(), 'final_temp_audio.mp3')
-        input_txt_path = os.path.join(get_tmp_dir(), 'input.txt')
-
-        # Construir el comando para FFmpeg
-        cmd = f"ffmpeg -f concat -safe 0 -i {input_txt_path} -c copy {output_file}"
-        print(f"Ejecutando comando: {cmd}")
-        os.system(cmd)
-
-    except AssertionError as e:
-        log_message("error", f"Error de aserción en combine_audio_files_ffmpeg: {e}", exc_info=True)
-        print(f"Error de aserción en combine_audio_files_ffmpeg: {str(e)}")
-
-    except Exception as e:
-        log_message("error", f"Error inesperado en combine_audio_files_ffmpeg: {str(e)}", exc_info=True)
-        print(f"Error inesperado en combine_audio_files_ffmpeg: {str(e)}")
-
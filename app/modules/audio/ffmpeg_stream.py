@@ -0,0 +1,185 @@
+# app/modules/audio/ffmpeg_stream.py
+
+import os
+import threading
+import subprocess
+
+from app.utils.debug import log_message
+
+
+def id3_size(header):
+    """Bytes que ocupa la etiqueta ID3v2 al comienzo de un MP3 (0 si no la hay), a partir de sus 10 primeros bytes."""
+    if len(header) >= 10 and header[:3] == b"ID3":
+        size = ((header[6] & 0x7F) << 21) | ((header[7] & 0x7F) << 14) \
+            | ((header[8] & 0x7F) << 7) | (header[9] & 0x7F)
+        footer = 10 if header[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def strip_id3(audio_content):
+    """Quita la cabecera ID3v2 inicial de un MP3 para poder concatenar los fragmentos en un solo flujo."""
+    size = id3_size(audio_content[:10])
+    return audio_content[size:] if size else audio_content
+
+
+# Tablas de cabecera MPEG Layer III: (versión) -> bitrates en kbps y frecuencias en Hz
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_frame_header(data, pos=0):
+    """
+    Lee la cabecera de la trama MP3 (Layer III) que empieza en data[pos].
+
+    Devuelve un diccionario con 'length' (bytes de la trama), 'samples', 'sample_rate',
+    'bitrate' (bps), 'channels' y 'version' (3 = MPEG-1), o None si no es una cabecera válida.
+    """
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 0x03
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or ((b1 >> 1) & 0x03) != 1 or version == 1:
+        return None
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[3 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    frame_samples = 1152 if version == 3 else 576
+    padding = (b2 >> 1) & 0x01
+    return {
+        'length': frame_samples // 8 * bitrate // sample_rate + padding,
+        'samples': frame_samples,
+        'sample_rate': sample_rate,
+        'bitrate': bitrate,
+        'channels': 1 if (b3 >> 6) == 3 else 2,
+        'version': version,
+    }
+
+
+def mp3_duration(audio_content):
+    """
+    Duración en segundos de un MP3 recorriendo las cabeceras de sus tramas, sin decodificar.
+
+    Sólo admite Layer III (lo que devuelve Text-to-Speech); se detiene en el primer byte
+    que no sea una cabecera válida.
+    """
+    data = strip_id3(audio_content)
+    pos = 0
+    seconds = 0.0
+    while True:
+        frame = mp3_frame_header(data, pos)
+        if frame is None:
+            break
+        seconds += frame['samples'] / float(frame['sample_rate'])
+        pos += frame['length']
+    return seconds
+
+
+def decode_mp3_to_pcm(audio_content, sample_rate):
+    """
+    Decodifica un fragmento MP3 a PCM s16le mono con la frecuencia indicada (ffmpeg por
+    tuberías, sin archivos temporales). Se usa para reproducir la vista previa como un
+    único flujo PCM continuo.
+    """
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-f', 'mp3', '-i', 'pipe:0',
+         '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+        input=audio_content,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode('utf-8', errors='replace').strip()
+        raise RuntimeError(f"ffmpeg no pudo decodificar el MP3: {stderr}")
+    return result.stdout
+
+
+class FFmpegStreamWriter:
+    """
+    Proceso ffmpeg de larga duración que recibe audio por stdin y escribe un único archivo.
+
+    El comando se construye como lista de argumentos (sin shell), así que las rutas con
+    espacios o comillas no necesitan escaparse. Los fragmentos se escriben en cuanto
+    llegan y ffmpeg los une al vuelo, sin archivos temporales intermedios.
+    """
+
+    def __init__(self, output_path, input_format='mp3', input_args=(), output_args=('-c', 'copy'),
+                 output_format='mp3'):
+        self.output_path = str(output_path)
+        self.argv = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+            *input_args, '-f', input_format, '-i', 'pipe:0',
+            *output_args, '-f', output_format, self.output_path,
+        ]
+        log_message("debug", f"Iniciando ffmpeg: {self.argv}")
+        self.process = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self.bytes_written = 0
+
+        # Leer stderr en segundo plano para que ffmpeg nunca se bloquee al escribir en él
+        self._stderr_chunks = []
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr_chunks.append(line)
+
+    @property
+    def stderr(self):
+        return b"".join(self._stderr_chunks).decode('utf-8', errors='replace')
+
+    def write(self, data):
+        """Envía un fragmento de audio a ffmpeg."""
+        try:
+            self.process.stdin.write(data)
+            self.bytes_written += len(data)
+        except BrokenPipeError:
+            self.process.wait()
+            raise RuntimeError(f"ffmpeg terminó antes de tiempo: {self.stderr.strip()}")
+
+    def close(self):
+        """Cierra la entrada, espera a que ffmpeg termine y comprueba el resultado."""
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        self._stderr_thread.join(timeout=5)
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg terminó con código {returncode}: {self.stderr.strip()}")
+        log_message("info", f"ffmpeg escribió {self.output_path} a partir de {self.bytes_written} bytes.")
+        return self.output_path
+
+    def abort(self):
+        """Detiene ffmpeg y elimina la salida parcial."""
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.wait()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+        log_message("warning", f"Escritura con ffmpeg cancelada: {self.output_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,126 @@
+# app/modules/audio/pcm_assembly.py
+
+import io
+import wave
+import numpy as np
+
+from app.utils.debug import log_message
+
+
+def decode_linear16(audio_content, sample_rate=None):
+    """
+    Convierte la respuesta LINEAR16 de Text-to-Speech en un array int16 mono.
+
+    La API devuelve un WAV completo (cabecera RIFF); si no hay cabecera se interpreta
+    como PCM crudo de 16 bits con la frecuencia indicada. Devuelve (muestras, frecuencia).
+    """
+    if audio_content[:4] == b"RIFF":
+        with wave.open(io.BytesIO(audio_content), 'rb') as wav:
+            assert wav.getsampwidth() == 2, "Se esperaba audio PCM de 16 bits."
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    else:
+        assert sample_rate, "Audio PCM sin cabecera: es necesario indicar la frecuencia de muestreo."
+        rate = sample_rate
+        samples = np.frombuffer(audio_content[:len(audio_content) - len(audio_content) % 2], dtype='<i2')
+
+    if sample_rate and rate != sample_rate:
+        raise ValueError(f"Frecuencia de muestreo inesperada: {rate} Hz (se esperaba {sample_rate} Hz).")
+    return samples, rate
+
+
+class PCMAssembler:
+    """
+    Une fragmentos PCM con precisión de muestra, con silencio y fundidos entre fragmentos.
+
+    Funciona en modo continuo: add() devuelve las muestras que ya son definitivas para
+    que se puedan enviar al codificador mientras siguen llegando fragmentos. Sólo se
+    retienen las últimas muestras de cada fragmento (las del fundido con el siguiente).
+
+    - Con silencio > 0: el final de un fragmento se funde a cero, se insertan las muestras
+      de silencio y el principio del siguiente se funde desde cero.
+    - Sin silencio: los dos fragmentos se solapan y se mezclan (fundido cruzado).
+    """
+
+    def __init__(self, sample_rate, silence_ms=0, crossfade_ms=0):
+        self.sample_rate = sample_rate
+        self.silence_samples = int(round(sample_rate * silence_ms / 1000.0))
+        self.crossfade_samples = int(round(sample_rate * crossfade_ms / 1000.0))
+
+        self._tail = None          # muestras retenidas del fragmento anterior (float32)
+        self.samples_emitted = 0   # muestras ya entregadas
+        self.offsets = []          # inicio de cada fragmento en el audio final (muestras)
+        self.lengths = []          # duración propia de cada fragmento (muestras)
+
+    @staticmethod
+    def _ramp(length, rising):
+        ramp = np.linspace(0.0, 1.0, length + 2, dtype=np.float32)[1:-1]
+        return ramp if rising else ramp[::-1]
+
+    def _emit(self, parts):
+        out = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+        self.samples_emitted += len(out)
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def add(self, samples):
+        """Añade un fragmento y devuelve las muestras int16 que ya se pueden codificar."""
+        segment = np.asarray(samples, dtype=np.float32)
+        head = min(self.crossfade_samples, len(segment) // 2)
+        tail = min(self.crossfade_samples, len(segment) - head)
+        self.lengths.append(len(segment))
+
+        parts = []
+        if self._tail is None:
+            # Primer fragmento: no hay nada con lo que fundir el principio
+            self.offsets.append(0)
+            body = segment[:len(segment) - tail]
+        elif self.silence_samples > 0:
+            previous = self._tail
+            parts.append(previous * self._ramp(len(previous), rising=False))
+            parts.append(np.zeros(self.silence_samples, dtype=np.float32))
+            self.offsets.append(self.samples_emitted + len(previous) + self.silence_samples)
+            faded_head = segment[:head] * self._ramp(head, rising=True)
+            body = np.concatenate([faded_head, segment[head:len(segment) - tail]])
+        else:
+            previous = self._tail
+            overlap = min(len(previous), head)
+            parts.append(previous[:len(previous) - overlap])
+            self.offsets.append(self.samples_emitted + len(previous) - overlap)
+            mixed = previous[len(previous) - overlap:] * self._ramp(overlap, rising=False) \
+                + segment[:overlap] * self._ramp(overlap, rising=True)
+            parts.append(mixed)
+            body = segment[overlap:len(segment) - tail]
+
+        parts.append(body)
+        self._tail = segment[len(segment) - tail:]
+        return self._emit(parts)
+
+    def finish(self):
+        """Entrega las muestras retenidas del último fragmento."""
+        parts = [self._tail] if self._tail is not None and len(self._tail) else []
+        self._tail = None
+        return self._emit(parts)
+
+    @property
+    def total_duration(self):
+        """Duración total en segundos de todo lo entregado."""
+        return self.samples_emitted / float(self.sample_rate)
+
+    def chunk_timings(self):
+        """Devuelve [{'start': s, 'duration': s}, ...] exactos para cada fragmento."""
+        return [
+            {'start': offset / float(self.sample_rate), 'duration': length / float(self.sample_rate)}
+            for offset, length in zip(self.offsets, self.lengths)
+        ]
+
+
+def log_assembly_summary(assembler):
+    """Registra la duración total y la de cada fragmento."""
+    log_message(
+        "info",
+        f"Audio PCM ensamblado: {len(assembler.lengths)} fragmentos, {assembler.total_duration:.3f} s "
+        f"(silencio {assembler.silence_samples} muestras, fundido {assembler.crossfade_samples} muestras).",
+    )
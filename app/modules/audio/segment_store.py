@@ -0,0 +1,119 @@
+# app/modules/audio/segment_store.py
+
+import os
+import json
+import threading
+
+from app.utils.debug import log_message
+
+
+class SegmentStore:
+    """
+    Audios de los fragmentos de la conversión anterior, para volver a convertir sólo lo editado.
+
+    Guarda cada fragmento como '<clave>.bin' (la clave de make_cache_key, que cubre el
+    texto y toda la configuración de voz) y las claves de la última conversión en
+    'manifest.json'. Al convertir de nuevo, los fragmentos cuya clave ya estaba se leen
+    de aquí y sólo los cambiados van a la API. Tiene la misma interfaz get/put que
+    TTSCache y consulta la caché general (si se indica) para lo que no tenga.
+    """
+
+    def __init__(self, directory, fallback=None):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self.previous = self._load_manifest()  # clave -> metadatos (marcas de tiempo) de la conversión anterior
+        self.keys = []                         # claves de esta conversión, en orden
+        self.metas = {}
+        self.reused = 0
+        self.from_cache = 0
+        self.synthesized = 0
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return {entry['key']: entry.get('meta') for entry in json.load(f).get('chunks', [])}
+        except Exception as e:
+            log_message("warning", f"No se pudo leer el manifiesto de fragmentos, se ignora: {e}")
+            return {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _write(self, key, audio_content):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio_content)
+        os.replace(tmp_path, path)
+
+    def get(self, key, with_meta=False):
+        """Devuelve el audio del fragmento (y sus metadatos con with_meta) o None si hay que sintetizarlo."""
+        with self._lock:
+            self.keys.append(key)
+
+        audio_content, meta = None, None
+        if key in self.previous:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    audio_content = f.read()
+                meta = self.previous[key]
+                with self._lock:
+                    self.reused += 1
+            except OSError:
+                audio_content = None
+
+        if audio_content is None and self.fallback is not None:
+            audio_content, meta = self.fallback.get(key, with_meta=True)
+            if audio_content is not None:
+                # Conservarlo aquí aunque la caché general lo expulse más adelante
+                self._write(key, audio_content)
+                with self._lock:
+                    self.from_cache += 1
+
+        if audio_content is not None:
+            with self._lock:
+                self.metas[key] = meta
+        return (audio_content, meta) if with_meta else audio_content
+
+    def put(self, key, audio_content, meta=None):
+        """Guarda un fragmento recién sintetizado (también en la caché general)."""
+        if not audio_content:
+            return
+        self._write(key, audio_content)
+        with self._lock:
+            self.metas[key] = meta
+            self.synthesized += 1
+        if self.fallback is not None:
+            self.fallback.put(key, audio_content, meta=meta)
+
+    def commit(self):
+        """Guarda el manifiesto de esta conversión y borra los fragmentos que ya no se usan."""
+        with self._lock:
+            keys = [key for key in self.keys if key in self.metas]
+            chunks = [{'key': key, 'meta': self.metas[key]} for key in keys]
+
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'chunks': chunks}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+        keep = set(keys)
+        for name in os.listdir(self.directory):
+            if name.endswith('.bin') and name[:-4] not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+        log_message("info", f"Fragmentos: {len(self.keys)} en total, {self.reused} sin cambios respecto a la "
+                            f"conversión anterior, {self.from_cache} de la caché, {self.synthesized} sintetizados.")
+
+    def get_stats(self):
+        with self._lock:
+            return {'chunks': len(self.keys), 'reused': self.reused, 'from_cache': self.from_cache,
+                    'synthesized': self.synthesized}
@@ -0,0 +1,85 @@
+# app/modules/audio/timepoints.py
+
+import re
+import html
+from xml.sax.saxutils import escape
+
+from app.modules.audio.chunker import escape_ssml_text, sentence_starts, strip_speak_root
+
+# Marca por oración en el documento completo ('s<n>') y dentro de cada fragmento ('<k>')
+_GLOBAL_MARK_RE = re.compile(r'<mark name="s(\d+)"/>')
+_TAG_RE = re.compile(r"<[^<>]*>")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _display_text(segment, ssml):
+    """Texto visible de una oración: sin etiquetas, sin entidades y con los espacios normalizados."""
+    if ssml:
+        segment = html.unescape(_TAG_RE.sub(" ", segment))
+    return _SPACES_RE.sub(" ", segment).strip()
+
+
+def insert_sentence_marks(text, ssml):
+    """
+    Inserta una etiqueta <mark name="s<n>"/> al principio de cada oración.
+
+    Devuelve (documento_ssml, oraciones): el documento se puede dividir con chunk_text
+    (las marcas son elementos indivisibles) y 'oraciones' contiene el texto visible de
+    cada una, en el orden de las marcas. El texto plano se escapa para enviarlo como SSML,
+    y en un documento SSML se escapa el texto que queda fuera de las etiquetas.
+    """
+    if ssml:
+        text = escape_ssml_text(strip_speak_root(text))
+    data = text.encode('utf-8')
+    starts = sentence_starts(data, ssml=ssml)
+
+    parts = [data[:starts[0]].decode('utf-8')] if starts else [text]
+    sentences = []
+    for number, start in enumerate(starts):
+        end = starts[number + 1] if number + 1 < len(starts) else len(data)
+        segment = data[start:end].decode('utf-8')
+        sentences.append(_display_text(segment, ssml))
+        parts.append(f'<mark name="s{number}"/>')
+        parts.append(segment if ssml else escape(segment))
+    return "".join(parts), sentences
+
+
+def localize_marks(chunk):
+    """
+    Renombra las marcas de un fragmento como '0', '1'... y devuelve (fragmento, oraciones).
+
+    Así el texto enviado (y su clave de caché) no depende de la posición del fragmento
+    en la historia; 'oraciones' traduce cada marca local al número global de oración.
+    """
+    sentence_ids = []
+
+    def rename(match):
+        sentence_ids.append(int(match.group(1)))
+        return f'<mark name="{len(sentence_ids) - 1}"/>'
+
+    return _GLOBAL_MARK_RE.sub(rename, chunk), sentence_ids
+
+
+def build_cues(sentences, chunk_sentence_ids, chunk_timepoints, chunk_starts, chunk_durations):
+    """
+    Calcula los subtítulos exactos a partir de las marcas devueltas por Text-to-Speech.
+
+    Cada oración empieza en el inicio de su fragmento más el tiempo de su marca y termina
+    donde empieza la siguiente oración del mismo fragmento o, si es la última, al final
+    del fragmento. Devuelve [{'start': s, 'end': s, 'text': str}, ...] ordenados.
+    """
+    cues = []
+    for sentence_ids, timepoints, chunk_start, duration in zip(
+            chunk_sentence_ids, chunk_timepoints, chunk_starts, chunk_durations):
+        times = {}
+        for mark_name, seconds in timepoints or []:
+            if mark_name.isdigit() and int(mark_name) < len(sentence_ids):
+                times[sentence_ids[int(mark_name)]] = seconds
+
+        marked = [(times[sentence_id], sentence_id) for sentence_id in sentence_ids if sentence_id in times]
+        for position, (seconds, sentence_id) in enumerate(marked):
+            end = marked[position + 1][0] if position + 1 < len(marked) else duration
+            text = sentences[sentence_id]
+            if text and end > seconds:
+                cues.append({'start': chunk_start + seconds, 'end': chunk_start + end, 'text': text})
+    return cues
@@ -0,0 +1,233 @@
+# app/modules/audio/tts_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from app.utils.directories import get_cache_dir
+from app.utils.debug import log_message
+from app.config.settings import TTS_CACHE_ENABLED, TTS_CACHE_MAX_BYTES
+
+
+def make_cache_key(text, voice_name, language_code, gender, speaking_rate, pitch, audio_encoding):
+    """Genera la clave de caché (SHA-256) a partir del texto y de toda la configuración de voz."""
+    payload = json.dumps(
+        [text, voice_name, language_code, str(gender).upper(), float(speaking_rate), float(pitch), str(audio_encoding)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    Caché persistente de audios sintetizados, direccionada por contenido.
+
+    Cada entrada se guarda como un archivo '<clave>.bin' en cache/tts/ y el índice
+    (tamaño y último acceso) en 'index.json'. Cuando se supera el tamaño máximo se
+    eliminan las entradas usadas hace más tiempo (LRU).
+    """
+    _instance = None  # Para implementar Singleton
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(TTSCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_bytes=TTS_CACHE_MAX_BYTES, enabled=TTS_CACHE_ENABLED):
+        if hasattr(self, '_initialized'):
+            return
+
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.cache_dir = get_cache_dir() / 'tts'
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / 'index.json'
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # clave -> {"size": int, "last_access": float}, de menos a más reciente
+        self._total_bytes = 0
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+        self._initialized = True
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.bin"
+
+    def _load_index(self):
+        """Carga el índice del disco, descartando entradas cuyo archivo ya no existe."""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, meta in sorted(data.items(), key=lambda item: item[1].get('last_access', 0)):
+                if self._entry_path(key).exists():
+                    self._entries[key] = meta
+                    self._total_bytes += meta.get('size', 0)
+            log_message("info", f"Caché TTS cargada: {len(self._entries)} entradas, {self._total_bytes} bytes.")
+        except Exception as e:
+            log_message("warning", f"No se pudo leer el índice de la caché TTS, se reinicia: {e}", exc_info=True)
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get(self, key, with_meta=False):
+        """
+        Devuelve el audio guardado para la clave o None si no está en caché.
+        Con with_meta=True devuelve (audio, metadatos) o (None, None).
+
+        El archivo se lee fuera del candado: el candado sólo protege el índice LRU, así
+        que los trabajadores de síntesis en paralelo no esperan la E/S de los demás.
+        """
+        if with_meta:
+            with self._lock:
+                meta = self._entries.get(key)
+                extra = meta.get('meta') if meta else None
+            audio_content = self.get(key)
+            return (audio_content, extra) if audio_content is not None else (None, None)
+
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+        try:
+            with open(self._entry_path(key), 'rb') as f:
+                audio_content = f.read()
+        except OSError:
+            # El archivo desapareció (o se acaba de expulsar): tratarlo como un fallo y limpiar el índice
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is not None:
+                meta['last_access'] = time.time()
+                self._entries.move_to_end(key)
+                self._dirty = True
+            self.hits += 1
+        return audio_content
+
+    def put(self, key, audio_content, meta=None):
+        """
+        Guarda un audio en la caché y aplica la política de expulsión LRU.
+        'meta' (datos pequeños serializables en JSON, como las marcas de tiempo) se guarda en el índice.
+        """
+        if not self.enabled or not audio_content:
+            return
+        if len(audio_content) > self.max_bytes:
+            log_message("debug", f"Audio de {len(audio_content)} bytes mayor que la caché, no se guarda.")
+            return
+
+        # El archivo se escribe antes de tomar el candado (nombre temporal único por hilo)
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio_content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log_message("warning", f"No se pudo guardar el audio en la caché TTS: {e}")
+            return
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = {'size': len(audio_content), 'last_access': time.time()}
+            if meta is not None:
+                self._entries[key]['meta'] = meta
+            self._total_bytes += len(audio_content)
+            evicted = self._evict()
+            self._dirty = True
+        self._delete_files(evicted)
+
+    def _forget(self, key):
+        """Quita la clave del índice (sin tocar el archivo). Llamar con el candado tomado."""
+        meta = self._entries.pop(key, None)
+        if meta is not None:
+            self._total_bytes -= meta.get('size', 0)
+
+    def _delete_files(self, keys):
+        """Borra los archivos de las entradas expulsadas (fuera del candado)."""
+        for key in keys:
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log_message("warning", f"No se pudo borrar la entrada de caché TTS {key}: {e}")
+
+    def _evict(self):
+        """
+        Quita del índice las entradas menos usadas hasta quedar dentro del límite y
+        devuelve sus claves para borrar los archivos después de soltar el candado.
+        """
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._forget(oldest_key)
+            evicted.append(oldest_key)
+            self.evictions += 1
+            log_message("debug", f"Entrada de caché TTS expulsada: {oldest_key}")
+        return evicted
+
+    def _merge_disk_index(self):
+        """
+        Incorpora las entradas que otros procesos (trabajos en paralelo) han escrito en el
+        índice desde que se cargó, para no perderlas al sobrescribirlo.
+        """
+        if not self.index_path.exists():
+            return []
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        for key, meta in data.items():
+            if key not in self._entries and self._entry_path(key).exists():
+                self._entries[key] = meta
+                self._total_bytes += meta.get('size', 0)
+        self._entries = OrderedDict(sorted(self._entries.items(), key=lambda item: item[1].get('last_access', 0)))
+        return self._evict()
+
+    def flush(self):
+        """Escribe el índice en disco de forma atómica si ha cambiado."""
+        evicted = []
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                evicted = self._merge_disk_index()
+                tmp_path = self.index_path.with_suffix(f'.{os.getpid()}.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except Exception as e:
+                log_message("error", f"Error al guardar el índice de la caché TTS: {e}", exc_info=True)
+        self._delete_files(evicted)
+
+    def get_stats(self):
+        """Devuelve los contadores de la caché."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,266 @@
+# app/modules/audio/voice_catalog.py
+
+import os
+import re
+import json
+import time
+import importlib
+import threading
+
+from app.utils.debug import log_message
+from app.utils.directories import get_cache_dir
+from app.config.settings import VOICE_CATALOG_TTL_SECONDS
+
+# Tipo de voz al principio del nombre sin el código de país: 'Neural2-B' -> 'Neural'
+_STYLE_RE = re.compile(r"[A-Za-z]+")
+
+# SsmlVoiceGender puede llegar como enum, como su nombre o como su valor numérico
+_GENDER_NAMES = {1: 'MALE', 2: 'FEMALE', 3: 'NEUTRAL'}
+
+
+def _gender_name(gender):
+    name = getattr(gender, 'name', gender)
+    return _GENDER_NAMES.get(name, str(name).upper())
+
+
+def voice_style(voice_name, language_code):
+    """Tipo de voz ('Neural', 'Standard', 'Wavenet'...) a partir de su nombre completo."""
+    suffix = voice_name[len(language_code) + 1:] if voice_name.startswith(language_code) else voice_name
+    match = _STYLE_RE.match(suffix)
+    return match.group(0) if match else suffix
+
+
+def _ordered(options, labels):
+    """Ordena un nivel del índice según el orden de las etiquetas de lang/<Idioma>.py."""
+    order = {label: position for position, label in enumerate(labels)}
+    return dict(sorted(options.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+
+class VoiceCatalog:
+    """
+    Catálogo de voces de Text-to-Speech con índices precalculados para los menús.
+
+    La lista de voces se pide una sola vez a list_voices() y se guarda en
+    cache/voices.json durante VOICE_CATALOG_TTL_SECONDS. Si la API no responde se usa
+    la copia guardada aunque haya caducado y, si no hay ninguna, los diccionarios de
+    lang/<Idioma>.py. Los nombres visibles (países, géneros, estilos) salen de esos
+    mismos diccionarios, que se importan una sola vez al construir los índices.
+
+    La carga (load) puede tardar y sólo usa el token guardado, nunca abre el flujo
+    OAuth: se hace en segundo plano con preload(). Las consultas de los menús no
+    esperan a la red: hasta que llega el catálogo responden con el índice de lang/, y
+    al llegar se avisa a las funciones registradas con add_listener().
+
+    Índice: idioma -> país -> género -> estilo -> {etiqueta de voz: nombre de la voz},
+    con los nombres visibles como claves para rellenar los menús directamente.
+    """
+    _instance = None  # Para implementar Singleton
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(VoiceCatalog, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, ttl=VOICE_CATALOG_TTL_SECONDS):
+        if hasattr(self, '_initialized'):
+            return
+
+        self.ttl = ttl
+        self.cache_path = get_cache_dir() / 'voices.json'
+        self._lock = threading.Lock()
+        # (índice, códigos); códigos: idioma -> {'countries': {...}, 'genders': {...}, 'styles': {...}}
+        self._catalog = None
+        self._fallback = None  # Lo mismo construido sólo con lang/, mientras llega el catálogo
+        self._listeners = []
+        self.source = None
+        self._initialized = True
+
+    # --- Lista de voces -------------------------------------------------
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, voices):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': time.time(), 'voices': voices}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def _fetch_voices(self):
+        """Pide la lista completa de voces a la API (una sola llamada) con el token guardado."""
+        from app.config.credentials import GoogleCloudAPIManager
+
+        manager = GoogleCloudAPIManager()
+        if not manager.use_fake and manager.ensure_credentials(interactive=False) is None:
+            raise RuntimeError("no hay un token guardado válido")
+        client = manager.get_client('texttospeech')
+        response = client.list_voices()
+        return [
+            {
+                'name': voice.name,
+                'language_codes': list(voice.language_codes),
+                'gender': _gender_name(voice.ssml_gender),
+            }
+            for voice in response.voices
+        ]
+
+    def _load_voices(self, refresh=False):
+        cached = self._read_cache()
+        if cached and not refresh and time.time() - cached.get('fetched_at', 0) < self.ttl:
+            self.source = 'cache'
+            return cached['voices']
+
+        try:
+            voices = self._fetch_voices()
+            if voices:
+                self._write_cache(voices)
+                self.source = 'api'
+                log_message("info", f"Catálogo de voces actualizado desde la API: {len(voices)} voces.")
+                return voices
+            log_message("warning", "La API no devolvió ninguna voz.")
+        except Exception as e:
+            log_message("warning", f"No se pudo obtener la lista de voces de la API: {e}")
+
+        if cached:
+            self.source = 'cache'
+            log_message("info", "Se usa el catálogo de voces guardado aunque haya caducado.")
+            return cached['voices']
+        self.source = 'lang'
+        return None
+
+    # --- Índices --------------------------------------------------------
+
+    @staticmethod
+    def _load_language_modules():
+        """Importa una sola vez los diccionarios de nombres visibles de cada idioma de lang/."""
+        from data.languages import languages_get
+
+        modules = {}
+        for language in languages_get():
+            try:
+                modules[language] = importlib.import_module(f'lang.{language}')
+            except ImportError as e:
+                log_message("error", f"No se pudo cargar el módulo de idioma '{language}': {e}")
+        return modules
+
+    @staticmethod
+    def _module_voices(module):
+        """Convierte los diccionarios escritos a mano de lang/<Idioma>.py en una lista de voces."""
+        voices = []
+        for country_code, genders in module.voices_map.items():
+            for gender_code, styles in genders.items():
+                for style_code, options in styles.items():
+                    for voice_key in options.values():
+                        voices.append({'name': f"{country_code}-{style_code}{voice_key}",
+                                       'language_codes': [country_code], 'gender': gender_code})
+        return voices
+
+    def _build_index(self, voices, modules):
+        index = {}
+        codes = {}
+        for language, module in modules.items():
+            country_labels = {code: label for label, code in module.country_map.items()}
+            gender_labels = {code: label for label, code in module.gender_map.items()}
+            style_labels = {code: label for label, code in module.style_map.items()}
+            prefixes = {code.split('-')[0] for code in module.country_map.values()}
+
+            tree = {}
+            language_codes = {'countries': {}, 'genders': {}, 'styles': {}}
+            for voice in sorted(voices if voices is not None else self._module_voices(module),
+                                key=lambda item: item['name']):
+                for country_code in voice['language_codes']:
+                    if country_code.split('-')[0] not in prefixes:
+                        continue
+                    country = country_labels.get(country_code, country_code)
+                    gender = gender_labels.get(voice['gender'], voice['gender'].capitalize())
+                    style_code = voice_style(voice['name'], country_code)
+                    style = style_labels.get(style_code, style_code)
+
+                    language_codes['countries'][country] = country_code
+                    language_codes['genders'][gender] = voice['gender']
+                    language_codes['styles'][style] = style_code
+                    options = tree.setdefault(country, {}).setdefault(gender, {}).setdefault(style, {})
+                    options[f"Voz {len(options) + 1}"] = voice['name']
+
+            # Países, géneros y estilos en el orden de lang/<Idioma>.py y después los demás
+            index[language] = _ordered(tree, module.country_map)
+            for country, genders in index[language].items():
+                index[language][country] = _ordered(genders, module.gender_map)
+                for gender, styles in index[language][country].items():
+                    index[language][country][gender] = _ordered(styles, module.style_map)
+            codes[language] = language_codes
+        return index, codes
+
+    def load(self, refresh=False):
+        """
+        Carga la lista de voces (caché, API o lang/) y construye los índices. Devuelve el
+        índice. Puede esperar a la red: no llamar desde el hilo de la interfaz.
+        """
+        with self._lock:
+            if self._catalog is not None and not refresh:
+                return self._catalog[0]
+            start = time.perf_counter()
+            voices = self._load_voices(refresh)
+            self._catalog = self._build_index(voices, self._load_language_modules())
+            log_message("info", f"Índice de voces construido desde '{self.source}' en "
+                                f"{(time.perf_counter() - start) * 1000:.1f} ms.")
+        for callback in list(self._listeners):
+            callback()
+        return self._catalog[0]
+
+    def preload(self):
+        """Carga el catálogo si aún no está cargado; para llamar desde un hilo en segundo plano."""
+        self.load()
+
+    def add_listener(self, callback):
+        """Registra una función sin argumentos a la que se llama, desde el hilo que carga, al cargar el catálogo."""
+        self._listeners.append(callback)
+
+    def _current(self):
+        """(índice, códigos) del catálogo o, si aún no ha llegado, de lang/ (sin red)."""
+        catalog = self._catalog
+        if catalog is not None:
+            return catalog
+        if self._fallback is None:
+            self._fallback = self._build_index(None, self._load_language_modules())
+        return self._fallback
+
+    # --- Consultas para los menús -----------------------------------------
+
+    def _node(self, *path):
+        node = self._current()[0]
+        for key in path:
+            node = node.get(key)
+            if node is None:
+                return {}
+        return node
+
+    def countries(self, language):
+        return list(self._node(language))
+
+    def genders(self, language, country):
+        return list(self._node(language, country))
+
+    def styles(self, language, country, gender):
+        return list(self._node(language, country, gender))
+
+    def voices(self, language, country, gender, style):
+        return list(self._node(language, country, gender, style))
+
+    def resolve(self, language, country, gender, style, voice):
+        """
+        Devuelve {'voice_name', 'language_code', 'gender'} de la selección de los menús.
+        Lanza KeyError si la combinación no existe en el catálogo.
+        """
+        index, codes = self._current()
+        voice_name = index[language][country][gender][style][voice]
+        codes = codes[language]
+        return {
+            'voice_name': voice_name,
+            'language_code': codes['countries'][country],
+            'gender': codes['genders'][gender],
+        }
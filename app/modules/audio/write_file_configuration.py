@@ -1,7 +1,7 @@
 # app/modules/audio/write_file_configuration.py
 
-import importlib
-from app.utils.utils import write
+from app.utils.manifest import update_manifest
+from app.modules.audio.voice_catalog import VoiceCatalog
 from app.modules.messages import show_status_message
 from app.utils.debug import log_message
 
@@ -16,24 +16,6 @@ def write_file_configuration(parent):
         log_message('warning', "Idioma no seleccionado.")
         return
 
-    try:
-        lang_module = importlib.import_module(f'lang.{idioma}')
-        log_message('info', f"Módulo de idioma cargado: {idioma}")
-    except ImportError as e:
-        show_status_message(f"Error al cargar el módulo de idioma: {e}", "error")
-        log_message('error', f"Error al cargar el módulo de idioma: {e}", exc_info=True)
-        return
-
-    try:
-        country_map = lang_module.country_map
-        gender_map = lang_module.gender_map
-        style_map = lang_module.style_map
-        voices_map = lang_module.voices_map
-    except AttributeError as e:
-        show_status_message(f"Error al acceder a los diccionarios del módulo: {e}", "error")
-        log_message('error', f"Error al acceder a los diccionarios del módulo: {e}", exc_info=True)
-        return
-
     selected_country = parent.country_menu.currentText()
     selected_gender = parent.gender_menu.currentText()
     selected_style = parent.style_menu.currentText()
@@ -69,11 +51,11 @@ def write_file_configuration(parent):
     user_input_text = parent.text_entry.toPlainText()
 
     try:
-        country_key = country_map[selected_country]
-        gender_key = gender_map[selected_gender]
-        style_key = style_map[selected_style]
-        voice_key = voices_map[country_key][gender_key][style_key][selected_voice]
-        voice_conf = f"{country_key}-{style_key}{voice_key}"
+        # Misma tabla precalculada que rellena los menús
+        voice = VoiceCatalog().resolve(idioma, selected_country, selected_gender, selected_style, selected_voice)
+        voice_conf = voice['voice_name']
+        country_key = voice['language_code']
+        gender_key = voice['gender']
     except KeyError as e:
         show_status_message(f"Error al obtener la configuración de voz: {e}", "error")
         log_message('error', f"Error al obtener la configuración de voz: {e}", exc_info=True)
@@ -97,12 +79,14 @@ def write_file_configuration(parent):
         show_status_message("Configuración de voz aceptada", "success")
         log_message('info', "Configuración de voz aceptada.")
 
-        write('text_for_user.txt', text)
-        write('voice_config.txt', voice_name)
-        write('country_code.txt', country_id)
-        write('gender.txt', gender_mf)
-        write('speed.txt', str(speed_value))
-        write('pitch.txt', str(pitch_value))
+        update_manifest('settings', {
+            'text': text,
+            'voice_name': voice_name,
+            'language_code': country_id,
+            'gender': gender_mf,
+            'speaking_rate': speed_value,
+            'pitch': pitch_value,
+        })
 
         show_status_message("Configuración verificada correctamente", "success")
         log_message('info', "Configuración verificada y archivos guardados correctamente.")
@@ -10,8 +10,9 @@ from PyQt5.QtWidgets import (
     QLabel,
     QSlider,
     QFileDialog,
+    QCheckBox,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 
 from data.languages import languages_get
 from app.modules.audio.languages_update import LanguagesUpdater
@@ -20,6 +21,45 @@ from app.modules.messages import show_status_message
 from app.utils.utils import save_file
 from app.utils.debug import log_message
 from app.utils.media_control import MediaPlayer
+from app.config.settings import TTS_PROGRESSIVE_PREVIEW, TTS_SAMPLE_RATE
+
+
+class ConvertWorker(QThread):
+    """Ejecuta convert_text fuera del hilo de la interfaz y emite el audio a medida que llega."""
+    segment_ready = pyqtSignal(bytes, object)  # PCM s16le mono, frecuencia de muestreo
+    conversion_finished = pyqtSignal(object)   # ruta del audio final o None
+
+    def __init__(self, audio_controls, preview):
+        super(ConvertWorker, self).__init__(audio_controls)
+        self.audio_controls = audio_controls
+        self.preview = preview
+
+    def run(self):
+        from .audio.convert_text import convert_text
+
+        result = None
+        try:
+            on_segment = self.emit_segment if self.preview else None
+            result = convert_text(self.audio_controls, on_segment=on_segment)
+        except Exception as e:
+            log_message("error", f"Error al convertir texto en segundo plano: {e}", exc_info=True)
+        finally:
+            self.conversion_finished.emit(result)
+
+    def emit_segment(self, audio_bytes, sample_rate):
+        """
+        Emite el fragmento como PCM. Los MP3 se decodifican aquí, fuera del hilo de la
+        interfaz, para que la vista previa sea un único flujo continuo de QAudioOutput.
+        """
+        if sample_rate is None:
+            from .audio.ffmpeg_stream import decode_mp3_to_pcm
+            try:
+                audio_bytes, sample_rate = decode_mp3_to_pcm(audio_bytes, TTS_SAMPLE_RATE), TTS_SAMPLE_RATE
+            except Exception as e:
+                log_message("warning", f"No se pudo decodificar el fragmento para la vista previa: {e}")
+                return
+        self.segment_ready.emit(audio_bytes, sample_rate)
+
 
 class AudioControls(QWidget):
     def __init__(self, parent=None):
@@ -27,32 +67,16 @@ class AudioControls(QWidget):
         self.parent = parent  # Almacenar una referencia al padre (la ventana principal)
 
 
-        # Instanciar la clase de configuración de credenciales OAuth
+        # Instanciar la clase de configuración de credenciales OAuth. Las credenciales y el
+        # cliente de Text-to-Speech se cargan con la primera conversión (o en segundo plano
+        # desde main.py), no al construir la pestaña.
         try:
             self.oauth_config = GoogleCloudAPIManager()
             log_message("debug", "Instancia de GoogleCloudAPIManager obtenida.")
-
-            # Verificar si las credenciales están disponibles
-            if not self.oauth_config.creds:
-                log_message("error", "Error: No se pudo obtener credenciales.")
-                assert False, "Credenciales no disponibles"  # Lanza una excepción si no hay credenciales
-            log_message("info", "Credenciales obtenidas correctamente.")
-
         except Exception as e:
             log_message("critical", f"Error crítico al inicializar la configuración de OAuth: {e}", exc_info=True)
             return
 
-        # Reutilizar el cliente de Text-to-Speech
-        try:
-            self.client = self.oauth_config.get_client('texttospeech')
-            if self.client:
-                log_message("success", "Cliente de Google Cloud Text-to-Speech reutilizado exitosamente.")
-            else:
-                log_message("error", "Error: No se pudo obtener el cliente de Google Cloud Text-to-Speech.")
-
-        except Exception as e:
-            log_message("error", f"Error al obtener el cliente de Google Cloud Text-to-Speech: {e}", exc_info=True)
-
         # Obtener los idiomas disponibles
         try:
             self.idiomas = languages_get()
@@ -96,32 +120,19 @@ class AudioControls(QWidget):
 
     def window_widget(self):
         from app.utils.utils import create_text_entry_with_context_menu
-        from pathlib import Path
+        from app.utils.manifest import load_manifest
 
         # Crear el widget de entrada de texto
         self.text_entry = create_text_entry_with_context_menu(self)
         log_message("debug", "Se creó el widget de entrada de texto con menú contextual.")
 
-        # Cargar los archivos de texto
-        title_path = Path('data/title_translate.txt')
-        text_path = Path('data/text_translate.txt')
-
         try:
-            # Cargar el contenido del archivo title_translate.txt
-            if title_path.exists():
-                with open(title_path, 'r', encoding='utf-8') as title_file:
-                    title_content = title_file.read().strip()
-            else:
-                log_message("warning", "El archivo title_translate.txt no se encontró.")
-                title_content = ""
-
-            # Cargar el contenido del archivo text_translate.txt
-            if text_path.exists():
-                with open(text_path, 'r', encoding='utf-8') as text_file:
-                    text_content = text_file.read().strip()
-            else:
-                log_message("warning", "El archivo text_translate.txt no se encontró.")
-                text_content = ""
+            # Cargar la traducción guardada en el manifiesto del trabajo
+            translation = load_manifest()['translation']
+            title_content = (translation.get('title') or "").strip()
+            text_content = (translation.get('text') or "").strip()
+            if not text_content:
+                log_message("warning", "El manifiesto aún no contiene ninguna traducción.")
 
             # Establecer el contenido en el widget de entrada de texto
             combined_content = f"{title_content}\n\n{text_content}"
@@ -133,10 +144,10 @@ class AudioControls(QWidget):
             cleaned_content = re.sub(r'(?<=[.!?])\s+', '\n\n', cleaned_content)  # Agrega doble salto de línea después de oraciones
 
             self.text_entry.setPlainText(cleaned_content)  # Usa setPlainText si es QTextEdit
-            log_message("info", "Contenido de los archivos cargado en el widget de entrada de texto.")
+            log_message("info", "Traducción del manifiesto cargada en el widget de entrada de texto.")
 
         except Exception as e:
-            log_message("error", f"Error al cargar los archivos de texto: {e}", exc_info=True)
+            log_message("error", f"Error al cargar la traducción del manifiesto: {e}", exc_info=True)
 
         return self.text_entry
 
@@ -211,6 +222,10 @@ class AudioControls(QWidget):
         self.convert_button.setEnabled(False)  # Deshabilitado por defecto
         self.audio_button_layout.addWidget(self.convert_button)
 
+        self.preview_checkbox = QCheckBox("Escuchar mientras convierte")
+        self.preview_checkbox.setChecked(TTS_PROGRESSIVE_PREVIEW)
+        self.audio_button_layout.addWidget(self.preview_checkbox)
+
         self.play_button = QPushButton("Reproducir Audio")
         self.play_button.clicked.connect(self.play_audio)
         self.play_button.setEnabled(True)  # Deshabilitado por defecto
@@ -288,23 +303,42 @@ class AudioControls(QWidget):
             show_status_message("Error al escribir la configuración de archivo.", "error")
 
     def convert_text(self):
-        from .audio.convert_text import convert_text
         from app.utils.singleton_status import StatusManager
 
         StatusManager.get_instance().get_status_label().setText("")
 
         log_message("debug", "Convirtiendo texto.")
         try:
-            convert_text(self)
-            log_message("success", "Texto convertido exitosamente.")
-            self.play_button.setEnabled(True)
-            self.stop_button.setEnabled(True)
-            self.save_button.setEnabled(True)
-            # Reactivar el botón continuar
-            self.parent.enable_continue_button()
+            preview = self.preview_checkbox.isChecked()
+            self.convert_button.setEnabled(False)
+
+            self.convert_worker = ConvertWorker(self, preview)
+            if preview:
+                # El primer fragmento empieza a sonar en cuanto vuelve de la API
+                media_player = MediaPlayer()
+                media_player.start_preview()
+                self.convert_worker.segment_ready.connect(media_player.queue_preview_segment)
+                self.stop_button.setEnabled(True)
+            self.convert_worker.conversion_finished.connect(self.on_conversion_finished)
+            self.convert_worker.start()
         except Exception as e:
             log_message("error", "Error al convertir texto: %s", e, exc_info=True)
             show_status_message("Error al convertir el texto.")
+            self.convert_button.setEnabled(True)
+
+    def on_conversion_finished(self, final_audio_path):
+        """Se ejecuta en el hilo de la interfaz cuando termina ConvertWorker."""
+        self.convert_button.setEnabled(True)
+        if not final_audio_path:
+            log_message("warning", "La conversión terminó sin generar audio.")
+            return
+
+        log_message("success", "Texto convertido exitosamente.")
+        self.play_button.setEnabled(True)
+        self.stop_button.setEnabled(True)
+        self.save_button.setEnabled(True)
+        # Reactivar el botón continuar
+        self.parent.enable_continue_button()
 
     def play_audio(self):
         """Reproduce el archivo de audio temporal generado."""
@@ -138,7 +138,7 @@ class TranslateControl(QWidget):
         return translate_controls_widget
 
     def verify_title(self):
-        from app.extra.used_titles import TITLES
+        from app.modules.translate.title_registry import TitleRegistry
         """Verifica si el título ya existe y activa/desactiva los botones."""
         # Obtener el título ingresado por el usuario
         input_title = self.title_entry.toPlainText().strip()
@@ -147,17 +147,26 @@ class TranslateControl(QWidget):
             show_status_message("Por favor, ingresa un título.", "warning")
             return
 
-        # Verificar si el título ya existe
-        if input_title in TITLES:
+        # Verificar si el título ya existe o si se parece mucho a uno publicado
+        registry = TitleRegistry()
+        if registry.contains(input_title):
             show_status_message("El título ya existe.", "warning")
+            return
+
+        similar = registry.find_similar(input_title)
+        if similar:
+            # Posible publicación repetida con otras palabras: se avisa, pero se puede traducir
+            title, similarity = similar[0]
+            self.translate_button.setEnabled(True)
+            show_status_message(f"Título parecido a uno ya usado ({similarity:.0%}): '{title}'", "warning")
         else:
             # Si no existe, activa los botones
             self.translate_button.setEnabled(True)
             show_status_message("Título válido. Puedes traducir.", "success")
 
     def translate_text(self):
-        from app.modules.translate.translate_text import translate_text_with_model
-        from app.modules.translate.detect_language import detect_language
+        from app.modules.translate.translate_text import translate_texts
+        from app.config.settings import TRANSLATE_TARGET_LANGUAGES
 
         # Limpiar los campos de traducción si no están vacíos
         if self.translation_title_label.toPlainText().strip() or self.translation_label.toPlainText().strip():
@@ -174,33 +183,21 @@ class TranslateControl(QWidget):
             return
 
         try:
-            log_message("debug", "Iniciando detección del idioma...")
-            # Detectar el idioma del texto ingresado
-            detected_language = detect_language(input_text)
-            detected_language_title = detect_language(input_title)
-
-            log_message("debug", f"Idioma detectado: {detected_language}, {detected_language_title}")
-
-            if not detected_language or not detected_language_title:  # Corregido
-
-                show_status_message("No se pudo detectar el idioma", "error")
-                log_message("warning", "No se pudo detectar el idioma del texto o título.")
-                return
-
             log_message("debug", f"Iniciando traducción del título: {input_title}")
             log_message("debug", f"Iniciando traducción del texto: {input_text}")
 
-            # Realiza la traducción usando el modelo personalizado
-            translated_text = translate_text_with_model(
-                text=input_text,
-                target_language='es',
-                source_language=detected_language
-            )
-            translated_title = translate_text_with_model(  # Traducción del título
-                text=input_title,
-                target_language='es',
-                source_language=detected_language_title
-            )
+            # Texto y título en una sola petición con un único idioma de origen (detectado
+            # sobre los dos juntos); las oraciones ya traducidas salen de la memoria de traducción
+            results = translate_texts([input_text, input_title], target_language=TRANSLATE_TARGET_LANGUAGES[0])
+            if not results:
+                show_status_message("Error en la traducción", "error")
+                log_message("warning", "Traducción fallida: la petición no devolvió resultados.")
+                return
+            (translated_text, detected_language), (translated_title, detected_language_title) = results
+
+            log_message("debug", f"Idioma detectado: {detected_language}, {detected_language_title}")
+            if detected_language:
+                show_status_message(f"Idioma a traducir: {detected_language}", "info")
 
             # Mostrar la traducción en la etiqueta de resultado
             if translated_text and translated_title:  # Comprobar ambos resultados
@@ -0,0 +1,178 @@
+# app/modules/jobs.py
+
+import os
+import json
+import hashlib
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from app.utils.debug import log_message, setup_logging
+from app.utils.startup import run_in_background
+from app.config.rate_limit import configure_quota_share
+from app.utils.directories import JOB_DIR_ENV, job_scope
+from app.modules.pipeline import run_story, story_slug, split_list, voice_for_language
+
+
+def job_dir_name(value):
+    """
+    Nombre de carpeta para un identificador: su slug y, si el slug no lo conserva tal
+    cual (caracteres sustituidos o recortados), un hash corto del original. Así 'a b' y
+    'a_b' no comparten carpeta, y el nombre es el mismo en cada ejecución.
+    """
+    slug = story_slug(value)
+    if slug == str(value):
+        return slug
+    return f"{slug}-{hashlib.sha1(str(value).encode('utf-8')).hexdigest()[:8]}"
+
+
+def unique_job_dirs(jobs):
+    """Añade '-2', '-3'... al directorio de los trabajos repetidos (historias con el mismo id)."""
+    seen = set()
+    for job in jobs:
+        base = job.job_dir
+        number = 1
+        while job.job_dir in seen:
+            number += 1
+            job.job_dir = base.with_name(f"{base.name}-{number}")
+        if number > 1:
+            log_message("warning", f"Trabajo '{job.id}' repetido: se ejecuta en {job.job_dir}.")
+        seen.add(job.job_dir)
+    return jobs
+
+
+class Job:
+    """
+    Una historia con su configuración y su propio directorio de trabajo.
+
+    Dentro del trabajo get_data_dir() y get_tmp_dir() devuelven <job_dir>/data y
+    <job_dir>/tmp, así que los nombres fijos (final_temp_audio.mp3, job_manifest.json...)
+    ya no chocan entre historias procesadas a la vez.
+    """
+
+    def __init__(self, story, settings, output_dir, variant=None):
+        self.story = story
+        self.settings = dict(settings)
+        self.job_dir = Path(output_dir) / job_dir_name(story['id'])
+        self.id = story['id']
+        if variant:
+            # Variante de la historia (un idioma de destino): <salida>/<historia>/<variante>
+            self.job_dir = self.job_dir / job_dir_name(variant)
+            self.id = f"{story['id']} [{variant}]"
+
+    def prepare(self):
+        """Crea el directorio del trabajo y guarda su configuración en job.json."""
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.job_dir / 'job.json', 'w', encoding='utf-8') as f:
+            json.dump({'id': self.id, 'title': self.story.get('title'), 'settings': self.settings},
+                      f, ensure_ascii=False, indent=2)
+
+    def failed(self, error):
+        """Resultado de un trabajo que no llegó a ejecutarse (por ejemplo, si murió su proceso)."""
+        return {'id': self.id, 'status': 'error', 'error': str(error), 'chars': len(self.story['text']),
+                'audio_seconds': 0.0, 'timings': {}, 'outputs': {}}
+
+
+def fan_out_jobs(story, settings, output_dir):
+    """
+    Crea un trabajo por idioma de destino de la historia.
+
+    'target_language' puede ser una lista ('es,fr,de') y 'voice_name' una lista con una
+    voz por idioma: cada idioma se traduce y se sintetiza en su propio trabajo y
+    directorio, así que con al menos tantos trabajadores como idiomas el lote tarda
+    lo que el idioma más lento y no la suma de todos. Con un solo idioma (o ninguno)
+    devuelve un único trabajo, como antes. Si un idioma no tiene voz lanza ValueError.
+    """
+    targets = split_list(settings.get('target_language'))
+    if not targets:
+        return [Job(story, settings, output_dir)]
+
+    jobs = []
+    for target in targets:
+        voice_name = voice_for_language(settings.get('voice_name'), target)
+        if not voice_name:
+            raise ValueError(f"No hay ninguna voz para el idioma '{target}' en la historia '{story['id']}'.")
+        variant = dict(settings, target_language=target, voice_name=voice_name)
+        if len(targets) == 1:
+            jobs.append(Job(story, variant, output_dir))
+            continue
+        # El código de idioma se deduce de la voz de cada idioma
+        variant.pop('language_code', None)
+        jobs.append(Job(story, variant, output_dir, variant=target))
+    return jobs
+
+
+def _init_worker(processes):
+    """
+    Inicializa el logging en cada proceso de trabajo, le asigna su parte de la cuota de
+    la API y abre en segundo plano sus canales de Google Cloud antes del primer trabajo.
+    """
+    from app.config.credentials import GoogleCloudAPIManager
+
+    setup_logging()
+    configure_quota_share(processes)
+    run_in_background(GoogleCloudAPIManager().warm_up, "google_cloud_warm_up")
+
+
+def run_job(job, own_process=False):
+    """
+    Ejecuta un trabajo dentro de su directorio.
+
+    El directorio se fija en el contexto (job_scope); los grupos de hilos que lanza el
+    trabajo (síntesis y traducción concurrentes) lo propagan con with_job_context. En un
+    proceso dedicado también se fija la variable de entorno, por si algún otro hilo del
+    proceso lo necesita.
+    """
+    job.prepare()
+    if own_process:
+        os.environ[JOB_DIR_ENV] = str(job.job_dir)
+    try:
+        with job_scope(job.job_dir):
+            return run_story(job.story, job.settings, job.job_dir)
+    finally:
+        if own_process:
+            os.environ.pop(JOB_DIR_ENV, None)
+
+
+class JobRunner:
+    """
+    Ejecuta trabajos en paralelo en un grupo de procesos (o de hilos).
+
+    Los procesos se crean con 'spawn': gRPC y Qt no son seguros tras un fork, y así
+    cada proceso abre sus propios clientes de Google Cloud.
+    """
+
+    def __init__(self, workers=None, use_processes=True):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.use_processes = use_processes
+
+    def _executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.workers,),
+            )
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def run(self, jobs, on_result=None):
+        """Ejecuta los trabajos y devuelve sus resultados en orden de finalización."""
+        mode = "procesos" if self.use_processes else "hilos"
+        log_message("info", f"Ejecutando {len(jobs)} trabajos con {self.workers} {mode}.")
+
+        unique_job_dirs(jobs)
+        results = []
+        with self._executor() as executor:
+            futures = {executor.submit(run_job, job, self.use_processes): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log_message("error", f"El trabajo '{job.id}' terminó de forma inesperada: {e}", exc_info=True)
+                    result = job.failed(e)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        return results
@@ -1,19 +1,46 @@
 # app/modules/messages.py
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal
 from ..utils.debug import log_message
 from ..utils.singleton_status import StatusManager
 
 
+class _StatusRelay(QObject):
+    """Reenvía al hilo de la interfaz los mensajes emitidos desde hilos de trabajo."""
+    show = pyqtSignal(str, str)
+
+
+_relay = None
+
+# Nivel de registro de cada tipo de mensaje
+_LOG_LEVELS = {"error": "error", "success": "info", "warning": "warning", "info": "info"}
+
+
+def _get_relay(status_label):
+    global _relay
+    if _relay is None:
+        _relay = _StatusRelay()
+        _relay.moveToThread(status_label.thread())
+        _relay.show.connect(show_status_message)
+    return _relay
+
+
 def show_status_message(message: str, msg_type: str) -> None:
     """
     Muestra un mensaje de estado en la interfaz de usuario.
+    Se puede llamar desde cualquier hilo: fuera del hilo de la interfaz el mensaje se
+    encola y se muestra desde allí.
     :param message: El mensaje a mostrar.
     :param msg_type: El tipo de mensaje ('error', 'success', 'warning', 'info', u otro).
     """
     status_label = StatusManager.get_instance().get_status_label()
     if not status_label:
-        log_message("error", "status_label no está inicializado.")
+        # Sin interfaz (por ejemplo en batch.py): el mensaje sólo se registra
+        log_message(_LOG_LEVELS.get(msg_type, "debug"), message)
+        return
+
+    if QThread.currentThread() is not status_label.thread():
+        _get_relay(status_label).show.emit(message, msg_type)
         return
 
     try:
@@ -0,0 +1,170 @@
+# app/modules/pipeline.py
+
+import os
+import re
+import json
+import time
+
+from app.utils.debug import log_message
+from app.utils.directories import get_tmp_dir
+
+# Etapas del proceso completo, en orden
+STAGES = ('translate', 'tts', 'subtitles', 'render')
+
+
+def story_slug(value):
+    """Convierte el identificador de una historia en un nombre de carpeta seguro."""
+    slug = re.sub(r'[^\w\-]+', '_', str(value), flags=re.UNICODE).strip('_')
+    return slug[:80] or 'historia'
+
+
+def voice_language_code(voice_name):
+    """Obtiene el código de idioma a partir del nombre de la voz (es-ES-Neural2-A -> es-ES)."""
+    parts = str(voice_name).split('-')
+    if len(parts) < 2:
+        raise ValueError(f"Nombre de voz no válido: {voice_name}")
+    return f"{parts[0]}-{parts[1]}"
+
+
+def split_list(value):
+    """'es,fr' o ['es', 'fr'] -> ['es', 'fr']."""
+    if not value:
+        return []
+    items = value.split(',') if isinstance(value, str) else value
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def voice_for_language(voice_names, target_language):
+    """
+    Elige de la lista la voz del idioma de destino (fr -> fr-FR-Neural2-A), también
+    cuando sólo hay una; si ninguna coincide devuelve None.
+    """
+    voice_names = split_list(voice_names)
+    language = target_language.split('-')[0].lower()
+    for voice_name in voice_names:
+        code = voice_language_code(voice_name)
+        if code.lower() == target_language.lower() or code.split('-')[0].lower() == language:
+            return voice_name
+    return None
+
+
+class StageTimer:
+    """Mide la duración de cada etapa de una historia."""
+
+    def __init__(self):
+        self.timings = {}
+
+    def run(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+
+def _translate_stage(story, options):
+    from app.modules.translate.translate_text import translate_texts
+
+    # Texto y título en una sola petición
+    title = story.get('title')
+    results = translate_texts([story['text'], title or ""],
+                             options.get('target_language'), options.get('source_language'))
+    assert results and results[0][0], f"No se pudo traducir el texto de '{story['id']}'."
+    return (results[1][0] or title), results[0][0]
+
+
+def _tts_stage(text, options, output_path):
+    from app.modules.audio.convert_text import synthesize_text_to_file
+    from app.modules.video.media_probe import media_duration_ms
+
+    voice_name = options['voice_name']
+    result = synthesize_text_to_file(
+        text,
+        voice_name,
+        options.get('language_code') or voice_language_code(voice_name),
+        options.get('gender', 'FEMALE'),
+        float(options.get('speaking_rate', 1.0)),
+        int(options.get('pitch', 0)),
+        output_path,
+        max_workers=options.get('tts_workers'),
+        audio_encoding=options.get('audio_encoding'),
+        segments_dir=os.path.join(get_tmp_dir(), 'segments'),
+        subtitle_marks=options.get('exact_subtitles'),
+    )
+    assert result, "No se generó audio."
+
+    # La duración viene de la síntesis; sólo si faltara se leen las cabeceras del archivo
+    if not result['duration_ms']:
+        result['duration_ms'] = media_duration_ms(output_path)
+    assert result['duration_ms'] and result['duration_ms'] > 0, "No se pudo obtener la duración del audio."
+    return result
+
+
+def run_story(story, options, story_dir):
+    """
+    Ejecuta el proceso completo de una historia sin interfaz gráfica.
+
+    Etapas: traducción (si se indica 'target_language'), síntesis de voz, subtítulos y
+    render (si se indica 'video'). Todo se escribe en story_dir; con app.modules.jobs
+    cada historia tiene además sus propios data/ y tmp/.
+
+    Devuelve un diccionario con el estado, los archivos generados y los tiempos por etapa;
+    los errores se registran en el resultado en lugar de propagarse.
+    """
+    from app.modules.subtitles import generate_srt_from_text_file, write_srt_from_cues, render_story_video
+
+    timer = StageTimer()
+    story_dir = str(story_dir)
+    os.makedirs(story_dir, exist_ok=True)
+    result = {
+        'id': story['id'],
+        'status': 'error',
+        'error': None,
+        'chars': len(story['text']),
+        'audio_seconds': 0.0,
+        'timings': timer.timings,
+        'outputs': {},
+    }
+
+    try:
+        title, text = story.get('title'), story['text']
+        if options.get('target_language'):
+            title, text = timer.run('translate', _translate_stage, story, options)
+
+        text_path = os.path.join(story_dir, 'texto.txt')
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if title:
+            with open(os.path.join(story_dir, 'titulo.txt'), 'w', encoding='utf-8') as f:
+                f.write(title)
+        result['outputs']['text'] = text_path
+
+        audio_path = os.path.join(story_dir, 'audio.mp3')
+        tts = timer.run('tts', _tts_stage, text, options, audio_path)
+        result['outputs']['audio'] = audio_path
+        result['audio_seconds'] = tts['duration_ms'] / 1000.0
+
+        srt_path = os.path.join(story_dir, f"subtitulos.{options.get('subtitle_format', 'srt')}")
+        if tts.get('cues'):
+            subtitles_path = timer.run('subtitles', write_srt_from_cues, tts['cues'], file_name=srt_path)
+        else:
+            subtitles_path = timer.run(
+                'subtitles', generate_srt_from_text_file, text_path, result['audio_seconds'], file_name=srt_path,
+            )
+        result['outputs']['subtitles'] = subtitles_path
+
+        if options.get('video'):
+            video_path = os.path.join(story_dir, 'video.mp4')
+            timer.run('render', render_story_video, options['video'], audio_path, subtitles_path, video_path)
+            result['outputs']['video'] = video_path
+
+        result['status'] = 'ok'
+        log_message("success", f"Historia '{story['id']}' procesada en {sum(timer.timings.values()):.1f} s.")
+
+    except Exception as e:
+        result['error'] = str(e)
+        log_message("error", f"Error al procesar la historia '{story['id']}': {e}", exc_info=True)
+
+    with open(os.path.join(story_dir, 'resultado.json'), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
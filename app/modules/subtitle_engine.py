@@ -0,0 +1,341 @@
+# app/modules/subtitle_engine.py
+"""
+Motor de subtítulos: segmentación, tiempos y escritura en SRT, WebVTT o ASS.
+
+Todos los formatos parten del mismo modelo de subtítulo que ya usan convert_text y
+timepoints.py: {'start': segundos, 'end': segundos, 'text': str}. El texto se divide
+en oraciones con chunker.sentence_starts (el mismo corte que las marcas de
+Text-to-Speech: no corta tras 'Mr.' ni entre '"¿De verdad?"' y 'dijo ella') y, si una
+oración no cabe en SUBTITLE_MAX_CHARS, en comas, punto y coma o dos puntos y por
+último en espacios. Sin tiempos exactos, la duración
+del audio se reparte en proporción a las sílabas (o a los caracteres) de cada
+subtítulo, con una pausa extra tras cada oración. El texto se segmenta una sola vez
+(sólo se guardan intervalos y pesos), y los subtítulos se generan de uno en uno y se
+escriben directamente en el archivo, sin construir el documento en memoria.
+"""
+
+import os
+import re
+import itertools
+from array import array
+
+from app.utils.debug import log_message
+from app.config.settings import SUBTITLE_MAX_CHARS, SUBTITLE_WEIGHTING
+from app.modules.audio.chunker import iter_sentence_starts
+
+# Corte dentro de una oración: tras una coma, punto y coma, dos puntos o raya
+_CLAUSE_RE = re.compile(r"[,;:—–]+[\"')\]»”]*\s")
+# Tramos de espacio en blanco con salto de línea, y tramos sin él que no son ya un solo espacio
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+_SPACE_RUN_RE = re.compile(r" [^\S\n]+|[^\S\n ][^\S\n]*")
+# Espacios en blanco distintos de ' ' y '\n' (los que reconoce str.split)
+_ODD_SPACES = tuple(chr(code) for code in range(0x3001) if chr(code).isspace() and chr(code) not in " \n")
+# Clase de cada carácter Latin-1 para contar grupos de vocales: b'a' vocal, b'b' el resto
+# (los caracteres fuera de Latin-1 se codifican como '?', que no es vocal)
+_VOWELS = "aeiouyáéíóúàèìòùâêîôûäëïöüãõ"
+_VOWEL_CLASSES = bytes(0x61 if chr(code) in _VOWELS + _VOWELS.upper() else 0x62 for code in range(256))
+
+# Peso extra (en sílabas o caracteres equivalentes) de la pausa tras una oración o una cláusula
+SENTENCE_PAUSE_WEIGHT = 2.0
+CLAUSE_PAUSE_WEIGHT = 1.0
+_PAUSE_WEIGHTS = {**dict.fromkeys(".!?…", SENTENCE_PAUSE_WEIGHT), **dict.fromkeys(",;:", CLAUSE_PAUSE_WEIGHT)}
+# Comillas y paréntesis de cierre que pueden seguir al signo final
+_CLOSING_MARKS = "\"')]»”"
+
+SUBTITLE_FORMATS = ('srt', 'vtt', 'ass')
+
+
+# --- Segmentación ------------------------------------------------------------
+
+def normalize_spaces(text):
+    """
+    Reduce cada tramo de espacio en blanco a un carácter: '\n' si contiene un salto de
+    línea y ' ' si no. Cada subtítulo es así un intervalo del texto normalizado.
+
+    Las expresiones regulares sólo se pasan si hace falta: comprobar con 'in' que no hay
+    espacios raros ni dobles es mucho más rápido que recorrer el texto con re.sub.
+    """
+    odd = any(space in text for space in _ODD_SPACES)
+    if odd or " \n" in text or "\n " in text:
+        text = _LINE_BREAK_RE.sub("\n", text)
+    else:
+        while "\n\n" in text:
+            text = text.replace("\n\n", "\n")
+    if odd or "  " in text:
+        text = _SPACE_RUN_RE.sub(" ", text)
+    return text.strip()
+
+
+def _clause_spans(flat, start, end, max_chars, spans):
+    """
+    Añade a spans los intervalos de una oración demasiado larga: cláusulas y, si aún no
+    caben, trozos de longitud parecida cortados en espacios (sin dejar una última
+    palabra suelta): el más corto que llega al objetivo sin pasar de max_chars, si no
+    el más largo que cabe y, si no cabe ni una palabra, esa palabra sola.
+    """
+    clause_ends = [match.end() for match in _CLAUSE_RE.finditer(flat, start, end)]
+    clause_ends.append(end + 1)
+
+    current = None
+    current_end = clause_start = start
+    for next_start in clause_ends:
+        clause_end = next_start - 1
+        if clause_end <= clause_start:
+            clause_start = next_start
+            continue
+        if current is not None and clause_end - current > max_chars:
+            spans.extend((current, current_end))
+            current = None
+        if clause_end - clause_start <= max_chars:
+            if current is None:
+                current = clause_start
+            current_end = clause_end
+            clause_start = next_start
+            continue
+
+        if current is not None:
+            spans.extend((current, current_end))
+        length = clause_end - clause_start
+        target = -(-length // -(-length // max_chars))
+        piece_start = clause_start
+        while True:
+            piece_end = flat.find(" ", piece_start + target, clause_end)
+            if piece_end == -1:
+                piece_end = clause_end
+            if piece_end - piece_start > max_chars:
+                piece_end = flat.rfind(" ", piece_start, piece_start + max_chars + 1)
+                if piece_end <= piece_start:
+                    piece_end = flat.find(" ", piece_start, clause_end)
+                    if piece_end == -1:
+                        piece_end = clause_end
+            if piece_end >= clause_end:
+                break
+            spans.extend((piece_start, piece_end))
+            piece_start = piece_end + 1
+        # El último trozo puede juntarse con las cláusulas siguientes
+        current, current_end = piece_start, clause_end
+        clause_start = next_start
+    if current is not None:
+        spans.extend((current, current_end))
+
+
+def segment_spans(flat, max_chars=SUBTITLE_MAX_CHARS):
+    """
+    Intervalos de todos los subtítulos del texto normalizado (ver normalize_spaces), en
+    orden y en un array plano [inicio0, fin0, inicio1, fin1, ...]: 16 bytes por subtítulo
+    en lugar de una cadena.
+    """
+    spans = array('q')
+    data = flat.encode('utf-8')
+    ascii_only = len(data) == len(flat)
+    starts = iter_sentence_starts(data, lines=True)
+    byte_start = start = next(starts, None)
+    if start is None:
+        return spans
+    for byte_end in itertools.chain(starts, (len(data),)):
+        # Las posiciones son bytes: en un texto no ASCII se pasan a caracteres oración a oración
+        end = byte_end if ascii_only else start + len(data[byte_start:byte_end].decode('utf-8'))
+        content_end = end - 1 if flat[end - 1] in " \n" else end
+        if content_end - start <= max_chars:
+            spans.extend((start, content_end))
+        else:
+            _clause_spans(flat, start, content_end, max_chars, spans)
+        start, byte_start = end, byte_end
+    return spans
+
+
+def iter_segments(text, max_chars=SUBTITLE_MAX_CHARS):
+    """Genera el texto de cada subtítulo, en orden (sólo se guardan sus intervalos)."""
+    flat = normalize_spaces(text)
+    spans = iter(segment_spans(flat, max_chars))
+    for start, end in zip(spans, spans):
+        yield flat[start:end]
+
+
+def span_weights(flat, spans, weighting=SUBTITLE_WEIGHTING):
+    """
+    Peso de cada intervalo para repartir la duración: sílabas aproximadas (grupos de
+    vocales) o caracteres visibles, más la pausa que sigue a su signo final.
+
+    Las vocales se marcan una sola vez para todo el texto con bytes.translate, y cada
+    intervalo se cuenta con bytes.count, sin recorrer sus caracteres en Python.
+    """
+    chars = weighting == 'chars'
+    if not chars:
+        classes = flat.encode('latin-1', 'replace').translate(_VOWEL_CLASSES)
+    weights = array('d')
+    pairs = iter(spans)
+    for start, end in zip(pairs, pairs):
+        if chars:
+            weight = end - start - flat.count(" ", start, end)
+        else:
+            # Un grupo de vocales por cada vocal seguida de otra cosa, más el del final
+            weight = classes.count(b"ab", start, end) + (classes[end - 1] == 0x61)
+        last = flat[end - 1]
+        if last in _CLOSING_MARKS:
+            last = flat[start:end].rstrip(_CLOSING_MARKS)[-1:]
+        weights.append(max(weight + _PAUSE_WEIGHTS.get(last, 0.0), 1.0))
+    return weights
+
+
+def segment_weight(segment, weighting=SUBTITLE_WEIGHTING):
+    """Peso de un subtítulo (ver span_weights)."""
+    return span_weights(segment, (0, len(segment)), weighting)[0] if segment else 1.0
+
+
+def weighted_cues(text, total_duration, max_chars=SUBTITLE_MAX_CHARS, weighting=SUBTITLE_WEIGHTING):
+    """
+    Genera subtítulos repartiendo total_duration segundos en proporción al peso de cada uno.
+
+    El texto se segmenta una sola vez: de cada subtítulo se guardan su intervalo en el
+    texto normalizado y su peso (24 bytes en dos arrays, no la lista de segmentos), y
+    con el peso total ya conocido se generan los subtítulos recortando esos intervalos.
+    """
+    flat = normalize_spaces(text)
+    spans = segment_spans(flat, max_chars)
+    weights = span_weights(flat, spans, weighting)
+    total_weight = sum(weights)
+    if not total_weight:
+        return
+    seconds_per_weight = total_duration / total_weight
+    elapsed_weight = 0.0
+    pairs = iter(spans)
+    for weight, start, end in zip(weights, pairs, pairs):
+        yield {'start': elapsed_weight * seconds_per_weight,
+               'end': (elapsed_weight + weight) * seconds_per_weight,
+               'text': flat[start:end]}
+        elapsed_weight += weight
+
+
+def refine_cues(cues, max_chars=SUBTITLE_MAX_CHARS, weighting=SUBTITLE_WEIGHTING):
+    """
+    Divide los subtítulos con tiempos exactos (una oración por marca) que no caben en
+    max_chars, repartiendo el tiempo de la oración entre sus partes por su peso.
+    """
+    for cue in cues:
+        if len(cue['text']) <= max_chars:
+            yield cue
+            continue
+        yield from (
+            {'start': cue['start'] + part['start'], 'end': cue['start'] + part['end'], 'text': part['text']}
+            for part in weighted_cues(cue['text'], cue['end'] - cue['start'], max_chars, weighting)
+        )
+
+
+# --- Formatos ----------------------------------------------------------------
+
+def _split_ms(seconds):
+    secs, milliseconds = divmod(max(0, round(seconds * 1000)), 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, secs, milliseconds
+
+
+# Minutos, segundos y milisegundos ya formateados: indexar una tupla es más rápido que
+# formatear cada número en cada subtítulo
+_TWO_DIGITS = tuple(f"{number:02}" for number in range(100))
+_THREE_DIGITS = tuple(f"{number:03}" for number in range(1000))
+
+
+def format_srt_time(seconds):
+    """Segundos en el formato de tiempo SRT (HH:MM:SS,mmm)."""
+    hours, minutes, secs, milliseconds = _split_ms(seconds)
+    return f"{hours:02}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]},{_THREE_DIGITS[milliseconds]}"
+
+
+def format_vtt_time(seconds):
+    """Segundos en el formato de tiempo WebVTT (HH:MM:SS.mmm)."""
+    hours, minutes, secs, milliseconds = _split_ms(seconds)
+    return f"{hours:02}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]}.{_THREE_DIGITS[milliseconds]}"
+
+
+def format_ass_time(seconds):
+    """Segundos en el formato de tiempo ASS (H:MM:SS.cc, en centésimas)."""
+    hours, minutes, secs, milliseconds = _split_ms(seconds)
+    return f"{hours}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]}.{_TWO_DIGITS[milliseconds // 10]}"
+
+
+def _formatted_times(cues, format_time):
+    """
+    Genera (subtítulo, inicio, fin) con los tiempos ya formateados. El final de un
+    subtítulo suele ser el inicio del siguiente: en ese caso no se vuelve a formatear.
+    """
+    last_seconds = last_text = None
+    for cue in cues:
+        start_text = last_text if cue['start'] == last_seconds else format_time(cue['start'])
+        last_seconds = cue['end']
+        last_text = format_time(last_seconds)
+        yield cue, start_text, last_text
+
+
+_ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+PlayResX: 1080
+PlayResY: 1920
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, \
+Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, \
+MarginV, Encoding
+Style: Default,Arial,64,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,-1,0,0,0,100,100,0,0,1,4,0,5,60,60,0,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def _srt_entries(cues):
+    for number, (cue, start, end) in enumerate(_formatted_times(cues, format_srt_time), 1):
+        yield f"{number}\n{start} --> {end}\n{cue['text']}\n\n"
+
+
+def _vtt_entries(cues):
+    yield "WEBVTT\n\n"
+    for cue, start, end in _formatted_times(cues, format_vtt_time):
+        text = cue['text'].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        yield f"{start} --> {end}\n{text}\n\n"
+
+
+def _ass_entries(cues):
+    yield _ASS_HEADER
+    for cue, start, end in _formatted_times(cues, format_ass_time):
+        text = cue['text'].replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}").replace("\n", "\\N")
+        yield f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n"
+
+
+_WRITERS = {'srt': _srt_entries, 'vtt': _vtt_entries, 'ass': _ass_entries}
+
+
+def subtitle_format(file_name, subtitle_format_name=None):
+    """Formato pedido o, si no se indica, el de la extensión del archivo (SRT por defecto)."""
+    if subtitle_format_name:
+        name = subtitle_format_name.lower()
+    else:
+        name = os.path.splitext(str(file_name))[1].lstrip('.').lower()
+    return name if name in SUBTITLE_FORMATS else 'srt'
+
+
+def write_subtitles(cues, file_name, subtitle_format_name=None, max_chars=SUBTITLE_MAX_CHARS):
+    """
+    Escribe los subtítulos en file_name en SRT, WebVTT o ASS a medida que se generan.
+
+    'cues' puede ser cualquier iterable (por ejemplo weighted_cues); los que no caben en
+    max_chars se dividen con refine_cues. Devuelve el número de subtítulos escritos.
+    """
+    name = subtitle_format(file_name, subtitle_format_name)
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    tmp_path = f"{file_name}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        f.writelines(_WRITERS[name](counted(refine_cues(cues, max_chars))))
+    os.replace(tmp_path, file_name)
+    log_message("info", f"{count} subtítulos ({name.upper()}) guardados en {file_name}")
+    return count
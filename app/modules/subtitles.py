@@ -1,10 +1,51 @@
 # app/modules/subtitles.py
 
 import os
+import json
 import subprocess
-import vlc
-from app.modules.video import current_audio_path, load_text  # Importar la función y variable global
-from app.utils.utils import log_message, log_event_and_function
+from app.utils.debug import log_message, log_event_and_function
+from app.utils.directories import get_tmp_dir
+from app.utils.manifest import load_manifest, get_output
+from app.modules.subtitle_engine import weighted_cues, write_subtitles
+from app.modules.video.media_probe import media_duration_ms
+
+
+def current_audio_path():
+    """Ruta del audio generado por convert_text (del trabajo activo, si lo hay)."""
+    return os.path.join(get_tmp_dir(), 'final_temp_audio.mp3')
+
+
+def load_text(text_path):
+    """Lee el texto de los subtítulos."""
+    with open(text_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+
+@log_event_and_function("write_srt_from_cues_event")  # Decorador para la función
+def write_srt_from_cues(cues, file_name="subtitulos.srt"):
+    """
+    Genera un archivo de subtítulos con tiempos exactos a partir de las marcas de Text-to-Speech.
+    El formato (SRT, WebVTT o ASS) se deduce de la extensión de file_name.
+    :param cues: Lista de {'start': s, 'end': s, 'text': str} (ver app/modules/audio/timepoints.py).
+    :param file_name: El nombre del archivo de subtítulos que se generará.
+    """
+    log_message("info", f"Generando los subtítulos a partir de {len(cues)} marcas de tiempo.")
+    write_subtitles(cues, file_name)
+    return file_name
+
+
+def load_cues(cues_path=None):
+    """
+    Lee los subtítulos exactos que guardó convert_text en el manifiesto (o en el
+    archivo JSON cues_path, si se indica), o None si no hay para el audio actual.
+    """
+    if cues_path is None:
+        tts_output = get_output(load_manifest(), 'tts')
+        return (tts_output or {}).get('cues') or None
+    if not os.path.exists(cues_path):
+        return None
+    with open(cues_path, 'r', encoding='utf-8') as f:
+        return json.load(f) or None
 
 
 @log_event_and_function("generate_srt_from_text_file_event")  # Decorador para la función
@@ -15,30 +56,16 @@ def generate_srt_from_text_file(text_path, total_audio_duration, file_name="subt
     :param total_audio_duration: Duración total del audio en segundos.
     :param file_name: El nombre del archivo SRT que se generará.
     """
-    log_message("info", "Iniciando la generación del archivo SRT.")
-    text = load_text(text_path)  # Usa load_text() para obtener el texto
-    text_parts = text.split(". ")  # Dividimos el texto en frases
-    duration_per_part = total_audio_duration / len(text_parts)
-
-    def format_time(seconds):
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
-        milliseconds = int((seconds - int(seconds)) * 1000)
-        return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
-
-    srt_content = ""
-    for i, part in enumerate(text_parts):
-        start = i * duration_per_part
-        end = (i + 1) * duration_per_part
-        srt_content += f"{i + 1}\n"
-        srt_content += f"{format_time(start)} --> {format_time(end)}\n"
-        srt_content += f"{part}\n\n"
-
-    with open(file_name, "w", encoding="utf-8") as f:
-        f.write(srt_content)
-
-    log_message("info", f"Subtítulos guardados en {file_name}")
+    return generate_srt_from_text(load_text(text_path), total_audio_duration, file_name)
+
+
+def generate_srt_from_text(text, total_audio_duration, file_name="subtitulos.srt"):
+    """
+    Genera un archivo de subtítulos (SRT, WebVTT o ASS según la extensión) repartiendo la
+    duración del audio entre las oraciones y cláusulas del texto según su número de sílabas.
+    """
+    log_message("info", "Iniciando la generación de los subtítulos.")
+    write_subtitles(weighted_cues(text, total_audio_duration), file_name)
     return file_name
 
 
@@ -62,38 +89,75 @@ def add_subtitles_to_video(video_path, subtitles_path, output_path):
     log_message("info", f"Video con subtítulos guardado en {output_path}")
 
 
+def _escape_filter_path(path):
+    """Escapa una ruta para usarla dentro del filtro 'subtitles' de ffmpeg."""
+    return str(path).replace('\\', '/').replace(':', '\\:').replace("'", "'\\''")
+
+
+@log_event_and_function("render_story_video_event")  # Decorador para la función
+def render_story_video(video_path, audio_path, subtitles_path, output_path):
+    """
+    Renderiza el video final sin interfaz: fondo en bucle, audio narrado y subtítulos.
+    El video de fondo se repite hasta cubrir el audio y el resultado dura lo mismo que el audio.
+    :param video_path: La ruta del video de fondo.
+    :param audio_path: La ruta del audio narrado.
+    :param subtitles_path: La ruta del archivo SRT.
+    :param output_path: La ruta del video de salida.
+    """
+    log_message("info", f"Renderizando video: {output_path}")
+    command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-stream_loop', '-1', '-i', str(video_path),
+        '-i', str(audio_path),
+        '-vf', f"subtitles='{_escape_filter_path(subtitles_path)}'",
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-c:a', 'aac',
+        '-shortest', str(output_path),
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        log_message("error", f"Error al renderizar el video: {result.stderr}")
+        raise RuntimeError(f"Error al renderizar el video: {result.stderr}")
+    log_message("info", f"Video renderizado en {output_path}")
+    return output_path
+
+
 @log_event_and_function("process_subtitles_event")  # Decorador para la función
 def process_subtitles():
     """
     Función para procesar subtítulos: generar archivo SRT y añadir subtítulos al video.
     """
-    from app.utils.utils import get_data_dir
     from tkinter import filedialog, messagebox
 
-    # Rutas de los archivos
-    text_path = os.path.join(get_data_dir(), 'text_for_user.txt')  # Archivo de texto para subtítulos
+    # Texto y salida de la conversión, leídos una sola vez del manifiesto del trabajo
+    manifest = load_manifest()
+    text = (manifest['settings'].get('text') or "").strip()
+    tts_output = get_output(manifest, 'tts') or {}
 
-    # Verificar si el archivo de texto existe
-    if not os.path.exists(text_path):
-        log_message("error", "No se encontró el archivo de texto para los subtítulos.")
-        raise FileNotFoundError("No se encontró el archivo de texto para los subtítulos.")
+    if not text:
+        log_message("error", "No se encontró el texto para los subtítulos.")
+        raise FileNotFoundError("No se encontró el texto para los subtítulos.")
 
     # Obtener el archivo de audio actual cargado
-    audio_file_path = current_audio_path
+    audio_file_path = current_audio_path()
 
-    if audio_file_path is None:
+    if not os.path.exists(audio_file_path):
         log_message("error", "No se ha cargado ningún archivo de audio.")
         raise ValueError("No se ha cargado ningún archivo de audio.")
 
-    # Obtener la duración total del audio
-    try:
-        audio_duration = vlc.MediaPlayer(audio_file_path).get_length() / 1000  # Duración en segundos
-    except Exception as e:
-        log_message("error", f"Error al obtener la duración del audio: {e}")
-        raise RuntimeError(f"Error al obtener la duración del audio: {e}")
-
-    # Generar archivo SRT usando el texto del archivo
-    subtitles_path = generate_srt_from_text_file(text_path, audio_duration)
+    if tts_output.get('cues'):
+        # Tiempos exactos de las marcas de Text-to-Speech: no hace falta la duración del audio
+        subtitles_path = write_srt_from_cues(tts_output['cues'])
+    else:
+        # Obtener la duración total del audio (del manifiesto si convert_text la calculó)
+        duration_ms = tts_output.get('duration_ms') or media_duration_ms(audio_file_path)
+        if duration_ms <= 0:
+            log_message("error", f"No se pudo obtener la duración del audio {audio_file_path}.")
+            raise RuntimeError(f"No se pudo obtener la duración del audio {audio_file_path}.")
+        audio_duration = duration_ms / 1000  # Duración en segundos
+
+        # Generar archivo SRT repartiendo la duración entre las frases del texto
+        subtitles_path = generate_srt_from_text(text, audio_duration)
 
     # Seleccionar el archivo de video
     video_path = filedialog.askopenfilename(filetypes=[("Video Files", "*.mp4 *.avi *.mkv *.mov")])
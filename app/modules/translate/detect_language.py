@@ -1,12 +1,41 @@
 # app/modules/translate/detect_language.py
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 from app.config.credentials import GoogleCloudAPIManager
+from app.config.settings import LANGID_MIN_CONFIDENCE, LANGID_CACHE_SIZE
+from app.modules.translate.local_detect import LanguageDetector
 from ...utils.debug import log_message
-from ..messages import show_status_message
 
-def detect_language(text: str):
-    log_message('info', f"Iniciando la detección de idioma para el texto: {text}")
+# Idiomas ya detectados, por hash del texto (LRU)
+_detections = OrderedDict()
+_detections_lock = threading.Lock()
+_stats = {'cache': 0, 'local': 0, 'api': 0, 'undetected': 0}
+
+
+def _text_key(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
 
+def _remember(key, language):
+    with _detections_lock:
+        _detections[key] = language
+        _detections.move_to_end(key)
+        while len(_detections) > LANGID_CACHE_SIZE:
+            _detections.popitem(last=False)
+
+
+def detect_language_local(text: str, min_confidence: float = LANGID_MIN_CONFIDENCE):
+    """Idioma del texto según el modelo local, o None si la confianza no llega a min_confidence."""
+    language, confidence = LanguageDetector().detect(text)
+    log_message('debug', f"Detección local: {language} (confianza {confidence:.3f})")
+    return language if confidence >= min_confidence else None
+
+
+def detect_language_api(text: str):
+    """Detecta el idioma con la API de Translation (una petición)."""
     # Crear una instancia de GoogleCloudAPIManager
     google_cloud_manager = GoogleCloudAPIManager()
 
@@ -28,13 +57,47 @@ def detect_language(text: str):
 
         # Asegurarse de que la respuesta tenga el campo esperado
         if response.languages:
-            detected_language = response.languages[0].language_code  # Revisar la estructura aquí
-            log_message('debug', f"Idioma detectado: {detected_language}")
-            show_status_message(f"Idioma a traducir: {detected_language}", "info")
-            return detected_language
-        else:
-            log_message('warning', "No se detectó ningún idioma.")
-            return None
+            return response.languages[0].language_code  # Revisar la estructura aquí
+        log_message('warning', "No se detectó ningún idioma.")
+        return None
     except Exception as e:
         log_message('error', f"Error al detectar el idioma: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def detect_language(text: str, use_api: bool = True, notify: bool = True):
+    """
+    Detecta el idioma del texto: primero la caché por hash, después el modelo local y,
+    sólo si no reconoce el idioma o su confianza es baja (y use_api), la API de
+    Translation. Con notify se muestra el idioma en la barra de estado.
+    """
+    log_message('info', f"Iniciando la detección de idioma para el texto: {text}")
+    key = _text_key(text)
+    with _detections_lock:
+        cached = _detections.get(key)
+        if cached is not None:
+            _detections.move_to_end(key)
+            _stats['cache'] += 1
+    if cached is not None:
+        detected_language, source = cached, 'cache'
+    else:
+        detected_language, source = detect_language_local(text), 'local'
+        if detected_language is None and use_api:
+            detected_language, source = detect_language_api(text), 'api'
+        with _detections_lock:
+            _stats[source if detected_language else 'undetected'] += 1
+        if detected_language:
+            _remember(key, detected_language)
+
+    if detected_language:
+        log_message('debug', f"Idioma detectado ({source}): {detected_language}")
+        if notify:
+            from ..messages import show_status_message
+            show_status_message(f"Idioma a traducir: {detected_language}", "info")
+    return detected_language
+
+
+def get_detection_stats():
+    """Detecciones servidas desde la caché, el modelo local y la API, y las fallidas."""
+    with _detections_lock:
+        return dict(_stats, cached=len(_detections))
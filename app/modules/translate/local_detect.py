@@ -0,0 +1,203 @@
+# app/modules/translate/local_detect.py
+"""
+Detección de idioma local con perfiles de n-gramas de caracteres.
+
+El modelo (data/langid/model.json) guarda, para cada idioma, la log-probabilidad de
+sus n-gramas de 1 a 3 caracteres más frecuentes y la de un n-grama no visto. Se
+construye una sola vez con build_model() a partir de data/langid/corpus/<código>.txt
+y se carga al primer uso. Detectar el idioma de una historia lleva microsegundos y
+no necesita red.
+
+El modelo sólo conoce unos pocos idiomas y, por sí solo, asigna cualquier texto al
+más parecido (el sueco sale como alemán con confianza 0.9999). Por eso detect()
+devuelve "desconocido" (None) si el texto tiene letras que el idioma elegido no usa
+(otro alfabeto, 'å', 'ș'...), si pocos de sus trigramas están en el perfil de ese
+idioma o si la ventaja sobre el segundo idioma es pequeña. Ante un desconocido (o
+una confianza baja) el llamador deja que la API detecte el idioma. Los umbrales se
+ajustan con data/langid/validation; data/langid/heldout no se usa ni para entrenar ni
+para ajustar, sólo para medir (ver benchmarks/bench_langid.py).
+"""
+
+import os
+import re
+import json
+import math
+import threading
+from collections import Counter
+
+from app.utils.debug import log_message
+from app.utils.directories import get_project_root
+
+NGRAM_SIZES = (1, 2, 3)
+# N-gramas que se guardan por idioma
+PROFILE_SIZE = 2000
+# Peso de un n-grama no visto frente a uno visto una sola vez: penaliza los que no
+# existen en el idioma (la 'ú' en italiano) más que el suavizado de Laplace
+UNSEEN_WEIGHT = 0.1
+# Caracteres que se analizan como mucho: el comienzo basta para identificar el idioma
+MAX_CHARS = 600
+# Por debajo de este número de n-gramas (un título de dos palabras) no hay evidencia
+# suficiente y el idioma se da por desconocido
+MIN_NGRAMS = 40
+# Texto desconocido: letras ausentes del alfabeto del idioma (proporción y número mínimo),
+# trigramas presentes en su perfil y ventaja media por n-grama sobre el segundo idioma
+MAX_UNKNOWN_LETTERS = 0.005
+MIN_UNKNOWN_LETTERS = 2
+MIN_TRIGRAM_COVERAGE = 0.84
+MIN_MARGIN = 0.2
+
+_NON_LETTERS_RE = re.compile(r"[^\w']+|[\d_]+")
+
+
+# El modelo es parte del código (no del trabajo actual): siempre en <proyecto>/data/langid
+def model_path():
+    return get_project_root() / 'data' / 'langid' / 'model.json'
+
+
+def corpus_dir():
+    return get_project_root() / 'data' / 'langid' / 'corpus'
+
+
+# Textos que no se usan para construir el modelo (bench_langid.py): con los de validación
+# se ajustan los umbrales y con los reservados sólo se mide el resultado
+def validation_dir():
+    return get_project_root() / 'data' / 'langid' / 'validation'
+
+
+def heldout_dir():
+    return get_project_root() / 'data' / 'langid' / 'heldout'
+
+
+def extract_ngrams(text, max_chars=MAX_CHARS):
+    """Cuenta los n-gramas del texto en minúsculas, con las palabras separadas por un solo espacio."""
+    padded = f" {' '.join(_NON_LETTERS_RE.sub(' ', text[:max_chars].lower()).split())} "
+    counts = Counter()
+    for size in NGRAM_SIZES:
+        counts.update([padded[start:start + size] for start in range(len(padded) - size + 1)])
+    del counts[" "]
+    return counts
+
+
+def build_model(source_dir=None, destination=None, profile_size=PROFILE_SIZE):
+    """
+    Construye el modelo a partir de un archivo de texto por idioma (<código>.txt) y lo guarda.
+    Devuelve el modelo.
+    """
+    source_dir = str(source_dir or corpus_dir())
+    destination = str(destination or model_path())
+    languages = {}
+    for name in sorted(os.listdir(source_dir)):
+        code, extension = os.path.splitext(name)
+        if extension != '.txt':
+            continue
+        with open(os.path.join(source_dir, name), 'r', encoding='utf-8') as f:
+            counts = extract_ngrams(f.read(), max_chars=None)
+        total = sum(counts.values())
+        vocabulary = len(counts) + 1
+        languages[code] = {
+            'unseen': round(math.log(UNSEEN_WEIGHT / (total + vocabulary)), 4),
+            'ngrams': {gram: round(math.log((count + 1) / (total + vocabulary)), 4)
+                       for gram, count in counts.most_common(profile_size)},
+        }
+
+    model = {'ngram_sizes': list(NGRAM_SIZES), 'languages': languages}
+    tmp_path = f"{destination}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, destination)
+    log_message("info", f"Modelo de idiomas guardado en {destination}: {', '.join(languages)}.")
+    return model
+
+
+class LanguageDetector:
+    """Identificador de idioma local (ver el docstring del módulo)."""
+    _instance = None  # Para implementar Singleton
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(LanguageDetector, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+
+        self._lock = threading.Lock()
+        self._languages = None
+        self._alphabets = {}
+        self._initialized = True
+
+    def _load(self):
+        if self._languages is None:
+            with self._lock:
+                if self._languages is None:
+                    try:
+                        with open(model_path(), 'r', encoding='utf-8') as f:
+                            model = json.load(f)
+                        self._alphabets = {code: frozenset(gram for gram in profile['ngrams']
+                                                           if len(gram) == 1 and gram.isalpha())
+                                           for code, profile in model['languages'].items()}
+                        self._languages = model['languages']
+                    except (OSError, ValueError, KeyError) as e:
+                        log_message("warning", f"No se pudo cargar el modelo de idiomas local: {e}")
+                        self._languages = {}
+        return self._languages
+
+    def languages(self):
+        return list(self._load())
+
+    def _unknown_reason(self, text, counts, total, scores, best):
+        """Motivo por el que el texto no parece de ninguno de los idiomas del modelo, o None."""
+        if total < MIN_NGRAMS:
+            return f"texto corto ({total} n-gramas)"
+        alphabet = self._alphabets.get(best, ())
+        letters = [char for char in text[:MAX_CHARS].lower() if char.isalpha()]
+        unknown_letters = sum(1 for char in letters if char not in alphabet)
+        if unknown_letters >= MIN_UNKNOWN_LETTERS and unknown_letters > MAX_UNKNOWN_LETTERS * len(letters):
+            return f"{unknown_letters} letras ajenas a '{best}'"
+
+        trigrams = [(gram, count) for gram, count in counts.items() if len(gram) == 3]
+        trigram_total = sum(count for _, count in trigrams)
+        ngrams = self._languages[best]['ngrams']
+        coverage = sum(count for gram, count in trigrams if gram in ngrams) / max(trigram_total, 1)
+        if coverage < MIN_TRIGRAM_COVERAGE:
+            return f"cobertura de trigramas {coverage:.2f}"
+
+        if len(scores) > 1:
+            second = max(score for code, score in scores.items() if code != best)
+            margin = (scores[best] - second) / total
+            if margin < MIN_MARGIN:
+                return f"margen {margin:.3f} sobre el segundo idioma"
+        return None
+
+    def detect(self, text):
+        """
+        Devuelve (código, confianza) del idioma más probable, o (None, 0.0) si no se
+        puede detectar o el texto no parece de ninguno de los idiomas del modelo.
+
+        La confianza es la probabilidad posterior del mejor idioma frente a los demás,
+        calculada como si el texto tuviera MIN_NGRAMS n-gramas: uno largo no pasa de esa
+        evidencia, así que sólo es alta si el mejor idioma destaca claramente.
+        """
+        languages = self._load()
+        counts = extract_ngrams(text or "")
+        total = sum(counts.values())
+        if not languages or not total:
+            return None, 0.0
+
+        scores = {}
+        for code, profile in languages.items():
+            ngrams, unseen = profile['ngrams'], profile['unseen']
+            scores[code] = sum(ngrams.get(gram, unseen) * count for gram, count in counts.items())
+
+        best = max(scores, key=scores.get)
+        reason = self._unknown_reason(text, counts, total, scores, best)
+        if reason:
+            log_message("debug", f"Idioma desconocido para el modelo local ({reason}).")
+            return None, 0.0
+
+        # Sin normalizar, cualquier texto largo daría una confianza de 1.0 aunque los
+        # idiomas estuvieran muy igualados
+        scale = MIN_NGRAMS / total
+        posterior = 1 / sum(math.exp((score - scores[best]) * scale) for score in scores.values())
+        return best, posterior
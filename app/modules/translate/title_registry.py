@@ -0,0 +1,197 @@
+# app/modules/translate/title_registry.py
+
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+
+from app.utils.debug import log_message
+from app.utils.directories import get_extra_dir
+from app.config.settings import TITLE_SIMILARITY_THRESHOLD
+
+# MinHash con LSH: NUM_BANDS bandas de ROWS_PER_BAND valores. Dos títulos con una
+# similitud de Jaccard (trigramas) de 0.5 coinciden en alguna banda con un 93 % de
+# probabilidad; con 0.2, sólo con un 15 %, así que se comparan pocos candidatos.
+NUM_BANDS = 20
+ROWS_PER_BAND = 3
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20241013)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    normalized TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+"""
+
+
+def normalize_title(title):
+    """Minúsculas, sin tildes, sin signos de puntuación y con los espacios colapsados."""
+    decomposed = unicodedata.normalize("NFKD", title.casefold())
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_RE.sub(" ", without_accents).split())
+
+
+def title_shingles(normalized):
+    """Trigramas de caracteres del título normalizado (con un espacio a cada lado)."""
+    padded = f" {normalized} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)} or {padded}
+
+
+def minhash_signature(shingles):
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+              % _MERSENNE_PRIME for shingle in shingles]
+    return array("Q", [min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _PERMUTATIONS])
+
+
+_BAND_BYTES = ROWS_PER_BAND * array("Q").itemsize
+
+
+def _bands(signature_bytes):
+    """Claves de las bandas: los bytes de cada banda de la firma, sin convertirlos a enteros."""
+    return [signature_bytes[band * _BAND_BYTES:(band + 1) * _BAND_BYTES] for band in range(NUM_BANDS)]
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second) if first or second else 1.0
+
+
+class TitleRegistry:
+    """
+    Registro persistente de los títulos ya publicados (SQLite en app/extra/).
+
+    La búsqueda exacta usa un conjunto en memoria con los títulos normalizados, así que
+    'Mi familia!' y 'mi Familia' cuentan como el mismo título. Los casi duplicados
+    (títulos reescritos) se buscan con un índice MinHash/LSH sobre trigramas de
+    caracteres: sólo se comparan los títulos que comparten alguna banda, y la similitud
+    de los candidatos se calcula con sus trigramas exactos. La firma MinHash se guarda
+    con cada título, de modo que cargar decenas de miles de títulos no la recalcula, y
+    los trigramas sólo se calculan para los títulos que salen como candidatos.
+    La primera vez se importan los títulos de app/extra/used_titles.py.
+    """
+    _instance = None  # Para implementar Singleton
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(TitleRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, db_path=None):
+        if hasattr(self, '_initialized'):
+            return
+
+        self.db_path = str(db_path or get_extra_dir() / 'used_titles.sqlite3')
+        self._lock = threading.Lock()
+        self._connection = None
+        self._titles = {}      # normalizado -> título original
+        self._shingles = {}    # normalizado -> trigramas (de los candidatos ya comparados)
+        self._buckets = [{} for _ in range(NUM_BANDS)]  # por banda: bytes de la banda -> {normalizados}
+        self._initialized = True
+
+    # --- Carga ------------------------------------------------------------
+
+    def _connect(self):
+        if self._connection is None:
+            start = time.perf_counter()
+            self._connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+            rows = self._connection.execute("SELECT title, normalized, signature FROM titles").fetchall()
+            for title, normalized, signature in rows:
+                self._index(title, normalized, signature)
+            if not rows:
+                self._import_legacy()
+            log_message("info", f"Registro de títulos cargado: {len(self._titles)} títulos en "
+                                f"{(time.perf_counter() - start) * 1000:.0f} ms.")
+        return self._connection
+
+    def _import_legacy(self):
+        """Importa la lista TITLES de app/extra/used_titles.py (registro anterior)."""
+        try:
+            from app.extra.used_titles import TITLES
+        except ImportError:
+            return
+        added = sum(1 for title in TITLES if self._insert(title))
+        if added:
+            log_message("info", f"{added} títulos importados de used_titles.py al registro.")
+
+    def _index(self, title, normalized, signature_bytes):
+        self._titles[normalized] = title
+        for buckets, key in zip(self._buckets, _bands(signature_bytes)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {normalized}
+            else:
+                bucket.add(normalized)
+
+    def _candidate_shingles(self, normalized):
+        shingles = self._shingles.get(normalized)
+        if shingles is None:
+            shingles = self._shingles[normalized] = title_shingles(normalized)
+        return shingles
+
+    def _insert(self, title):
+        normalized = normalize_title(title)
+        if not normalized or normalized in self._titles:
+            return False
+        signature_bytes = minhash_signature(title_shingles(normalized)).tobytes()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO titles (title, normalized, signature, added_at) VALUES (?, ?, ?, ?)",
+                (title, normalized, signature_bytes, time.time()))
+        self._index(title, normalized, signature_bytes)
+        return True
+
+    # --- Consultas --------------------------------------------------------
+
+    def contains(self, title):
+        """Indica si el título (normalizado) ya está registrado."""
+        with self._lock:
+            self._connect()
+            return normalize_title(title) in self._titles
+
+    def find_similar(self, title, threshold=TITLE_SIMILARITY_THRESHOLD, limit=5):
+        """
+        Títulos registrados parecidos: [(título, similitud), ...] de mayor a menor
+        similitud, con similitud >= threshold. Incluye el propio título si ya existe.
+        """
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+        shingles = title_shingles(normalized)
+        signature_bytes = minhash_signature(shingles).tobytes()
+        with self._lock:
+            self._connect()
+            candidates = set()
+            for buckets, key in zip(self._buckets, _bands(signature_bytes)):
+                candidates.update(buckets.get(key, ()))
+            matches = [(self._titles[candidate], jaccard(shingles, self._candidate_shingles(candidate)))
+                       for candidate in candidates]
+        matches = [match for match in matches if match[1] >= threshold]
+        return sorted(matches, key=lambda match: match[1], reverse=True)[:limit]
+
+    def add(self, title):
+        """Registra el título. Devuelve False si ya existía (o está vacío)."""
+        with self._lock:
+            self._connect()
+            try:
+                return self._insert(title.strip())
+            except sqlite3.Error as e:
+                log_message("error", f"No se pudo guardar el título en el registro: {e}")
+                return False
+
+    def __len__(self):
+        with self._lock:
+            self._connect()
+            return len(self._titles)
@@ -1,11 +1,58 @@
 # app/modules/translate/translate_text.py
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 from app.config.credentials import GoogleCloudAPIManager
+from app.utils.directories import with_job_context
+from app.config.settings import TRANSLATE_MAX_CONCURRENT_REQUESTS, TRANSLATE_BATCH_CODEPOINTS
+from app.modules.translate.translation_memory import TranslationMemory, split_sentences, make_memory_key
+from app.modules.translate.detect_language import detect_language
 from ...utils.debug import log_message
 
+# Modelo de traducción (forma parte de la clave de la memoria de traducción)
+TRANSLATION_MODEL = "general/nmt"
 
-def translate_text_with_model(text: str, target_language: str, source_language: str = None):
-    # Crear una instancia de GoogleCloudAPIManager
+# Límites de una petición translate_text (API v3): segmentos y puntos de código en total
+MAX_SEGMENTS_PER_REQUEST = 1024
+MAX_CODEPOINTS_PER_REQUEST = 30000
+
+
+def _pack_requests(segments, max_codepoints=TRANSLATE_BATCH_CODEPOINTS):
+    """
+    Agrupa los índices de los segmentos no vacíos, en orden, en lotes de como mucho
+    max_codepoints puntos de código (sin pasar de los límites de la API). Un texto corto
+    cabe en una sola petición; uno largo se reparte en lotes que se traducen a la vez.
+    """
+    max_codepoints = min(max_codepoints, MAX_CODEPOINTS_PER_REQUEST)
+    batches = []
+    current, size = [], 0
+    for index, segment in enumerate(segments):
+        if not segment or not segment.strip():
+            continue
+        if current and (len(current) >= MAX_SEGMENTS_PER_REQUEST or size + len(segment) > max_codepoints):
+            batches.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += len(segment)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_segments(segments, target_language: str, source_language: str = None, mime_type: str = "text/plain",
+                       max_workers: int = None):
+    """
+    Traduce varios segmentos (título, oraciones, párrafos...) en lotes del tamaño de una petición.
+
+    Los lotes se envían en paralelo con como mucho max_workers peticiones simultáneas
+    (TRANSLATE_MAX_CONCURRENT_REQUESTS por defecto). Sin source_language la API detecta
+    el idioma de cada segmento en la misma petición, así que no hace falta llamar antes a
+    detect_language. Devuelve una lista, en el orden de entrada, de (texto_traducido,
+    idioma_detectado); los segmentos vacíos se devuelven vacíos sin enviarlos. Devuelve
+    None si falla alguna petición.
+    """
+    segments = list(segments)
     google_cloud_manager = GoogleCloudAPIManager()
 
     # Obtener el cliente de traducción
@@ -28,30 +75,110 @@ def translate_text_with_model(text: str, target_language: str, source_language:
         return None
 
     # Configurar los parámetros del proyecto y modelo personalizado
-    model_id = "general/nmt"
+    model_id = TRANSLATION_MODEL
     location = "us-central1"
     parent = f"projects/{project_id}/locations/{location}"
     model_path = f"{parent}/models/{model_id}"
 
     log_message('debug', f"Parámetros de traducción - Project ID: {project_id}, Model Path: {model_path}")
 
-    try:
+    def translate_batch(indexes):
         # Realizar la traducción utilizando el modelo personalizado
         response = translate_client.translate_text(
             request={
-                "contents": [text],
+                "contents": [segments[index] for index in indexes],
                 "target_language_code": target_language,
                 "source_language_code": source_language,
                 "model": model_path,
                 "parent": parent,
-                "mime_type": "text/plain",
+                "mime_type": mime_type,
             }
         )
         log_message('debug', f"Respuesta de Google Translate: {response}")
+        return response.translations
 
-        # Retornar el texto traducido
-        return response.translations[0].translated_text
-
+    results = [(segment, source_language) for segment in segments]
+    batches = _pack_requests(segments)
+    if not batches:
+        return results
+    max_workers = max(1, min(max_workers or TRANSLATE_MAX_CONCURRENT_REQUESTS, len(batches)))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate") as executor:
+            # Cada lote escribe en sus propias posiciones: el orden original se conserva
+            for indexes, translations in zip(batches, executor.map(with_job_context(translate_batch), batches)):
+                for index, translation in zip(indexes, translations):
+                    results[index] = (translation.translated_text,
+                                      source_language or translation.detected_language_code or None)
     except Exception as e:
         log_message('error', f"Error al traducir: {str(e)}", exc_info=True)
         return None
+
+    log_message('info', f"{len(segments)} segmentos traducidos en {len(batches)} petición(es) "
+                        f"con {max_workers} simultáneas.")
+    return results
+
+
+def translate_texts(texts, target_language: str, source_language: str = None):
+    """
+    Traduce textos completos (título, historia...) pasando por la memoria de traducción.
+
+    Cada texto se divide en oraciones; las que ya estén en la memoria se sirven en local
+    y las demás se envían con translate_segments (lotes en paralelo si el texto es largo),
+    sin repetir las duplicadas. Los separadores originales (espacios, saltos de línea y
+    por tanto los párrafos) se conservan. Devuelve una lista de (texto_traducido,
+    idioma_detectado) en el orden de entrada, o None si falla.
+
+    Los textos que se traducen juntos son de la misma historia y salen en una sola tanda
+    de peticiones. Sólo se envía source_language a la API si lo indica el llamador (una
+    elección del usuario); si no, la API detecta el idioma en la misma petición de
+    traducción. El modelo local, aplicado una sola vez al título junto con el texto, sólo
+    etiqueta las entradas de la memoria: un error suyo (un idioma que no conoce) no
+    cambia la traducción.
+    """
+    texts = list(texts)
+    memory = TranslationMemory()
+    memory_source = source_language
+    if source_language is None:
+        combined = "\n".join(text for text in texts if text and text.strip())
+        memory_source = detect_language(combined, use_api=False, notify=False) if combined else None
+    splits = [split_sentences(text or "") for text in texts]
+    keys = [[make_memory_key(sentence, memory_source, target_language, TRANSLATION_MODEL)
+             for sentence in sentences] for _, sentences in splits]
+    known = memory.lookup(key for text_keys in keys for key in text_keys)
+
+    # Oraciones que faltan, una sola vez cada una
+    pending = {}
+    for (_, sentences), text_keys in zip(splits, keys):
+        for sentence, key in zip(sentences, text_keys):
+            if key not in known:
+                pending.setdefault(key, sentence)
+    if pending:
+        results = translate_segments(list(pending.values()), target_language, source_language)
+        if results is None:
+            return None
+        new_entries = [(key, sentence, translated, detected)
+                       for (key, sentence), (translated, detected) in zip(pending.items(), results)]
+        memory.store(new_entries, memory_source, target_language, TRANSLATION_MODEL)
+        known.update((key, (translated, detected)) for key, _, translated, detected in new_entries)
+
+    log_message('info', f"Memoria de traducción: {sum(len(k) for k in keys) - len(pending)} oraciones "
+                        f"reutilizadas, {len(pending)} enviadas a la API.")
+
+    translations = []
+    for (separators, sentences), text_keys in zip(splits, keys):
+        parts = [separators[0]]
+        languages = Counter()
+        for key, separator in zip(text_keys, separators[1:]):
+            translated, detected = known[key]
+            parts.extend([translated, separator])
+            if detected:
+                languages[detected] += 1
+        detected_language = source_language or (languages.most_common(1)[0][0] if languages else memory_source)
+        translations.append(("".join(parts), detected_language))
+    return translations
+
+
+def translate_text_with_model(text: str, target_language: str, source_language: str = None):
+    """Traduce un único texto; devuelve el texto traducido o None."""
+    results = translate_texts([text], target_language, source_language)
+    return results[0][0] if results else None
@@ -0,0 +1,175 @@
+# app/modules/translate/translation_memory.py
+
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+from app.utils.debug import log_message
+from app.utils.directories import get_cache_dir
+from app.config.settings import TRANSLATION_MEMORY_ENABLED, TRANSLATION_MEMORY_MAX_ENTRIES
+from app.modules.audio.chunker import sentence_starts
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    model TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    detected_language TEXT,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_last_access ON segments (last_access);
+"""
+
+
+def normalize_sentence(sentence):
+    """Forma canónica de una oración para la clave: NFC y espacios interiores colapsados."""
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+def split_sentences(text):
+    """
+    Divide un texto en oraciones conservando los separadores exactos.
+
+    Devuelve (separadores, oraciones) con len(separadores) == len(oraciones) + 1, de modo
+    que separadores[0] + oraciones[0] + separadores[1] + ... reconstruye el texto. Los
+    saltos de línea son siempre separadores, así que los párrafos se mantienen. Los
+    cortes son los de chunker.sentence_starts (abreviaturas y diálogos incluidos).
+    """
+    data = text.encode('utf-8')
+    starts = sentence_starts(data, lines=True)
+    if not starts:
+        return [text], []
+
+    separators, sentences = [data[:starts[0]].decode('utf-8')], []
+    for number, start in enumerate(starts):
+        end = starts[number + 1] if number + 1 < len(starts) else len(data)
+        segment = data[start:end]
+        stripped = segment.rstrip()
+        sentences.append(stripped.decode('utf-8'))
+        separators.append(segment[len(stripped):].decode('utf-8'))
+    return separators, sentences
+
+
+def make_memory_key(sentence, source_language, target_language, model):
+    payload = "\x1f".join([normalize_sentence(sentence), source_language or "auto", target_language, model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    Memoria de traducción persistente a nivel de oración (SQLite en cache/).
+
+    Cada oración traducida se guarda con su clave (oración normalizada, idioma de origen,
+    idioma de destino y modelo), así que al volver a traducir una historia editada sólo
+    se envían a la API las oraciones nuevas o cambiadas. Cuando se supera
+    TRANSLATION_MEMORY_MAX_ENTRIES se eliminan las entradas usadas hace más tiempo.
+    """
+    _instance = None  # Para implementar Singleton
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(TranslationMemory, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES, enabled=TRANSLATION_MEMORY_ENABLED):
+        if hasattr(self, '_initialized'):
+            return
+
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.db_path = get_cache_dir() / 'translation_memory.sqlite3'
+        self._lock = threading.Lock()
+        self._connection = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._initialized = True
+
+    def _connect(self):
+        if self._connection is None:
+            # Varios procesos de trabajo pueden compartir la base: WAL y espera ante bloqueos
+            self._connection = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def lookup(self, keys):
+        """Devuelve {clave: (traducción, idioma_detectado)} de las claves que estén en la memoria."""
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+        found = {}
+        with self._lock:
+            try:
+                connection = self._connect()
+                # Consultas por bloques para no superar el límite de parámetros de SQLite
+                for start in range(0, len(keys), 500):
+                    block = keys[start:start + 500]
+                    rows = connection.execute(
+                        f"SELECT key, translation, detected_language FROM segments "
+                        f"WHERE key IN ({','.join('?' * len(block))})", block)
+                    found.update((key, (translation, detected)) for key, translation, detected in rows)
+                if found:
+                    now = time.time()
+                    with connection:
+                        connection.executemany("UPDATE segments SET last_access = ? WHERE key = ?",
+                                               [(now, key) for key in found])
+            except sqlite3.Error as e:
+                log_message("warning", f"No se pudo consultar la memoria de traducción: {e}")
+                return {}
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, entries, source_language, target_language, model):
+        """Guarda [(clave, oración, traducción, idioma_detectado), ...] y aplica el límite de tamaño."""
+        if not self.enabled or not entries:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(key, source_language or "auto", target_language, model,
+                          normalize_sentence(sentence), translation, detected, now)
+                         for key, sentence, translation, detected in entries])
+                    self._evict(connection)
+            except sqlite3.Error as e:
+                log_message("warning", f"No se pudo guardar en la memoria de traducción: {e}")
+
+    def _evict(self, connection):
+        """Elimina las entradas menos usadas hasta quedar dentro del límite."""
+        count = connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            connection.execute("DELETE FROM segments WHERE key IN "
+                               "(SELECT key FROM segments ORDER BY last_access LIMIT ?)", (excess,))
+            self.evictions += excess
+            log_message("debug", f"{excess} entradas expulsadas de la memoria de traducción.")
+
+    def get_stats(self):
+        """Devuelve los contadores de la memoria."""
+        with self._lock:
+            entries = 0
+            if self.enabled:
+                try:
+                    entries = self._connect().execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'max_entries': self.max_entries,
+            }
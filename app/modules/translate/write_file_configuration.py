@@ -1,7 +1,7 @@
 # app/modules/translate/write_file_configuration.py
 
 from ...utils.debug import log_message
-from ...utils.utils import write
+from ...utils.manifest import update_manifest
 from ..messages import show_status_message
 
 
@@ -18,9 +18,8 @@ def write_file_configuration(text, title):
         show_status_message("Traducción validada", "success")
         log_message('success', "Traducción validada.")
 
-        # Guardar los textos en archivos usando la función 'write'
-        write('text_translate.txt', text)
-        write('title_translate.txt', title)
+        # Guardar la traducción en el manifiesto del trabajo
+        update_manifest('translation', {'text': text, 'title': title})
 
         show_status_message("Traducción almacenada para el siguiente paso.", "success")
         log_message('info', "Traducción almacenada para el siguiente paso.")
@@ -0,0 +1,277 @@
+# app/modules/video/media_probe.py
+"""
+Información de archivos de audio y video: duración, códec, frecuencia y flujos.
+
+Los MP3 (cabecera Xing/Info/VBRI o, si no la tienen, recorriendo las cabeceras de las
+tramas) y los WAV (bloques RIFF 'fmt ' y 'data') se leen en el propio proceso; el resto
+de formatos, o un archivo que no se pueda interpretar, se consulta con
+'ffprobe -print_format json'. El resultado se guarda por ruta junto con el tamaño y la
+fecha de modificación del archivo: mientras no cambien, repetir la consulta no lee el
+archivo ni lanza procesos.
+"""
+
+import os
+import json
+import mmap
+import struct
+import threading
+import subprocess
+from collections import OrderedDict
+
+from app.utils.debug import log_message
+from app.config.settings import MEDIA_PROBE_CACHE_SIZE
+from app.modules.audio.ffmpeg_stream import id3_size, mp3_frame_header
+
+# Bytes en los que se busca la primera trama MP3 tras la etiqueta ID3
+MP3_SYNC_SEARCH_BYTES = 64 * 1024
+FFPROBE_TIMEOUT_SECONDS = 30
+
+# Formatos WAVE comprimidos -> nombre del códec (como los da ffprobe); PCM se nombra por sus bits
+_WAV_CODECS = {6: 'pcm_alaw', 7: 'pcm_mulaw'}
+
+# Resultados por ruta absoluta: ((tamaño, mtime_ns), información o None) (LRU)
+_probes = OrderedDict()
+_probes_lock = threading.Lock()
+_stats = {'cache': 0, 'header': 0, 'ffprobe': 0, 'failed': 0}
+
+
+# --- MP3 ---------------------------------------------------------------------
+
+def _first_mp3_frame(data, start):
+    """Posición y cabecera de la primera trama válida (seguida de otra trama o del final)."""
+    end = min(len(data), start + MP3_SYNC_SEARCH_BYTES)
+    pos = data.find(b"\xff", start, end)
+    while pos != -1:
+        frame = mp3_frame_header(data, pos)
+        if frame is not None:
+            following = pos + frame['length']
+            if following >= len(data) or mp3_frame_header(data, following) is not None:
+                return pos, frame
+        pos = data.find(b"\xff", pos + 1, end)
+    return None, None
+
+
+def _xing_frames(data, pos, frame):
+    """Número de tramas de audio según la cabecera Xing/Info o VBRI de la primera trama, o None."""
+    mono = frame['channels'] == 1
+    if frame['version'] == 3:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    tag = pos + 4 + side_info
+    if data[tag:tag + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[tag + 4:tag + 8])[0]
+        if flags & 0x01:
+            return struct.unpack(">I", data[tag + 8:tag + 12])[0]
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        return struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+    return None
+
+
+def _probe_mp3(data):
+    pos, frame = _first_mp3_frame(data, id3_size(data[:10]))
+    if frame is None:
+        return None
+
+    frames = _xing_frames(data, pos, frame)
+    if frames is not None:
+        samples = frames * frame['samples']
+    else:
+        # Sin cabecera Xing: se suman las tramas (sólo se leen sus 4 bytes de cabecera)
+        samples = 0
+        current = frame
+        while current is not None:
+            samples += current['samples']
+            pos += current['length']
+            current = mp3_frame_header(data, pos)
+
+    duration = samples / float(frame['sample_rate'])
+    stream = {
+        'index': 0,
+        'codec_type': 'audio',
+        'codec_name': 'mp3',
+        'sample_rate': frame['sample_rate'],
+        'channels': frame['channels'],
+        'bit_rate': frame['bitrate'],
+        'duration': duration,
+    }
+    return {'format': 'mp3', 'duration': duration, 'streams': [stream]}
+
+
+# --- WAV ---------------------------------------------------------------------
+
+def _probe_wav(data):
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    fmt = None
+    data_size = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIHH", data[pos + 8:pos + 24])
+        elif chunk_id == b"data":
+            # Un WAV escrito en streaming puede no tener el tamaño real (0 o 0xFFFFFFFF)
+            data_size = min(chunk_size, len(data) - pos - 8) if chunk_size else len(data) - pos - 8
+            break
+        pos += 8 + chunk_size + (chunk_size & 1)
+    if fmt is None or data_size is None:
+        return None
+
+    format_tag, channels, sample_rate, byte_rate, _block_align, bits = fmt
+    if not byte_rate:
+        return None
+    duration = data_size / float(byte_rate)
+    if format_tag == 1:
+        codec = f"pcm_{'s' if bits > 8 else 'u'}{bits}le"
+    elif format_tag == 3:
+        codec = f"pcm_f{bits}le"
+    else:
+        codec = _WAV_CODECS.get(format_tag, f"wav_{format_tag:#06x}")
+    stream = {
+        'index': 0,
+        'codec_type': 'audio',
+        'codec_name': codec,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'bit_rate': byte_rate * 8,
+        'duration': duration,
+    }
+    return {'format': 'wav', 'duration': duration, 'streams': [stream]}
+
+
+# --- ffprobe -----------------------------------------------------------------
+
+def _number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _probe_ffprobe(path):
+    """Consulta ffprobe (formato y flujos en JSON)."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=FFPROBE_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        log_message("warning", f"No se pudo ejecutar ffprobe para {path}: {e}")
+        return None
+    if result.returncode != 0:
+        log_message("warning", f"ffprobe no reconoce {path}: {result.stderr.strip()}")
+        return None
+    try:
+        report = json.loads(result.stdout or "{}")
+    except ValueError as e:
+        log_message("warning", f"Salida de ffprobe no válida para {path}: {e}")
+        return None
+
+    streams = []
+    for stream in report.get('streams', []):
+        info = {
+            'index': stream.get('index', len(streams)),
+            'codec_type': stream.get('codec_type'),
+            'codec_name': stream.get('codec_name'),
+            'duration': _number(stream.get('duration')),
+            'bit_rate': _number(stream.get('bit_rate'), int),
+        }
+        if stream.get('codec_type') == 'audio':
+            info['sample_rate'] = _number(stream.get('sample_rate'), int)
+            info['channels'] = stream.get('channels')
+        elif stream.get('codec_type') == 'video':
+            info['width'] = stream.get('width')
+            info['height'] = stream.get('height')
+            info['frame_rate'] = stream.get('avg_frame_rate')
+        streams.append(info)
+
+    format_info = report.get('format', {})
+    duration = _number(format_info.get('duration'))
+    if duration is None:
+        duration = max((stream['duration'] or 0.0 for stream in streams), default=None)
+    return {'format': format_info.get('format_name'), 'duration': duration, 'streams': streams}
+
+
+# --- Consulta ----------------------------------------------------------------
+
+def _probe_headers(path):
+    """Lee las cabeceras MP3 o WAV proyectando el archivo en memoria (sin copiarlo)."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:4] == b"RIFF":
+                return _probe_wav(data)
+            return _probe_mp3(data)
+
+
+def _summarize(info, path, size, source):
+    """Añade al resultado los datos del primer flujo de audio (códec, frecuencia, canales)."""
+    audio = next((stream for stream in info['streams'] if stream.get('codec_type') == 'audio'), {})
+    info.update(
+        path=str(path),
+        size=size,
+        source=source,
+        codec=audio.get('codec_name'),
+        sample_rate=audio.get('sample_rate'),
+        channels=audio.get('channels'),
+    )
+    return info
+
+
+def probe_media(path):
+    """
+    Información del archivo de audio o video, o None si no existe o no se reconoce:
+    {'path', 'size', 'format', 'duration' (segundos), 'codec', 'sample_rate', 'channels',
+    'streams': [{'index', 'codec_type', 'codec_name', ...}], 'source': 'header' o 'ffprobe'}.
+    """
+    path = os.path.abspath(str(path))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        log_message("warning", f"El archivo {path} no existe.")
+        return None
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    with _probes_lock:
+        cached = _probes.get(path)
+        if cached is not None and cached[0] == signature:
+            _probes.move_to_end(path)
+            _stats['cache'] += 1
+            return dict(cached[1]) if cached[1] else None
+
+    info, source = None, 'header'
+    if stat.st_size:
+        try:
+            info = _probe_headers(path)
+        except (OSError, ValueError, struct.error) as e:
+            log_message("debug", f"No se pudieron leer las cabeceras de {path}: {e}")
+    if info is None:
+        info, source = _probe_ffprobe(path), 'ffprobe'
+    if info is not None:
+        info = _summarize(info, path, stat.st_size, source)
+        log_message("debug", f"Información de {path} ({source}): {info['format']}, {info['duration']} s")
+
+    with _probes_lock:
+        _stats[source if info else 'failed'] += 1
+        if MEDIA_PROBE_CACHE_SIZE:
+            _probes[path] = (signature, info)
+            _probes.move_to_end(path)
+            while len(_probes) > MEDIA_PROBE_CACHE_SIZE:
+                _probes.popitem(last=False)
+    return dict(info) if info else None
+
+
+def media_duration_ms(path):
+    """Duración del archivo en milisegundos, o -1 si no se puede obtener."""
+    info = probe_media(path)
+    if not info or not info.get('duration'):
+        return -1
+    return int(round(info['duration'] * 1000))
+
+
+def get_probe_stats():
+    """Consultas servidas desde la caché, por cabeceras y por ffprobe, y las fallidas."""
+    with _probes_lock:
+        return dict(_stats, cached=len(_probes))
@@ -1,8 +1,17 @@
 # app/utils/utils.py
 
+import os
 import sys
+import functools
+import contextvars
+from contextlib import contextmanager
 from pathlib import Path
 
+# Directorio del trabajo activo. Se resuelve primero en el contexto (hilo o tarea actual)
+# y después en la variable de entorno, que heredan todos los hilos de un proceso de trabajo.
+JOB_DIR_ENV = 'TIKTOK_JOB_DIR'
+_job_dir = contextvars.ContextVar('job_dir', default=None)
+
 
 def get_project_root() -> Path:
     """
@@ -20,9 +29,41 @@ def get_lang_dir() -> Path:
     lang_dir.mkdir(parents=True, exist_ok=True)
     return lang_dir
 
+def get_job_dir():
+    """Devuelve el directorio del trabajo activo o None si se usa el proyecto (interfaz gráfica)."""
+    job_dir = _job_dir.get() or os.environ.get(JOB_DIR_ENV)
+    return Path(job_dir) if job_dir else None
+
+@contextmanager
+def job_scope(job_dir):
+    """
+    Hace que get_data_dir() y get_tmp_dir() apunten a job_dir/data y job_dir/tmp
+    mientras dura el bloque, para que varios trabajos no compartan archivos intermedios.
+    """
+    token = _job_dir.set(str(job_dir))
+    try:
+        yield Path(job_dir)
+    finally:
+        _job_dir.reset(token)
+
+def with_job_context(function):
+    """
+    Envuelve function para que, al ejecutarse en otro hilo (ThreadPoolExecutor), vea el
+    mismo contexto que quien la envuelve, incluido el directorio del trabajo activo.
+    Los hilos de un grupo no heredan el contexto: sin esto get_job_dir() devolvería
+    None y el trabajo escribiría en el proyecto.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # Una copia por llamada: un mismo Context no puede estar activo en dos hilos a la vez
+        return context.copy().run(function, *args, **kwargs)
+    return wrapper
+
 def get_data_dir() -> Path:
-    project_root = get_project_root()
-    data_dir = project_root / 'data'
+    job_dir = get_job_dir()
+    data_dir = job_dir / 'data' if job_dir else get_project_root() / 'data'
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
 
@@ -33,8 +74,8 @@ def get_projects_dir() -> Path:
     return projects_dir
 
 def get_tmp_dir() -> Path:
-    project_root = get_project_root()
-    tmp_dir = project_root / 'tmp'
+    job_dir = get_job_dir()
+    tmp_dir = job_dir / 'tmp' if job_dir else get_project_root() / 'tmp'
     tmp_dir.mkdir(parents=True, exist_ok=True)
     return tmp_dir
 
@@ -62,3 +103,9 @@ def get_images_dir() -> Path:
     images_dir = project_root / 'includes' / 'images'
     images_dir.mkdir(parents=True, exist_ok=True)
     return images_dir
+
+def get_cache_dir() -> Path:
+    project_root = get_project_root()
+    cache_dir = project_root / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
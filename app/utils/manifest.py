@@ -0,0 +1,169 @@
+# app/utils/manifest.py
+"""
+Manifiesto único del trabajo actual (data/job_manifest.json).
+
+Sustituye a los archivos sueltos de data/ (text_for_user.txt, voice_config.txt,
+country_code.txt, gender.txt, speed.txt, pitch.txt, audio_duration.txt,
+text_translate.txt, title_translate.txt...). Cada paso lee el manifiesto una vez y
+escribe su sección de una sola vez con un reemplazo atómico, así que nunca queda
+una configuración a medias entre pasos.
+
+Si aún no hay manifiesto, los .txt antiguos se importan una vez (_load_legacy). Esos
+archivos siguen en el repositorio durante esta versión para que 'git pull' no los
+borre antes de importarlos; se eliminarán en la siguiente.
+
+Estructura (versión SCHEMA_VERSION):
+    {
+      "schema_version": 1,
+      "settings":    {"text", "voice_name", "language_code", "gender", "speaking_rate", "pitch"},
+      "translation": {"text", "title"},
+      "outputs":     {"tts": {"path", "duration_ms", "chunk_timings", "cues", ...}},
+      "hashes":      {"settings": sha256 de la configuración, "translation": ...},
+      "timings":     {"tts": segundos, ...},
+      "updated_at":  epoch
+    }
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from app.utils.debug import log_message
+from app.utils.directories import get_data_dir
+
+SCHEMA_VERSION = 1
+MANIFEST_NAME = 'job_manifest.json'
+
+# Archivos sueltos de versiones anteriores: (sección, campo, archivo, conversión)
+_LEGACY_FILES = (
+    ('settings', 'text', 'text_for_user.txt', str),
+    ('settings', 'voice_name', 'voice_config.txt', str),
+    ('settings', 'language_code', 'country_code.txt', str),
+    ('settings', 'gender', 'gender.txt', str),
+    ('settings', 'speaking_rate', 'speed.txt', float),
+    ('settings', 'pitch', 'pitch.txt', int),
+    ('translation', 'text', 'text_translate.txt', str),
+    ('translation', 'title', 'title_translate.txt', str),
+)
+
+_lock = threading.Lock()
+
+
+def manifest_path():
+    """Ruta del manifiesto del trabajo activo (o del proyecto, en la interfaz gráfica)."""
+    return os.path.join(get_data_dir(), MANIFEST_NAME)
+
+
+def content_hash(values):
+    """SHA-256 estable de un diccionario serializable (para saber si una salida está al día)."""
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 del contenido de un archivo (para identificar el audio generado)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _empty_manifest():
+    return {'schema_version': SCHEMA_VERSION, 'settings': {}, 'translation': {}, 'outputs': {},
+            'hashes': {}, 'timings': {}, 'updated_at': None}
+
+
+def _load_legacy(data_dir):
+    """Importa los archivos .txt sueltos de versiones anteriores, si existen."""
+    manifest = _empty_manifest()
+    found = False
+    for section, field, file_name, convert in _LEGACY_FILES:
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest[section][field] = convert(f.read().strip())
+            found = True
+        except (OSError, ValueError) as e:
+            log_message("warning", f"No se pudo importar '{file_name}' al manifiesto: {e}")
+    if found:
+        for section in ('settings', 'translation'):
+            if manifest[section]:
+                manifest['hashes'][section] = content_hash(manifest[section])
+        log_message("info", "Configuración anterior (archivos .txt de data/) importada al manifiesto.")
+    return manifest
+
+
+def _migrate(manifest):
+    """Completa un manifiesto de una versión anterior del esquema."""
+    version = manifest.get('schema_version', 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"El manifiesto usa la versión {version} del esquema y esta versión "
+                         f"de la aplicación sólo admite hasta la {SCHEMA_VERSION}.")
+    migrated = _empty_manifest()
+    migrated.update({key: value for key, value in manifest.items() if key in migrated})
+    migrated['schema_version'] = SCHEMA_VERSION
+    return migrated
+
+
+def load_manifest():
+    """Lee el manifiesto del trabajo activo; si no existe, importa los .txt antiguos o lo crea vacío."""
+    path = manifest_path()
+    if not os.path.exists(path):
+        return _load_legacy(os.path.dirname(path))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return _migrate(json.load(f))
+    except json.JSONDecodeError as e:
+        log_message("error", f"El manifiesto '{path}' está dañado, se ignora: {e}")
+        return _empty_manifest()
+
+
+def _save(manifest):
+    path = manifest_path()
+    manifest['updated_at'] = time.time()
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def update_manifest(section, values):
+    """
+    Reemplaza una sección del manifiesto ('settings' o 'translation'), recalcula su
+    hash y guarda el archivo de forma atómica. Devuelve el manifiesto guardado.
+    """
+    with _lock:
+        manifest = load_manifest()
+        manifest[section] = dict(values)
+        manifest['hashes'][section] = content_hash(manifest[section])
+        _save(manifest)
+    log_message("info", f"Manifiesto actualizado ({section}): {manifest_path()}")
+    return manifest
+
+
+def record_output(stage, values, elapsed=None):
+    """
+    Guarda la salida de una etapa en 'outputs' junto con el hash de la configuración
+    con la que se generó (ver get_output) y, si se indica, los segundos que tardó.
+    """
+    with _lock:
+        manifest = load_manifest()
+        manifest['outputs'][stage] = dict(values, settings_hash=manifest['hashes'].get('settings'))
+        if elapsed is not None:
+            manifest['timings'][stage] = round(elapsed, 3)
+        _save(manifest)
+    log_message("info", f"Manifiesto actualizado (salida de '{stage}'): {manifest_path()}")
+    return manifest
+
+
+def get_output(manifest, stage):
+    """Salida de una etapa, o None si no existe o se generó con otra configuración."""
+    output = manifest['outputs'].get(stage)
+    if not output or output.get('settings_hash') != manifest['hashes'].get('settings'):
+        return None
+    return output
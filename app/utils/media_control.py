@@ -3,9 +3,17 @@
 import os
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import QObject, QTimer, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtMultimedia import (
+    QMediaPlayer,
+    QMediaContent,
+    QAudioFormat,
+    QAudioOutput,
+    QAudio,
+)
 from app.utils.debug import log_message
-from app.utils.directories import get_tmp_dir, get_data_dir
+from app.utils.directories import get_tmp_dir
+from app.utils.manifest import load_manifest, get_output
+from app.modules.video.media_probe import media_duration_ms
 
 
 class MediaPlayer(QObject):
@@ -17,6 +25,8 @@ class MediaPlayer(QObject):
         return cls._instance
 
     def __init__(self):
+        if hasattr(self, '_initialized'):  # Evita recrear los reproductores en cada MediaPlayer()
+            return
         super().__init__()
         self.audio_player = QMediaPlayer(None, QMediaPlayer.StreamPlayback)
         self.video_player = QMediaPlayer(None, QMediaPlayer.VideoSurface)
@@ -30,6 +40,16 @@ class MediaPlayer(QObject):
         self.loop_timer = QTimer()
         self.is_playing_video = False
         self.video_file = None  # Atributo para almacenar el video seleccionado
+
+        # Vista previa progresiva (se reproduce mientras se siguen sintetizando fragmentos)
+        self.pcm_output = None
+        self.pcm_device = None
+        self.pcm_buffer = bytearray()
+        self.pcm_timer = QTimer()
+        self.pcm_timer.setInterval(20)
+        self.pcm_timer.timeout.connect(self._feed_pcm)
+
+        self._initialized = True
         log_message("success", "MediaPlayer configurado.")
         print("MediaPlayer inicializado.")
 
@@ -88,14 +108,14 @@ class MediaPlayer(QObject):
             self.play_audio(temp_audio_path)
 
         elif play_type == 'video' and self.video_file:
-            # Leer la duración del audio desde el archivo
-            duration_path = os.path.join(get_data_dir(), 'audio_duration.txt')
-            print(f"Ruta del archivo de duración del audio: {duration_path}")
-
+            # Leer la duración del audio desde el manifiesto del trabajo o, si no está,
+            # desde las cabeceras del archivo
             try:
-                with open(duration_path, 'r') as f:
-                    audio_duration = int(f.read().strip())  # Leer y convertir a entero
-                    print(f"Duración del audio leída: {audio_duration} ms")
+                tts_output = get_output(load_manifest(), 'tts') or {}
+                audio_duration = int(tts_output.get('duration_ms') or media_duration_ms(temp_audio_path))
+                if audio_duration <= 0:
+                    raise ValueError("no se pudo obtener la duración del audio actual")
+                print(f"Duración del audio leída: {audio_duration} ms")
             except Exception as e:
                 print(f"Error al leer la duración del audio: {e}")
                 QMessageBox.critical(None, "Error", f"Error al leer la duración del audio: {e}")
@@ -115,8 +135,67 @@ class MediaPlayer(QObject):
             self.loop_timer.start(audio_duration)  # Reiniciar el video al final del audio
             print("Temporizador para bucle de video configurado.")
 
+    def start_preview(self):
+        """Prepara una vista previa progresiva nueva, descartando la anterior."""
+        self.stop()
+        log_message("info", "Vista previa progresiva preparada.")
+
+    def queue_preview_segment(self, audio_bytes, sample_rate):
+        """
+        Añade audio a la vista previa en cuanto llega y arranca la reproducción con el primero.
+
+        Sólo admite PCM s16le mono con su frecuencia de muestreo: ConvertWorker ya
+        decodifica los MP3 fuera del hilo de la interfaz. Todo se escribe en un único
+        flujo de QAudioOutput, así que la reproducción es continua y sin huecos entre
+        fragmentos.
+        """
+        try:
+            self._queue_pcm(audio_bytes, sample_rate)
+        except Exception as e:
+            log_message("error", f"Error al añadir un fragmento a la vista previa: {e}", exc_info=True)
+
+    def _queue_pcm(self, audio_bytes, sample_rate):
+        if self.pcm_output is None or self.pcm_output.format().sampleRate() != sample_rate:
+            audio_format = QAudioFormat()
+            audio_format.setSampleRate(sample_rate)
+            audio_format.setChannelCount(1)
+            audio_format.setSampleSize(16)
+            audio_format.setCodec("audio/pcm")
+            audio_format.setByteOrder(QAudioFormat.LittleEndian)
+            audio_format.setSampleType(QAudioFormat.SignedInt)
+            self.pcm_output = QAudioOutput(audio_format)
+            self.pcm_output.setBufferSize(sample_rate * 2)  # un segundo de audio
+            self.pcm_device = None
+
+        self.pcm_buffer.extend(audio_bytes)
+        if self.pcm_device is None or self.pcm_output.state() == QAudio.StoppedState:
+            self.pcm_device = self.pcm_output.start()
+            log_message("success", "Vista previa PCM iniciada.")
+        if not self.pcm_timer.isActive():
+            self.pcm_timer.start()
+        self._feed_pcm()
+
+    def _feed_pcm(self):
+        """Escribe en QAudioOutput todo lo que admita su búfer."""
+        if self.pcm_device is None or not self.pcm_buffer:
+            return
+        free = self.pcm_output.bytesFree()
+        size = min(free, len(self.pcm_buffer)) & ~1  # muestras de 16 bits completas
+        if size <= 0:
+            return
+        written = self.pcm_device.write(bytes(self.pcm_buffer[:size]))
+        if written > 0:
+            del self.pcm_buffer[:written]
+
     def stop(self):
         """Detiene la reproducción actual."""
+        if self.pcm_output is not None and self.pcm_output.state() != QAudio.StoppedState:
+            self.pcm_output.stop()
+            log_message("info", "Vista previa PCM detenida.")
+        self.pcm_device = None
+        self.pcm_buffer = bytearray()
+        self.pcm_timer.stop()
+
         if self.audio_player.state() == QMediaPlayer.PlayingState:
             self.audio_player.stop()
             print("Reproducción de audio detenida.")
@@ -0,0 +1,132 @@
+# app/utils/startup.py
+"""
+Medición del arranque y carga diferida de las bibliotecas pesadas.
+
+Los SDK de Google Cloud (texttospeech, translate, google.auth...) tardan en importarse
+bastante más que el resto de la aplicación. lazy_import() devuelve un módulo que sólo
+se importa al usar uno de sus atributos, y cada importación diferida queda registrada
+con su duración en los logs de depuración.
+"""
+
+import sys
+import time
+import importlib
+import threading
+import subprocess
+
+from app.utils.debug import log_message
+
+# Instante de referencia del arranque: este módulo se importa al principio de main.py
+_STARTUP_T0 = time.perf_counter()
+_startup_marks = []
+_import_timings = {}
+_lazy_modules = {}
+_import_lock = threading.RLock()
+
+
+def mark_startup(label):
+    """Registra (y escribe en el log de depuración) los milisegundos transcurridos desde el arranque."""
+    elapsed_ms = (time.perf_counter() - _STARTUP_T0) * 1000
+    _startup_marks.append((label, elapsed_ms))
+    log_message("debug", f"Arranque: {label} a los {elapsed_ms:.0f} ms.")
+    return elapsed_ms
+
+
+def get_startup_marks():
+    return list(_startup_marks)
+
+
+def get_import_timings():
+    """Milisegundos que tardó cada módulo cargado con lazy_import, en orden de carga."""
+    with _import_lock:
+        return dict(_import_timings)
+
+
+class LazyModule:
+    """Módulo que se importa la primera vez que se accede a uno de sus atributos."""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _import_lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    name = self.__dict__['_name']
+                    start = time.perf_counter()
+                    module = importlib.import_module(name)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    _import_timings[name] = elapsed_ms
+                    self.__dict__['_module'] = module
+                    log_message("debug", f"Módulo '{name}' cargado bajo demanda en {elapsed_ms:.0f} ms.")
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        state = "cargado" if self.__dict__['_module'] is not None else "sin cargar"
+        return f"<LazyModule '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Devuelve el módulo si ya estaba importado o un LazyModule que lo importará al usarlo."""
+    if name in sys.modules:
+        return sys.modules[name]
+    with _import_lock:
+        if name not in _lazy_modules:
+            _lazy_modules[name] = LazyModule(name)
+        return _lazy_modules[name]
+
+
+def preload(*modules):
+    """Importa ahora los LazyModule indicados (por ejemplo, desde un hilo en segundo plano)."""
+    for module in modules:
+        if isinstance(module, LazyModule):
+            module._load()
+
+
+def run_in_background(func, name):
+    """Ejecuta func en un hilo demonio, registrando su duración y sus errores."""
+    def target():
+        start = time.perf_counter()
+        try:
+            func()
+            log_message("debug", f"Tarea en segundo plano '{name}' completada en "
+                                 f"{(time.perf_counter() - start) * 1000:.0f} ms.")
+        except Exception as e:
+            log_message("warning", f"La tarea en segundo plano '{name}' falló: {e}", exc_info=True)
+
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def profile_imports(module, top=15):
+    """
+    Perfil del tiempo de importación de un módulo en un intérprete nuevo (python -X importtime).
+
+    Devuelve (total_ms, [(acumulado_ms, propio_ms, módulo), ...]) con los top más lentos.
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        try:
+            rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+        except ValueError:
+            continue
+    rows = [(cumulative, own, name.strip()) for cumulative, own, name in rows]
+    total_ms = max((cumulative for cumulative, _, name in rows if name == module), default=0.0)
+    if completed.returncode != 0:
+        log_message("warning", f"No se pudo importar '{module}' para perfilarlo: {completed.stderr.strip()[-300:]}")
+    return total_ms, sorted(rows, reverse=True)[:top]
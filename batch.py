@@ -0,0 +1,163 @@
+# batch.py
+"""
+Procesamiento por lotes sin interfaz: traducción -> voz -> subtítulos -> video.
+
+Las historias se leen de una carpeta de archivos .txt (la primera línea es el título
+y el resto el texto) o de un archivo .jsonl con un objeto por línea:
+    {"id": "...", "title": "...", "text": "..."}
+Cada objeto puede sobrescribir las opciones de voz y traducción (voice_name,
+target_language, speaking_rate, ...).
+
+Con varios idiomas de destino (--target-language es,fr,de y una voz por idioma en
+--voice-name) cada historia se traduce y se sintetiza en paralelo en cada idioma, con
+la salida de cada uno en <salida>/<historia>/<idioma>.
+
+Uso:
+    python batch.py historias/ --voice-name es-ES-Neural2-A --gender FEMALE --workers 4
+    python batch.py historias/ --voice-name es-ES-Neural2-A --threads
+    python batch.py historias.jsonl --target-language es --video includes/videos/fondo.mp4
+    python batch.py historias/ --target-language es,fr --voice-name es-ES-Neural2-A,fr-FR-Neural2-A
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+from app.utils.debug import clean_old_logs, setup_logging, log_message
+from app.utils.directories import get_projects_dir
+from app.modules.pipeline import STAGES
+from app.modules.jobs import JobRunner, fan_out_jobs
+
+# Opciones que cada historia del JSONL puede sobrescribir
+STORY_OPTIONS = ('voice_name', 'language_code', 'gender', 'speaking_rate', 'pitch',
+                 'target_language', 'source_language', 'audio_encoding', 'video')
+# Opciones del lote que se aplican a todas las historias
+JOB_OPTIONS = ('tts_workers', 'subtitle_format', 'exact_subtitles')
+
+
+def load_stories(input_path):
+    """Lee las historias de una carpeta de .txt o de un archivo .jsonl."""
+    stories = []
+    if os.path.isdir(input_path):
+        for name in sorted(os.listdir(input_path)):
+            if not name.lower().endswith('.txt'):
+                continue
+            with open(os.path.join(input_path, name), 'r', encoding='utf-8') as f:
+                title, _, text = f.read().strip().partition('\n')
+            stories.append({'id': os.path.splitext(name)[0], 'title': title.strip(), 'text': text.strip()})
+    else:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                story = json.loads(line)
+                story.setdefault('id', f"historia_{line_number:04d}")
+                stories.append(story)
+
+    valid = [story for story in stories if story.get('text')]
+    for story in stories:
+        if not story.get('text'):
+            log_message("warning", f"Historia '{story.get('id')}' sin texto, se omite.")
+    return valid
+
+
+def print_summary(results, elapsed):
+    """Imprime los tiempos por etapa y el rendimiento del lote."""
+    ok = [r for r in results if r['status'] == 'ok']
+    failed = [r for r in results if r['status'] != 'ok']
+
+    print()
+    print(f"{'etapa':<10} {'n':>5} {'total s':>10} {'media s':>10} {'máx s':>10}")
+    for stage in STAGES:
+        values = [r['timings'][stage] for r in results if stage in r['timings']]
+        if values:
+            print(f"{stage:<10} {len(values):>5} {sum(values):>10.2f} {sum(values) / len(values):>10.2f} "
+                  f"{max(values):>10.2f}")
+
+    chars = sum(r['chars'] for r in ok)
+    audio_seconds = sum(r['audio_seconds'] for r in ok)
+    print()
+    print(f"Historias: {len(ok)} correctas, {len(failed)} con error, {elapsed:.1f} s en total")
+    if elapsed > 0:
+        print(f"Rendimiento: {len(ok) * 60 / elapsed:.2f} historias/min, {chars / elapsed:.0f} caracteres/s, "
+              f"{audio_seconds / elapsed:.2f} s de audio por segundo")
+    for r in failed:
+        print(f"  ERROR {r['id']}: {r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Carpeta de .txt o archivo .jsonl con las historias")
+    parser.add_argument("--output-dir", help="Carpeta de salida (por defecto Proyectos/lote_<fecha>)")
+    parser.add_argument("--workers", type=int, help="Historias procesadas a la vez (por defecto, una por núcleo)")
+    parser.add_argument("--threads", action="store_true", help="Usar hilos en lugar de procesos")
+    parser.add_argument("--tts-workers", type=int, help="Peticiones de síntesis simultáneas por historia")
+    parser.add_argument("--target-language",
+                        help="Idioma o idiomas (separados por comas) a los que traducir (sin él no se traduce)")
+    parser.add_argument("--source-language", help="Idioma de origen (por defecto se detecta)")
+    parser.add_argument("--voice-name",
+                        help="Voz de Text-to-Speech, por ejemplo es-ES-Neural2-A (una por idioma, separadas por comas)")
+    parser.add_argument("--language-code", help="Código de idioma de la voz (por defecto se deduce de la voz)")
+    parser.add_argument("--gender", default="FEMALE", choices=["FEMALE", "MALE", "NEUTRAL"])
+    parser.add_argument("--speaking-rate", type=float, default=1.0)
+    parser.add_argument("--pitch", type=int, default=0)
+    parser.add_argument("--audio-encoding", choices=["MP3", "LINEAR16"], help="Codificación de la síntesis")
+    parser.add_argument("--subtitle-format", choices=["srt", "vtt", "ass"], help="Formato de los subtítulos (srt)")
+    parser.add_argument("--exact-subtitles", action="store_const", const=True,
+                        help="Pedir a la API los instantes de cada oración (marcas SSML, se facturan)")
+    parser.add_argument("--video", help="Video de fondo; sin él no se renderiza")
+    args = parser.parse_args()
+
+    clean_old_logs()
+    setup_logging()
+
+    stories = load_stories(args.input)
+    if not stories:
+        print("No se encontraron historias.")
+        return 1
+
+    options = {key: value for key, value in vars(args).items() if value is not None}
+    output_dir = args.output_dir or str(get_projects_dir() / f"lote_{datetime.now():%Y-%m-%d_%H-%M-%S}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    missing_voice = [s['id'] for s in stories if not s.get('voice_name', options.get('voice_name'))]
+    if missing_voice:
+        parser.error(f"Falta --voice-name (o 'voice_name' en las historias: {', '.join(missing_voice[:5])})")
+
+    jobs = []
+    try:
+        for story in stories:
+            settings = {key: options[key] for key in STORY_OPTIONS + JOB_OPTIONS if key in options}
+            settings.update({key: story[key] for key in STORY_OPTIONS if story.get(key) is not None})
+            jobs.extend(fan_out_jobs(story, settings, output_dir))
+    except ValueError as e:
+        parser.error(str(e))
+
+    runner = JobRunner(args.workers, use_processes=not args.threads)
+    print(f"Procesando {len(jobs)} trabajos ({len(stories)} historias) con {runner.workers} trabajadores en {output_dir}")
+    log_message("info", f"Lote iniciado: {len(jobs)} historias, {runner.workers} trabajadores, salida {output_dir}")
+
+    done = []
+
+    def report(result):
+        done.append(result)
+        print(f"[{len(done)}/{len(jobs)}] {result['id']}: {result['status']} "
+              f"({sum(result['timings'].values()):.1f} s)")
+
+    start = time.perf_counter()
+    results = runner.run(jobs, on_result=report)
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(output_dir, 'resumen.json'), 'w', encoding='utf-8') as f:
+        json.dump({'elapsed': elapsed, 'results': results}, f, ensure_ascii=False, indent=2)
+
+    print_summary(results, elapsed)
+    log_message("info", f"Lote terminado en {elapsed:.1f} s.")
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
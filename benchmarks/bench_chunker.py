@@ -0,0 +1,144 @@
+# benchmarks/bench_chunker.py
+"""
+Micro-benchmark del divisor de texto para Text-to-Speech.
+
+Compara el algoritmo anterior de split_text_by_bytes (concatenación palabra a
+palabra) con chunk_text sobre textos de varios megabytes. Con --edits mide cuántos
+bytes hay que volver a sintetizar tras editar una palabra, con cortes voraces y con
+cortes definidos por el contenido (stable=True).
+
+Uso:
+    python benchmarks/bench_chunker.py [--sizes 1 4 16] [--limit 5000] [--repeat 3]
+    python benchmarks/bench_chunker.py --edits 200 [--story-kb 15] [--limit 5000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.audio.chunker import chunk_text  # noqa: E402
+
+WORDS = [
+    "Había", "una", "vez", "un", "pequeño", "pueblo", "junto", "al", "río,", "donde", "todos",
+    "se", "conocían.", "Nadie", "sabía", "qué", "ocurría", "por", "las", "noches…", "¿Por", "qué?",
+    "La", "señora", "Núñez", "decía", "que", "era", "el", "viento;", "otros", "no", "lo", "creían.",
+]
+
+
+def build_text(size_mb, seed=1234):
+    """Genera un texto pseudoaleatorio con oraciones y párrafos de unos size_mb megabytes."""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    parts = []
+    total = 0
+    while total < target:
+        paragraph = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160))).rstrip(",;…") + "."
+        parts.append(paragraph)
+        total += len(paragraph.encode('utf-8')) + 2
+    return "\n\n".join(parts)
+
+
+def legacy_split(text, byte_limit):
+    """Copia del algoritmo original de split_text_by_bytes (sin escribir input.txt)."""
+    current_chunk = ""
+    chunks = []
+    current_size = 0
+    for word in text.split():
+        word_size = len(word.encode('utf-8')) + 1
+        if current_size + word_size > byte_limit:
+            chunks.append(current_chunk.strip())
+            current_chunk = word + " "
+            current_size = word_size
+        else:
+            current_chunk += word + " "
+            current_size += word_size
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def sentence_end_ratio(chunks):
+    """Fracción de fragmentos que terminan en final de oración (menos cortes de prosodia)."""
+    if not chunks:
+        return 0.0
+    return sum(1 for chunk in chunks if chunk.rstrip().endswith(('.', '!', '?', '…'))) / len(chunks)
+
+
+def resynthesized_bytes(text, edited, byte_limit, stable):
+    """Bytes de los fragmentos del texto editado que no existían antes de la edición."""
+    def chunks(value):
+        data, spans, _ = chunk_text(value, byte_limit, ssml=False, stable=stable)
+        return [data[start:end] for start, end in spans]
+
+    before = set(chunks(text))
+    after = chunks(edited)
+    return sum(len(chunk) for chunk in after if chunk not in before), len(after)
+
+
+def run_edits(edits, story_kb, byte_limit, seed=99):
+    """Edita una palabra al azar de historias de story_kb KB y compara lo que hay que volver a sintetizar."""
+    rng = random.Random(seed)
+    totals = {False: [0, 0], True: [0, 0]}
+    for _ in range(edits):
+        words = build_text(1, seed=rng.randrange(1 << 30))[:story_kb * 1024].split(" ")
+        text = " ".join(words)
+        position = rng.randrange(len(words))
+        edited = " ".join(words[:position] + [rng.choice(WORDS)] + words[position + 1:])
+        for stable in totals:
+            changed, count = resynthesized_bytes(text, edited, byte_limit, stable)
+            totals[stable][0] += changed
+            totals[stable][1] += count
+
+    print(f"{'cortes':>10} {'frags/historia':>15} {'bytes a sintetizar/edición':>27}")
+    for stable, (changed, count) in totals.items():
+        print(f"{'estables' if stable else 'voraces':>10} {count / edits:>15.1f} {changed / edits:>27.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="Tamaños de texto en MB")
+    parser.add_argument("--limit", type=int, default=5000, help="Límite de bytes por fragmento")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    parser.add_argument("--edits", type=int, default=0, help="Ediciones simuladas para medir la estabilidad")
+    parser.add_argument("--story-kb", type=int, default=15, help="Tamaño de cada historia editada en KB")
+    args = parser.parse_args()
+
+    if args.edits:
+        run_edits(args.edits, args.story_kb, args.limit)
+        return
+
+    print(f"{'MB':>4} {'algoritmo':>10} {'seg':>8} {'MB/s':>8} {'frags':>7} {'fin oración':>12}")
+    for size_mb in args.sizes:
+        text = build_text(size_mb)
+
+        legacy_time, legacy_chunks = best_of(lambda: legacy_split(text, args.limit), args.repeat)
+
+        def run_new():
+            data, spans, _ = chunk_text(text, args.limit, ssml=False)
+            return data, spans
+
+        new_time, (data, spans) = best_of(run_new, args.repeat)
+        new_chunks = [data[start:end].decode('utf-8') for start, end in spans]
+
+        for name, elapsed, chunks in (("anterior", legacy_time, legacy_chunks), ("chunker", new_time, new_chunks)):
+            print(f"{size_mb:>4} {name:>10} {elapsed:>8.3f} {size_mb / elapsed:>8.1f} {len(chunks):>7} "
+                  f"{sentence_end_ratio(chunks):>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
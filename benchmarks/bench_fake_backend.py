@@ -0,0 +1,81 @@
+# benchmarks/bench_fake_backend.py
+"""
+Prueba de rendimiento de extremo a extremo sin red ni cuota.
+
+Activa los clientes simulados de Google (TIKTOK_FAKE_GOOGLE=1) y lanza varias
+historias a la vez por translate_text_with_model y synthesize_text_to_file
+(la misma síntesis que usa convert_text), con latencia, errores y cuota inyectados.
+
+Uso:
+    python benchmarks/bench_fake_backend.py [--stories 20] [--workers 4] [--chars 3000]
+        [--latency lognormal:150:0.4] [--error-rate 0.02] [--quota-rpm 0] [--encoding MP3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=20, help="Historias a procesar")
+    parser.add_argument("--workers", type=int, default=4, help="Historias simultáneas")
+    parser.add_argument("--chars", type=int, default=3000, help="Caracteres por historia")
+    parser.add_argument("--latency", default="lognormal:150:0.4", help="Latencia simulada por llamada (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fracción de llamadas con UNAVAILABLE")
+    parser.add_argument("--quota-rpm", type=int, default=0, help="Cuota simulada de peticiones por minuto")
+    parser.add_argument("--encoding", default="MP3", choices=["MP3", "LINEAR16"])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # La configuración se lee al importar app.config.settings: fijarla antes de importar la aplicación
+    os.environ["TIKTOK_FAKE_GOOGLE"] = "1"
+    os.environ["TIKTOK_FAKE_LATENCY_MS"] = args.latency
+    os.environ["TIKTOK_FAKE_ERROR_RATE"] = str(args.error_rate)
+    os.environ["TIKTOK_FAKE_QUOTA_RPM"] = str(args.quota_rpm)
+    os.environ.setdefault("TIKTOK_API_BACKOFF_BASE", "0.2")
+    os.environ["TIKTOK_TTS_CACHE"] = "0"
+
+    from app.config.credentials import GoogleCloudAPIManager
+    from app.modules.audio.convert_text import synthesize_text_to_file
+    from app.modules.translate.translate_text import translate_text_with_model
+
+    sentence = "La señora Núñez decía que era el viento, pero nadie la creía. "
+    text = (sentence * (args.chars // len(sentence) + 1))[:args.chars]
+    output_dir = tempfile.mkdtemp(prefix="bench_fake_")
+    timings = {'translate': [], 'tts': []}
+
+    def run(index):
+        start = time.perf_counter()
+        translated = translate_text_with_model(text, 'en', 'es')
+        timings['translate'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        synthesize_text_to_file(translated or text, 'es-ES-Neural2-A', 'es-ES', 'FEMALE', 1.0, 0,
+                                os.path.join(output_dir, f"{index}.mp3"), audio_encoding=args.encoding)
+        timings['tts'].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(run, range(args.stories)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{'etapa':<10} {'n':>5} {'media s':>9} {'máx s':>9}")
+    for stage, values in timings.items():
+        print(f"{stage:<10} {len(values):>5} {sum(values) / len(values):>9.3f} {max(values):>9.3f}")
+    print(f"\n{args.stories} historias en {elapsed:.2f} s: {args.stories * 60 / elapsed:.1f} historias/min, "
+          f"{args.stories * args.chars / elapsed:.0f} caracteres/s")
+    print(f"Limitador: {GoogleCloudAPIManager().get_rate_limit_stats()}")
+    print(f"Canales: {GoogleCloudAPIManager().get_channel_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_langid.py
+"""
+Detección de idioma local frente a la API de Translation sobre un corpus de historias.
+
+Lee las historias como batch.py (carpeta de .txt o archivo .jsonl) y detecta el idioma
+del título y del texto con el modelo local (data/langid/model.json). Con --api pide
+también el idioma a detect_language de la API y mide la coincidencia; sin --api la
+referencia es el campo 'language' de cada historia, si lo tiene.
+
+Sin corpus se miden por separado dos conjuntos de párrafos que no forman parte del
+entrenamiento: data/langid/validation/<código>.txt, con el que se ajustan los umbrales
+de local_detect.py, y data/langid/heldout/<código>.txt, que no se usa para ajustar
+nada (su resultado es el que vale). Los dos incluyen idiomas que el modelo no conoce
+(sueco, rumano, neerlandés, catalán, polaco, ruso): para ellos lo correcto es
+"desconocido", que deja la detección a la API.
+
+Uso:
+    python benchmarks/bench_langid.py [historias/ | historias.jsonl] [--api] [--min-confidence 0.95]
+    python benchmarks/bench_langid.py --rebuild
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.settings import LANGID_MIN_CONFIDENCE  # noqa: E402
+from app.modules.translate.local_detect import (  # noqa: E402
+    LanguageDetector, build_model, heldout_dir, validation_dir,
+)
+
+
+def paragraph_samples(directory):
+    """Párrafos de directory/<código>.txt con su idioma (no usados para construir el modelo)."""
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        code, extension = os.path.splitext(name)
+        if extension != '.txt':
+            continue
+        with open(directory / name, 'r', encoding='utf-8') as f:
+            samples.extend((paragraph, code) for paragraph in f.read().split('\n') if paragraph.strip())
+    return samples
+
+
+def story_samples(path):
+    """Títulos y textos de las historias, con el idioma indicado en cada una (o None)."""
+    from batch import load_stories
+
+    samples = []
+    for story in load_stories(path):
+        for field in ('title', 'text'):
+            if story.get(field):
+                samples.append((story[field], story.get('language')))
+    return samples
+
+
+def detect_api(text):
+    from app.modules.translate.detect_language import detect_language_api
+    return detect_language_api(text)
+
+
+def evaluate(title, samples, detector, min_confidence, use_api):
+    """Detecta el idioma de cada muestra y muestra la cobertura y la coincidencia con la referencia."""
+    known = set(detector.languages())
+    local_seconds = api_seconds = 0.0
+    confident = agree = compared = api_calls = 0
+    foreign = rejected = 0
+    for text, expected in samples:
+        start = time.perf_counter()
+        language, confidence = detector.detect(text)
+        local_seconds += time.perf_counter() - start
+
+        if use_api:
+            start = time.perf_counter()
+            expected = detect_api(text)
+            api_seconds += time.perf_counter() - start
+            api_calls += 1
+        accepted = language is not None and confidence >= min_confidence
+        if expected and expected.split('-')[0] not in known:
+            # Idioma que el modelo no conoce: lo correcto es no aceptar ninguno
+            foreign += 1
+            rejected += not accepted
+            continue
+        if accepted:
+            confident += 1
+            if expected:
+                compared += 1
+                agree += language == expected.split('-')[0]
+
+    count = len(samples)
+    print(f"{title}")
+    print(f"  Muestras: {count} ({foreign} en idiomas que el modelo no conoce)")
+    print(f"  Local: {local_seconds / count * 1e6:.0f} µs de media; {confident}/{count - foreign} muestras de "
+          f"idiomas conocidos aceptadas con confianza >= {min_confidence} (el resto lo detecta la API)")
+    if compared:
+        print(f"  Coincidencia con la referencia en las detecciones locales aceptadas: {agree}/{compared} "
+              f"({agree / compared:.1%})")
+    if foreign:
+        print(f"  Idiomas desconocidos rechazados: {rejected}/{foreign} ({rejected / foreign:.0%}); "
+              f"el resto se habría etiquetado con un idioma equivocado")
+    if api_calls:
+        print(f"  API: {api_seconds / api_calls * 1000:.0f} ms de media por petición; "
+              f"peticiones evitadas: {confident} de {api_calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="Carpeta de .txt o archivo .jsonl con historias")
+    parser.add_argument("--api", action="store_true", help="Comparar con la detección de la API")
+    parser.add_argument("--min-confidence", type=float, default=LANGID_MIN_CONFIDENCE,
+                        help="Confianza mínima para no recurrir a la API")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstruir el modelo desde data/langid/corpus")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        model = build_model()
+        print(f"Modelo reconstruido: {', '.join(model['languages'])}")
+        return
+
+    if args.corpus:
+        sample_sets = [(f"Historias de {args.corpus}", story_samples(args.corpus))]
+    else:
+        sample_sets = [("Validación (data/langid/validation, usada para ajustar los umbrales)",
+                        paragraph_samples(validation_dir())),
+                       ("Reservados (data/langid/heldout, sin usar para entrenar ni ajustar)",
+                        paragraph_samples(heldout_dir()))]
+    detector = LanguageDetector()
+    detector.detect("warm up")  # Cargar el modelo fuera de la medición
+    for title, samples in sample_sets:
+        evaluate(title, samples, detector, args.min_confidence, args.api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_startup.py
+"""
+Perfil del tiempo de importación de los módulos que intervienen en el arranque.
+
+Importa cada módulo en un intérprete nuevo con 'python -X importtime' y muestra su
+tiempo total y los submódulos más lentos. Los SDK de Google Cloud se cargan con
+lazy_import: no deberían aparecer al importar credentials ni convert_text.
+
+Uso:
+    python benchmarks/bench_startup.py [--top 10] [módulo ...]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.startup import profile_imports  # noqa: E402
+
+DEFAULT_MODULES = [
+    'app.config.credentials',
+    'app.modules.audio.convert_text',
+    'app.modules.gui_audio',
+    'start',
+    'google.cloud.texttospeech',
+    'google.cloud.translate',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Módulos a perfilar")
+    parser.add_argument("--top", type=int, default=10, help="Submódulos más lentos a mostrar")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        total_ms, rows = profile_imports(module, top=args.top)
+        print(f"\n{module}: {total_ms:.1f} ms")
+        print(f"  {'acumulado ms':>12} {'propio ms':>10}  módulo")
+        for cumulative_ms, own_ms, name in rows:
+            print(f"  {cumulative_ms:>12.1f} {own_ms:>10.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_subtitles.py
+"""
+Micro-benchmark de la generación de subtítulos para historias muy largas.
+
+Compara el generador anterior de generate_srt_from_text (división en ". " y el
+documento entero concatenado con +=) con subtitle_engine (weighted_cues escritos con
+write_subtitles) en SRT, WebVTT y ASS. Mide el tiempo, el rendimiento en MB/s y, con
+--memory, el pico de memoria con tracemalloc (más lento).
+
+Uso:
+    python benchmarks/bench_subtitles.py [--sizes 1 4 16] [--repeat 3] [--memory]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.subtitle_engine import SUBTITLE_FORMATS, weighted_cues, write_subtitles  # noqa: E402
+from bench_chunker import build_text  # noqa: E402
+
+# Segundos de audio por carácter (unos 15 caracteres por segundo de locución)
+SECONDS_PER_CHAR = 1 / 15
+
+
+def legacy_generate(text, total_audio_duration, file_name):
+    """Copia del algoritmo original de generate_srt_from_text, con su format_time (sin log)."""
+    text_parts = text.split(". ")
+    duration_per_part = total_audio_duration / len(text_parts)
+
+    def format_time(seconds):
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        seconds = int(seconds % 60)
+        milliseconds = int((seconds - int(seconds)) * 1000)
+        return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+
+    srt_content = ""
+    for i, part in enumerate(text_parts):
+        start = i * duration_per_part
+        end = (i + 1) * duration_per_part
+        srt_content += f"{i + 1}\n"
+        srt_content += f"{format_time(start)} --> {format_time(end)}\n"
+        srt_content += f"{part}\n\n"
+
+    with open(file_name, "w", encoding="utf-8") as f:
+        f.write(srt_content)
+    return len(text_parts)
+
+
+def engine_generate(text, total_audio_duration, file_name):
+    return write_subtitles(weighted_cues(text, total_audio_duration), file_name)
+
+
+def measure(function, text, duration, file_name, repeat, memory):
+    """Mejor tiempo de 'repeat' ejecuciones, número de subtítulos y pico de memoria (o None)."""
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = function(text, duration, file_name)
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        function(text, duration, file_name)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, count, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="Tamaños del texto en MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="Medir el pico de memoria con tracemalloc")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in args.sizes:
+            text = build_text(size_mb)
+            duration = len(text) * SECONDS_PER_CHAR
+            megabytes = len(text.encode('utf-8')) / (1024 * 1024)
+            print(f"Texto de {megabytes:.1f} MB ({duration / 3600:.1f} h de audio estimadas)")
+
+            runs = [("anterior (srt)", legacy_generate, "legacy.srt")]
+            runs += [(f"motor ({name})", engine_generate, f"engine.{name}") for name in SUBTITLE_FORMATS]
+            for label, function, file_name in runs:
+                seconds, count, peak = measure(function, text, duration, os.path.join(tmp_dir, file_name),
+                                               args.repeat, args.memory)
+                line = (f"  {label:<15} {seconds * 1000:8.0f} ms  {megabytes / seconds:6.1f} MB/s  "
+                        f"{count:>8} subtítulos")
+                if peak is not None:
+                    line += f"  pico {peak / (1024 * 1024):7.1f} MB"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,31 @@
 # main.py
 
+# Primero: fija el instante de referencia para medir el arranque
+from app.utils.startup import mark_startup, run_in_background, get_import_timings
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from start import MainApp
 from app.utils.debug import clean_old_logs, setup_logging, log_message, log_event_and_function
 import sys
 
+
+def after_first_paint():
+    """
+    Se ejecuta cuando la ventana ya se ha pintado: registra el arranque y precarga Google
+    Cloud y el catálogo de voces (con el token guardado, sin abrir el flujo OAuth).
+    """
+    mark_startup("ventana principal visible")
+
+    def warm_up():
+        from app.config.credentials import GoogleCloudAPIManager
+        from app.modules.audio.voice_catalog import VoiceCatalog
+        GoogleCloudAPIManager().warm_up()
+        VoiceCatalog().preload()
+        log_message("debug", f"Módulos cargados en segundo plano (ms): {get_import_timings()}")
+
+    run_in_background(warm_up, "google_cloud_warm_up")
+
+
 if __name__ == "__main__":
     # Usar try/except para manejar excepciones globales y asegurarse de que se registren los errores críticos.
     try:
@@ -15,6 +36,7 @@ if __name__ == "__main__":
         # Iniciar el sistema de logging (debug)
         setup_logging()
         log_message("success", "Sistema de logging iniciado correctamente.")
+        mark_startup("logging configurado")
 
         # Crear una instancia de la aplicación PyQt
         app = QApplication([])
@@ -31,6 +53,9 @@ if __name__ == "__main__":
         window.show()
         log_message("info", "Aplicación principal iniciada correctamente.")
 
+        # Lo que no hace falta para pintar la ventana se carga después del primer ciclo de eventos
+        QTimer.singleShot(0, after_first_paint)
+
         # Iniciar el bucle de la aplicación
         app.exec_()
 